@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from exams.databases import cache_config, database_config, require_shared_cache
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -46,11 +49,21 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "exams.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # orjson-backed when installed, the stdlib json otherwise
+    "DEFAULT_RENDERER_CLASSES": [
+        "exams.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "exams.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
@@ -87,9 +100,15 @@ SPECTACULAR_SETTINGS = {
 
     "COMPONENT_SPLIT_REQUEST": True,
 
+    # keep operation ids and tags derived from the paths below /api (exams_retrieve, not
+    # api_exams_retrieve) now that /metrics sits outside it
+    "SCHEMA_PATH_PREFIX": r"/api",
+
 }
 
 MIDDLEWARE = [
+    'exams.middleware.MetricsMiddleware',
+    'exams.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -97,6 +116,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'exams.middleware.ProfilingMiddleware',
+    'exams.middleware.PrimaryPinMiddleware',
 ]
 
 ROOT_URLCONF = 'assessment_engine.urls'
@@ -122,12 +143,26 @@ WSGI_APPLICATION = 'assessment_engine.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# DATABASE_URL is the primary (default sqlite:///db.sqlite3, relative to BASE_DIR) and
+# DATABASE_REPLICA_URLS a comma-separated list of read replicas (aliases replica1, replica2, ...).
+# DATABASE_CONN_MAX_AGE keeps connections open for that many seconds (default 60, 0 closes them per request).
+# Locally, a copy of db.sqlite3 stands in for a replica:
+#   cp db.sqlite3 db-replica.sqlite3 && CACHE_URL=file:///tmp/exams-cache \
+#     DATABASE_REPLICA_URLS=sqlite:///db-replica.sqlite3 python manage.py runserver
+DATABASES = database_config(os.environ, BASE_DIR)
+
+# Listing views read from replicas (exams/routers.py); everything else uses the primary.
+DATABASE_ROUTERS = ['exams.routers.PrimaryReplicaRouter']
+
+# Seconds a user's reads stay on the primary after they write, so they read their own writes.
+DATABASE_PIN_SECONDS = 5
+
+# CACHE_URL is the cache shared by all processes: redis://host:6379/0, memcached://host:11211
+# or file:///path (one host).
+# Unset, each process keeps its own memory cache, which is only allowed without replicas
+# (the primary pin above lives in the cache).
+CACHES = cache_config(os.environ)
+require_shared_cache(DATABASES, CACHES)
 
 
 # Password validation
@@ -165,3 +200,60 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = 'static/'
+
+
+# Grading
+# Compiled grading plans kept per process (see exams/grading.py).
+GRADING_PLAN_CACHE_SIZE = 256
+
+# "token" matches whole words and phrases of text rubrics;
+# "substring" keeps the original keyword-in-text matching.
+GRADING_TEXT_MATCH = "token"
+
+# Queue submissions for `manage.py grading_worker` instead of grading them in the request.
+GRADING_ASYNC = False
+
+# Pool the async (/api/async/) submit view grades in: "thread" or "process" (see exams/pools.py).
+GRADING_POOL = "thread"
+GRADING_POOL_WORKERS = None  # executor default
+
+# Seconds a rendered student exam payload stays cached (a change moves on to a new key anyway).
+EXAM_PAYLOAD_CACHE_TIMEOUT = 3600
+
+# Token -> user lookups remembered per process by CachedTokenAuthentication.
+TOKEN_AUTH_CACHE_SIZE = 10000
+TOKEN_AUTH_CACHE_TTL = 60  # seconds
+
+# Request, SQL and grading metrics served at /metrics (see exams/metrics.py).
+METRICS_ENABLED = True
+# Shared directory for per-process metric files, so /metrics sums all workers.
+METRICS_DIR = os.environ.get("METRICS_MULTIPROC_DIR") or None
+METRICS_FLUSH_INTERVAL = 1.0  # seconds between a process's metric file writes
+# Add a Server-Timing header (SQL count/time, total time) to every response.
+METRICS_SERVER_TIMING = False
+
+# Request profiles (see exams/middleware.py ProfilingMiddleware), listed at /api/profiles/.
+PROFILE_DIR = os.environ.get("PROFILE_DIR") or BASE_DIR / "profiles"
+PROFILE_MAX_FILES = 50
+# Profile 1 in N requests and keep those slower than PROFILE_SLOW_MS; 0 turns sampling off.
+PROFILE_SAMPLE_EVERY = 0
+PROFILE_SLOW_MS = 500
+
+# Admission control on submit and exam-start (see exams/admission.py): a per-user token bucket
+# (rate per second, burst) and per-exam concurrency with a short wait queue (size, seconds).
+# Turn it off (ADMISSION_ENABLED=0) for single-user load tests such as `manage.py loadtest`.
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "1") != "0"
+ADMISSION = {
+    "submit": {"rate": 0.5, "burst": 3, "concurrency": 4, "queue": 64, "wait": 2.0},
+    "exam-start": {"rate": 2.0, "burst": 10, "concurrency": 32, "queue": 256, "wait": 1.0},
+    "draft": {"rate": 1.0, "burst": 10, "concurrency": 16, "queue": 128, "wait": 1.0},
+}
+# "exams.admission.LocalAdmissionStore" (per process) or "exams.admission.CacheAdmissionStore" (shared cache).
+ADMISSION_STORE = "exams.admission.LocalAdmissionStore"
+ADMISSION_STATE_TIMEOUT = 60  # seconds before CacheAdmissionStore state expires
+
+# Response compression (see exams/middleware.py CompressionMiddleware): brotli when the brotli
+# package is installed and accepted, gzip otherwise, for responses of at least COMPRESSION_MIN_BYTES.
+COMPRESSION_ENABLED = os.environ.get("COMPRESSION_ENABLED", "1") != "0"
+COMPRESSION_MIN_BYTES = 1024
+COMPRESSION_BROTLI_QUALITY = 4
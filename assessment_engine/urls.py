@@ -18,9 +18,12 @@ from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
+from exams.views import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("api/", include("exams.urls")),
+    path("metrics", MetricsView.as_view(), name="metrics"),
 
      # Swagger UI endpoints
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
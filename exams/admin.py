@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Exam, Question, Submission
+from .models import Draft, Exam, Question, Submission, GradingJob
 
 # Register your models here.
 class QuestionInline(admin.TabularInline):
@@ -11,3 +11,5 @@ class ExamAdmin(admin.ModelAdmin):
 
 admin.site.register(Exam, ExamAdmin)
 admin.site.register(Submission)
+admin.site.register(GradingJob)
+admin.site.register(Draft)
@@ -0,0 +1,439 @@
+"""
+Admission control for the submit and exam-start endpoints.
+
+Two gates, configured per scope in settings.ADMISSION:
+- a per-user token bucket (`rate` requests/second, `burst` at once), so a
+  client retrying in a loop is turned away before it costs anything;
+- a per-exam concurrency limit (`concurrency` requests in flight) with a
+  short wait queue (`queue` requests waiting up to `wait` seconds), so a
+  burst at exam close reaches the database a few requests at a time.
+
+Rejections are 429s with Retry-After: the bucket's refill time, or for a busy
+exam an estimate from the queue depth and the recent time per request.
+The state lives in ADMISSION_STORE: LocalAdmissionStore (this process) or
+CacheAdmissionStore (the Django cache, shared by all processes using it).
+Each store method has an a-prefixed counterpart for async views, so a
+store that does I/O does not block the event loop.
+"""
+import asyncio
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+from .metrics import registry
+
+DEFAULT_SCOPE = {"rate": 1.0, "burst": 5, "concurrency": 8, "queue": 32, "wait": 1.0}
+# how often a waiter on a shared store checks for a free slot
+POLL_SECONDS = 0.02
+
+
+def scope_config(scope):
+    return {**DEFAULT_SCOPE, **getattr(settings, "ADMISSION", {}).get(scope, {})}
+
+
+def admission_enabled():
+    return getattr(settings, "ADMISSION_ENABLED", True)
+
+
+class LocalAdmissionStore:
+    """
+    Admission state in this process. Waiters are woken as soon as a slot is
+    released. Limits apply per process, so N workers admit N times as much.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._buckets = {}
+        self._in_flight = {}
+        self._waiting = {}
+
+    def take(self, key, rate, burst):
+        """
+        Takes a token from the bucket; returns 0 when there was one, otherwise
+        the seconds until there will be.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / rate
+
+    def acquire(self, key, limit):
+        with self._lock:
+            if self._in_flight.get(key, 0) >= limit:
+                return False
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+            return True
+
+    def release(self, key):
+        with self._lock:
+            remaining = self._in_flight.get(key, 0) - 1
+            if remaining > 0:
+                self._in_flight[key] = remaining
+            else:
+                self._in_flight.pop(key, None)
+            self._released.notify_all()
+
+    def join_queue(self, key, size):
+        """
+        Counts the caller as waiting; False when `size` are waiting already.
+        """
+        with self._lock:
+            if self._waiting.get(key, 0) >= size:
+                return False
+            self._waiting[key] = self._waiting.get(key, 0) + 1
+            return True
+
+    def leave_queue(self, key):
+        with self._lock:
+            remaining = self._waiting.get(key, 0) - 1
+            if remaining > 0:
+                self._waiting[key] = remaining
+            else:
+                self._waiting.pop(key, None)
+
+    def queue_depth(self, key):
+        with self._lock:
+            return self._waiting.get(key, 0)
+
+    def wait_for_release(self, key, timeout):
+        with self._lock:
+            self._released.wait(min(timeout, POLL_SECONDS * 5))
+
+    # the lock is only held for a few dict operations, so async callers
+    # take it on the event loop
+    async def atake(self, key, rate, burst):
+        return self.take(key, rate, burst)
+
+    async def aacquire(self, key, limit):
+        return self.acquire(key, limit)
+
+    async def arelease(self, key):
+        self.release(key)
+
+    async def ajoin_queue(self, key, size):
+        return self.join_queue(key, size)
+
+    async def aleave_queue(self, key):
+        self.leave_queue(key)
+
+    async def aqueue_depth(self, key):
+        return self.queue_depth(key)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._in_flight.clear()
+            self._waiting.clear()
+
+
+class CacheAdmissionStore:
+    """
+    Admission state in the default cache, so limits hold across processes
+    with a shared backend (Redis, Memcached). Counters use cache incr/decr,
+    which those backends apply atomically. The token bucket is a
+    read-then-write and may let a few extra requests through under races.
+    Every key expires after ADMISSION_STATE_TIMEOUT, so slots held by a
+    process that died come back.
+    """
+
+    def __init__(self):
+        self.timeout = getattr(settings, "ADMISSION_STATE_TIMEOUT", 60)
+
+    def _key(self, kind, key):
+        return f"exams:admission:{kind}:{key}"
+
+    def take(self, key, rate, burst):
+        # GCRA: the bucket is the time at which it will be full again
+        now = time.time()
+        bucket_key = self._key("bucket", key)
+        full_at = max(cache.get(bucket_key, now), now)
+        if full_at + 1 / rate - now > burst / rate:
+            return full_at + 1 / rate - now - burst / rate
+        cache.set(bucket_key, full_at + 1 / rate, self.timeout)
+        return 0.0
+
+    async def atake(self, key, rate, burst):
+        now = time.time()
+        bucket_key = self._key("bucket", key)
+        full_at = max(await cache.aget(bucket_key, now), now)
+        if full_at + 1 / rate - now > burst / rate:
+            return full_at + 1 / rate - now - burst / rate
+        await cache.aset(bucket_key, full_at + 1 / rate, self.timeout)
+        return 0.0
+
+    def _incr(self, key):
+        cache.add(key, 0, self.timeout)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # expired between add and incr
+            cache.add(key, 1, self.timeout)
+            return 1
+
+    async def _aincr(self, key):
+        await cache.aadd(key, 0, self.timeout)
+        try:
+            return await cache.aincr(key)
+        except ValueError:
+            await cache.aadd(key, 1, self.timeout)
+            return 1
+
+    def _decr(self, key):
+        try:
+            if cache.decr(key) < 0:
+                cache.set(key, 0, self.timeout)
+        except ValueError:
+            pass
+
+    async def _adecr(self, key):
+        try:
+            if await cache.adecr(key) < 0:
+                await cache.aset(key, 0, self.timeout)
+        except ValueError:
+            pass
+
+    def acquire(self, key, limit):
+        slot_key = self._key("in-flight", key)
+        if self._incr(slot_key) > limit:
+            self._decr(slot_key)
+            return False
+        return True
+
+    def release(self, key):
+        self._decr(self._key("in-flight", key))
+
+    def join_queue(self, key, size):
+        queue_key = self._key("waiting", key)
+        if self._incr(queue_key) > size:
+            self._decr(queue_key)
+            return False
+        return True
+
+    def leave_queue(self, key):
+        self._decr(self._key("waiting", key))
+
+    def queue_depth(self, key):
+        return cache.get(self._key("waiting", key), 0)
+
+    async def aacquire(self, key, limit):
+        slot_key = self._key("in-flight", key)
+        if await self._aincr(slot_key) > limit:
+            await self._adecr(slot_key)
+            return False
+        return True
+
+    async def arelease(self, key):
+        await self._adecr(self._key("in-flight", key))
+
+    async def ajoin_queue(self, key, size):
+        queue_key = self._key("waiting", key)
+        if await self._aincr(queue_key) > size:
+            await self._adecr(queue_key)
+            return False
+        return True
+
+    async def aleave_queue(self, key):
+        await self._adecr(self._key("waiting", key))
+
+    async def aqueue_depth(self, key):
+        return await cache.aget(self._key("waiting", key), 0)
+
+    def wait_for_release(self, key, timeout):
+        time.sleep(min(timeout, POLL_SECONDS))
+
+    def clear(self):
+        # keys expire on their own; tests use the local store
+        pass
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        path = getattr(settings, "ADMISSION_STORE", "exams.admission.LocalAdmissionStore")
+        if _store is None or f"{type(_store).__module__}.{type(_store).__name__}" != path:
+            _store = import_string(path)()
+        return _store
+
+
+# recent seconds per admitted request, per scope, for Retry-After estimates
+_service_seconds = {}
+
+
+def _observe_service(scope, seconds):
+    previous = _service_seconds.get(scope)
+    _service_seconds[scope] = seconds if previous is None else previous * 0.8 + seconds * 0.2
+
+
+def busy_retry_after(scope, depth, concurrency):
+    """
+    Seconds until a newcomer would likely get a slot: the requests ahead of
+    it, `concurrency` at a time, at the recent time per request.
+    """
+    per_request = _service_seconds.get(scope, 0.1)
+    return max(1, math.ceil((depth + 1) * per_request / concurrency))
+
+
+class Rejected(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ExamSlot:
+    """
+    A held per-exam concurrency slot; release() it when the request is done.
+    """
+
+    def __init__(self, store, scope, key):
+        self.store = store
+        self.scope = scope
+        self.key = key
+        self.started = time.monotonic()
+
+    def release(self):
+        self.store.release(self.key)
+        _observe_service(self.scope, time.monotonic() - self.started)
+
+    async def arelease(self):
+        await self.store.arelease(self.key)
+        _observe_service(self.scope, time.monotonic() - self.started)
+
+
+def _admitted(store, scope, key, waited):
+    registry.observe_admission(scope, "waited" if waited else "admitted")
+    return ExamSlot(store, scope, key)
+
+
+def _busy(store, scope, key, config, outcome):
+    registry.observe_admission(scope, outcome)
+    return Rejected(busy_retry_after(scope, store.queue_depth(key), config["concurrency"]))
+
+
+async def _abusy(store, scope, key, config, outcome):
+    registry.observe_admission(scope, outcome)
+    return Rejected(busy_retry_after(scope, await store.aqueue_depth(key), config["concurrency"]))
+
+
+def acquire_exam_slot(scope, exam_id):
+    """
+    Takes one of the exam's concurrency slots, waiting in the queue for up to
+    `wait` seconds. Raises Rejected when the queue is full or the wait runs out.
+    """
+    store, config = get_store(), scope_config(scope)
+    key = f"{scope}:{exam_id}"
+    if store.acquire(key, config["concurrency"]):
+        return _admitted(store, scope, key, waited=False)
+    if not store.join_queue(key, config["queue"]):
+        raise _busy(store, scope, key, config, "rejected_queue_full")
+    try:
+        deadline = time.monotonic() + config["wait"]
+        while (remaining := deadline - time.monotonic()) > 0:
+            store.wait_for_release(key, remaining)
+            if store.acquire(key, config["concurrency"]):
+                return _admitted(store, scope, key, waited=True)
+    finally:
+        store.leave_queue(key)
+    raise _busy(store, scope, key, config, "rejected_wait_timeout")
+
+
+async def aacquire_exam_slot(scope, exam_id):
+    """
+    acquire_exam_slot() for async views: waits on the event loop.
+    """
+    store, config = get_store(), scope_config(scope)
+    key = f"{scope}:{exam_id}"
+    if await store.aacquire(key, config["concurrency"]):
+        return _admitted(store, scope, key, waited=False)
+    if not await store.ajoin_queue(key, config["queue"]):
+        raise await _abusy(store, scope, key, config, "rejected_queue_full")
+    try:
+        deadline = time.monotonic() + config["wait"]
+        while time.monotonic() < deadline:
+            await asyncio.sleep(POLL_SECONDS)
+            if await store.aacquire(key, config["concurrency"]):
+                return _admitted(store, scope, key, waited=True)
+    finally:
+        await store.aleave_queue(key)
+    raise await _abusy(store, scope, key, config, "rejected_wait_timeout")
+
+
+def check_user_rate(scope, user_id):
+    """
+    Seconds the user has to wait before the next request of this scope, or
+    0 when it is admitted (which takes a token).
+    """
+    config = scope_config(scope)
+    wait = get_store().take(f"{scope}:user:{user_id}", config["rate"], config["burst"])
+    if wait:
+        registry.observe_admission(scope, "rejected_rate")
+    return wait
+
+
+async def acheck_user_rate(scope, user_id):
+    """
+    check_user_rate() for async views.
+    """
+    config = scope_config(scope)
+    wait = await get_store().atake(f"{scope}:user:{user_id}", config["rate"], config["burst"])
+    if wait:
+        registry.observe_admission(scope, "rejected_rate")
+    return wait
+
+
+class UserTokenBucketThrottle(BaseThrottle):
+    """
+    DRF throttle for the per-user token bucket of the view's admission_scope.
+    """
+
+    def allow_request(self, request, view):
+        if not admission_enabled() or not request.user.is_authenticated:
+            self.retry_after = None
+            return True
+        self.retry_after = check_user_rate(view.admission_scope, request.user.pk)
+        return not self.retry_after
+
+    def wait(self):
+        return math.ceil(self.retry_after) if self.retry_after else None
+
+
+class ExamAdmissionMixin:
+    """
+    APIView mixin: after authentication, permissions and the per-user bucket
+    (UserTokenBucketThrottle), holds one of the exam's concurrency slots for
+    the rest of the request. Set `admission_scope` on the view.
+    """
+
+    admission_scope = None
+    throttle_classes = [UserTokenBucketThrottle]
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if admission_enabled():
+            try:
+                self._exam_slot = acquire_exam_slot(self.admission_scope, kwargs["exam_id"])
+            except Rejected as rejected:
+                raise Throttled(wait=rejected.retry_after)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            slot = self.__dict__.pop("_exam_slot", None)
+            if slot is not None:
+                slot.release()
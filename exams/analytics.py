@@ -0,0 +1,334 @@
+import math
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from .grading import GRADER_VERSION, get_grading_plan
+from .models import Answer, ExamStats, Question, QuestionStats, Submission
+
+STAT_FIELDS = ["responses", "correct", "score_sum", "score_sq_sum", "correct_score_sum"]
+
+HISTOGRAM_BUCKETS = 10
+BUCKET_FIELDS = [f"bucket_{index}" for index in range(HISTOGRAM_BUCKETS)]
+
+
+def _current_outcomes(exam, plan):
+    """
+    Yields the stored outcome bitmaps of an exam's submissions that match the
+    current grader and question count; None for rows that need a backfill.
+    """
+    rows = Submission.objects.filter(exam=exam).values_list("outcomes", "grader_version", "outcomes_layout")
+    for data, version, layout in rows.iterator(chunk_size=2000):
+        yield current_outcomes(data, version, layout, plan)
+
+
+def item_correct_counts(exam):
+    """
+    How many submissions got each question right, read from stored outcomes
+    without re-running grading. Returns {"counts": {question_id: correct},
+    "graded": rows counted, "stale": rows without current outcomes}.
+    """
+    plan = get_grading_plan(exam)
+    counts = [0] * plan.total
+    graded = stale = 0
+    for data in _current_outcomes(exam, plan):
+        if data is None:
+            stale += 1
+            continue
+        graded += 1
+        value = int.from_bytes(data, "little")
+        position = 0
+        while value:
+            if value & 1:
+                counts[position] += 1
+            value >>= 1
+            position += 1
+    return {"counts": dict(zip(plan.question_ids, counts)), "graded": graded, "stale": stale}
+
+
+def question_correct_count(exam, question_id):
+    """
+    Number of submissions that got one question right, e.g. "how many got Q7
+    right": an indexed count of Answer rows (see answers.py), so submissions
+    graded before that table need backfill_answers.
+    """
+    if get_grading_plan(exam).position(question_id) is None:
+        return 0
+    return Answer.objects.filter(question_id=question_id, is_correct=True).count()
+
+
+def item_deltas(plan, changes):
+    """
+    Folds grade changes into per-question deltas of the QuestionStats sums.
+
+    Each change is (old_score, old_outcomes, new_score, new_outcomes); a side
+    is None when the submission wasn't counted before (new submission) or
+    won't be after (deletion). Costs O(questions) per change.
+    """
+    deltas = [[0, 0, 0.0, 0.0, 0.0] for _ in range(plan.total)]
+    for old_score, old_outcomes, new_score, new_outcomes in changes:
+        for sign, score, data in ((-1, old_score, old_outcomes), (1, new_score, new_outcomes)):
+            if data is None:
+                continue
+            value = int.from_bytes(data, "little")
+            weighted = sign * score
+            squared = sign * score * score
+            for position, delta in enumerate(deltas):
+                delta[0] += sign
+                delta[2] += weighted
+                delta[3] += squared
+                if value >> position & 1:
+                    delta[1] += sign
+                    delta[4] += weighted
+    return deltas
+
+
+class _MissingStats(Exception):
+    pass
+
+
+def _apply_deltas(groups):
+    expected = 0
+    updated = 0
+    for question_ids, delta in groups.items():
+        expected += len(question_ids)
+        updated += QuestionStats.objects.filter(question_id__in=question_ids).update(
+            **{field: F(field) + value for field, value in zip(STAT_FIELDS, delta)}
+        )
+    if updated != expected:
+        raise _MissingStats
+
+
+def record_item_stats(plan, changes):
+    """
+    Applies grade changes to the per-question running sums. Questions sharing
+    the same delta are updated together, so one new submission costs two
+    UPDATE statements (right and wrong questions) whatever the exam size.
+    """
+    by_delta = {}
+    for question_id, delta in zip(plan.question_ids, item_deltas(plan, changes)):
+        if any(delta):
+            by_delta.setdefault(tuple(delta), []).append(question_id)
+    groups = {tuple(ids): delta for delta, ids in by_delta.items()}
+    if not groups:
+        return
+
+    try:
+        with transaction.atomic():
+            _apply_deltas(groups)
+    except _MissingStats:
+        # first grade for some questions: create their rows, then apply again
+        with transaction.atomic():
+            existing = Question.objects.filter(id__in=plan.question_ids).values_list("id", flat=True)
+            QuestionStats.objects.bulk_create(
+                [QuestionStats(question_id=question_id) for question_id in existing], ignore_conflicts=True
+            )
+            for question_ids, delta in groups.items():
+                QuestionStats.objects.filter(question_id__in=question_ids).update(
+                    **{field: F(field) + value for field, value in zip(STAT_FIELDS, delta)}
+                )
+
+
+def current_outcomes(outcomes, version, layout, plan):
+    """
+    The stored bitmap as bytes if it matches the current grader and the
+    plan's questions (layout), else None.
+    """
+    if outcomes is None or version != GRADER_VERSION or layout != plan.layout:
+        return None
+    if len(outcomes) != (plan.total + 7) // 8:
+        return None
+    return bytes(outcomes)
+
+
+def rebuild_item_stats(exam):
+    """
+    Recomputes an exam's QuestionStats from the stored scores and outcomes.
+    """
+    plan = get_grading_plan(exam)
+    deltas = [[0, 0, 0.0, 0.0, 0.0] for _ in range(plan.total)]
+    rows = Submission.objects.filter(exam=exam).values_list("score", "outcomes", "grader_version", "outcomes_layout")
+    chunk = []
+    for score, outcomes, version, layout in rows.iterator(chunk_size=2000):
+        data = current_outcomes(outcomes, version, layout, plan)
+        if data is not None:
+            chunk.append((None, None, score, data))
+        if len(chunk) >= 2000:
+            _add_deltas(deltas, item_deltas(plan, chunk))
+            chunk = []
+    _add_deltas(deltas, item_deltas(plan, chunk))
+
+    with transaction.atomic():
+        QuestionStats.objects.filter(question__exam=exam).delete()
+        QuestionStats.objects.bulk_create([
+            QuestionStats(question_id=question_id, **dict(zip(STAT_FIELDS, delta)))
+            for question_id, delta in zip(plan.question_ids, deltas)
+        ])
+    return plan.total
+
+
+def _add_deltas(totals, deltas):
+    for total, delta in zip(totals, deltas):
+        for index, value in enumerate(delta):
+            total[index] += value
+
+
+def item_analysis(stats):
+    """
+    Difficulty (percent correct) and discrimination index for one question.
+
+    Discrimination is the point-biserial correlation between getting the
+    question right and the submission's total score, computed from the
+    running sums so it never needs the individual submissions.
+    """
+    responses = stats.responses if stats else 0
+    correct = stats.correct if stats else 0
+    if not responses:
+        return {"responses": 0, "correct": 0, "difficulty": None, "discrimination": None}
+
+    p = correct / responses
+    mean = stats.score_sum / responses
+    variance = max(stats.score_sq_sum / responses - mean * mean, 0.0)
+    discrimination = None
+    if 0 < correct < responses and variance > 0:
+        mean_correct = stats.correct_score_sum / correct
+        mean_wrong = (stats.score_sum - stats.correct_score_sum) / (responses - correct)
+        discrimination = round((mean_correct - mean_wrong) / math.sqrt(variance) * math.sqrt(p * (1 - p)), 4)
+
+    return {
+        "responses": responses,
+        "correct": correct,
+        "difficulty": round(p * 100, 2),
+        "discrimination": discrimination,
+    }
+
+
+def score_bucket(score):
+    # 10-point buckets, 100 goes in the last one
+    return min(max(int(score // 10), 0), HISTOGRAM_BUCKETS - 1)
+
+
+# grading job states whose submission has no real score yet
+UNCOUNTED_JOB_STATUSES = ("pending", "running", "failed")
+
+
+def counted_submissions(exam_id):
+    """
+    Submissions that have a real score, i.e. not waiting in the grading queue.
+    """
+    return Submission.objects.filter(exam_id=exam_id).exclude(grading_job__status__in=UNCOUNTED_JOB_STATUSES)
+
+
+def record_exam_stats(exam_id, changes, refresh_bounds=True):
+    """
+    Applies score changes to the exam's aggregate row in one UPDATE.
+
+    Each change is (old_score, new_score); old_score is None for a new
+    submission and new_score None for a deleted one. Call it after the rows
+    are written: an exam without a row yet is seeded from the table. Min and max can't be
+    undone incrementally, so when a removed score was an extreme they are
+    recomputed from the indexed submissions (or later, by the caller, when
+    refresh_bounds is False). Returns True if that recompute is needed.
+    """
+    added = [new for _, new in changes if new is not None]
+    removed = [old for old, _ in changes if old is not None]
+    if not added and not removed:
+        return False
+
+    updates = {
+        "count": F("count") + len(added) - len(removed),
+        "score_sum": F("score_sum") + sum(added) - sum(removed),
+        "score_sq_sum": F("score_sq_sum") + sum(s * s for s in added) - sum(s * s for s in removed),
+    }
+    buckets = [0] * HISTOGRAM_BUCKETS
+    for score in added:
+        buckets[score_bucket(score)] += 1
+    for score in removed:
+        buckets[score_bucket(score)] -= 1
+    for field, delta in zip(BUCKET_FIELDS, buckets):
+        if delta:
+            updates[field] = F(field) + delta
+    if added:
+        low, high = Value(min(added)), Value(max(added))
+        updates["min_score"] = Least(Coalesce(F("min_score"), low), low)
+        updates["max_score"] = Greatest(Coalesce(F("max_score"), high), high)
+
+    # part of the caller's transaction, no savepoint of its own
+    with transaction.atomic(savepoint=False):
+        if not ExamStats.objects.filter(exam_id=exam_id).update(**updates):
+            # no row yet: seed it from the table, which already holds these changes
+            rebuild_exam_stats(exam_id)
+            return False
+
+        stale_bounds = False
+        if removed:
+            bounds = ExamStats.objects.filter(exam_id=exam_id).values("min_score", "max_score").first()
+            stale_bounds = bool(bounds) and (
+                bounds["min_score"] is None
+                or min(removed) <= bounds["min_score"]
+                or max(removed) >= bounds["max_score"]
+            )
+        if stale_bounds and refresh_bounds:
+            refresh_exam_bounds(exam_id)
+    return stale_bounds
+
+
+def refresh_exam_bounds(exam_id):
+    bounds = counted_submissions(exam_id).aggregate(min_score=Min("score"), max_score=Max("score"))
+    ExamStats.objects.filter(exam_id=exam_id).update(**bounds)
+
+
+def compute_exam_stats(exam_id):
+    """
+    Full recompute of an exam's aggregate row, as a dict of ExamStats fields.
+    """
+    aggregates = {
+        "count": Count("id"),
+        "score_sum": Sum("score", default=0.0),
+        "score_sq_sum": Sum(F("score") * F("score"), default=0.0),
+        "min_score": Min("score"),
+        "max_score": Max("score"),
+    }
+    for index, field in enumerate(BUCKET_FIELDS):
+        bucket = Q(score__gte=index * 10)
+        if index < HISTOGRAM_BUCKETS - 1:
+            bucket &= Q(score__lt=(index + 1) * 10)
+        aggregates[field] = Count("id", filter=bucket)
+    return counted_submissions(exam_id).aggregate(**aggregates)
+
+
+def rebuild_exam_stats(exam_id):
+    """
+    Replaces the exam's aggregate row with a full recompute.
+    """
+    values = compute_exam_stats(exam_id)
+    ExamStats.objects.update_or_create(exam_id=exam_id, defaults=values)
+    return values
+
+
+def exam_summary(stats):
+    """
+    Count, mean, min, max, standard deviation and histogram from the aggregate row.
+    """
+    count = stats.count if stats else 0
+    histogram = [
+        {
+            "range": f"{index * 10}-{index * 10 + 10}" if index < HISTOGRAM_BUCKETS - 1 else "90-100",
+            "count": getattr(stats, field) if stats else 0,
+        }
+        for index, field in enumerate(BUCKET_FIELDS)
+    ]
+    if not count:
+        return {"count": 0, "mean": None, "min": None, "max": None, "std_dev": None, "histogram": histogram}
+
+    mean = stats.score_sum / count
+    variance = max(stats.score_sq_sum / count - mean * mean, 0.0)
+    return {
+        "count": count,
+        "mean": round(mean, 2),
+        "min": stats.min_score,
+        "max": stats.max_score,
+        "std_dev": round(math.sqrt(variance), 2),
+        "histogram": histogram,
+    }
@@ -0,0 +1,159 @@
+"""
+The normalized Answer table: one (submission, question, value, is_correct)
+row per graded submission and question of the exam, written in bulk with the
+grade (submit, grading worker, regrade). Questions about one question
+("how many got Q7 right", "who left it blank", "which wrong option was
+picked most") are then indexed queries on (question, is_correct) instead of
+a scan of every submission's answers JSON.
+
+Submissions graded before the table existed get their rows from
+`manage.py backfill_answers`; submissions still in the grading queue have none.
+"""
+import time
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+
+from .analytics import counted_submissions, current_outcomes
+from .grading import get_grading_plan, outcome_at
+from .models import Answer
+
+# answers that count as leaving the question blank, stored as NULL
+BLANK_ANSWERS = (None, "", [])
+
+
+def answer_rows(plan, submission_id, answers, outcomes):
+    """
+    Answer rows (unsaved) for one graded submission: one per question of the
+    plan, read from the packed outcomes the grade was stored with.
+    """
+    answers = answers or {}
+    rows = []
+    for position, (key, _, _) in enumerate(plan.entries):
+        value = answers.get(key)
+        rows.append(Answer(
+            submission_id=submission_id,
+            question_id=plan.question_ids[position],
+            value=None if value in BLANK_ANSWERS else value,
+            is_correct=bool(outcome_at(outcomes, position)),
+        ))
+    return rows
+
+
+def write_answers(plan, graded):
+    """
+    Inserts the rows of newly graded submissions, given as
+    (submission id, answers, packed outcomes) tuples, in one bulk INSERT.
+    """
+    rows = [row for submission_id, answers, outcomes in graded for row in answer_rows(plan, submission_id, answers, outcomes)]
+    if rows:
+        Answer.objects.bulk_create(rows, batch_size=2000)
+    return len(rows)
+
+
+def replace_answers(plan, graded):
+    """
+    write_answers() for regraded submissions: their old rows are dropped first.
+    """
+    # part of the caller's transaction, no savepoint of its own
+    with transaction.atomic(savepoint=False):
+        Answer.objects.filter(submission_id__in=[submission_id for submission_id, _, _ in graded]).delete()
+        return write_answers(plan, graded)
+
+
+def missing_answers(submissions):
+    """
+    Submissions without any Answer rows yet.
+    """
+    return submissions.filter(~Exists(Answer.objects.filter(submission=OuterRef("pk"))))
+
+
+def backfill_answers(exam, chunk_size=1000):
+    """
+    Writes Answer rows for an exam's graded submissions that have none, from
+    their stored outcomes (nothing is regraded). Submissions are read in
+    chunks by id, each chunk written in its own transaction. Rows without
+    outcomes from the current grader are skipped and counted as stale;
+    backfill_outcomes stores them first. Returns a summary dict including rows/sec.
+    """
+    started = time.perf_counter()
+    plan = get_grading_plan(exam)
+    rows = missing_answers(counted_submissions(exam.id)).order_by("id").values_list(
+        "id", "answers", "outcomes", "grader_version", "outcomes_layout"
+    )
+
+    processed = written = stale = 0
+    last_id = 0
+    while plan.total:
+        chunk = list(rows.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+        processed += len(chunk)
+        graded = []
+        for pk, answers, outcomes, version, layout in chunk:
+            data = current_outcomes(outcomes, version, layout, plan)
+            if data is None:
+                stale += 1
+            else:
+                graded.append((pk, answers, data))
+        with transaction.atomic():
+            written += write_answers(plan, graded)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "exam_id": exam.id,
+        "rows": processed,
+        "written": written,
+        "stale": stale,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(processed / elapsed, 1) if elapsed else float(processed),
+    }
+
+
+def answer_summary(question_id):
+    """
+    Responses, correct and blank counts for one question, in one indexed query.
+    """
+    return Answer.objects.filter(question_id=question_id).aggregate(
+        responses=Count("id"),
+        correct=Count("id", filter=Q(is_correct=True)),
+        blank=Count("id", filter=Q(value__isnull=True)),
+    )
+
+
+def answer_frequencies(question_id, limit=None):
+    """
+    How often each distinct answer was given, most frequent first, grouped in
+    SQL: [{"value", "is_correct", "count"}]. Blank answers are left out. With
+    `limit`, only that many rows are read: text answers are mostly distinct.
+    """
+    frequencies = (
+        Answer.objects.filter(question_id=question_id, value__isnull=False)
+        .values("value", "is_correct")
+        .annotate(count=Count("id"))
+        .order_by("-count", "is_correct")
+    )
+    if limit is not None:
+        frequencies = frequencies[:limit]
+    return list(frequencies)
+
+
+def option_frequencies(question_id):
+    """
+    Multiple-choice distractor analysis: how many answers picked each option.
+    The answers are grouped by the set of options picked in SQL, a few rows
+    for an MCQ however many answered, and those groups are folded per option.
+    """
+    counts = {}
+    groups = (
+        Answer.objects.filter(question_id=question_id, value__isnull=False)
+        .values("value")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for row in groups:
+        options = row["value"] if isinstance(row["value"], list) else [row["value"]]
+        for option in {str(option) for option in options}:
+            counts[option] = counts.get(option, 0) + row["count"]
+    return [{"option": option, "count": count} for option, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))]
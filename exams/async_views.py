@@ -0,0 +1,152 @@
+"""
+Async versions of the exam-start, submit and my-submissions endpoints, served
+under /api/async/ next to the DRF views they mirror (same bodies, status codes
+and errors). DRF views are sync only, so these are plain Django async views:
+token authentication and reads use the async ORM, grading runs in a pool
+(see pools.py), and the submit transaction runs in the request's sync thread,
+since the async ORM has no transactions.
+"""
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed, Throttled
+
+from .admission import Rejected, aacquire_exam_slot, acheck_user_rate, admission_enabled
+from .authentication import CachedTokenAuthentication
+from .grading import get_grading_plan
+from .models import Draft, Exam, Submission
+from .payloads import aget_exam_payload
+from .renderers import FastJSONRenderer
+from .pools import agrade_outcomes
+from .routers import ais_pinned, replica_aliases, replica_reads
+from .serializers import StudentSubmissionValuesSerializer
+from .submissions import DuplicateSubmission, submit_exam
+
+
+def json_response(data, status=200):
+    return HttpResponse(FastJSONRenderer().render(data), status=status, content_type="application/json")
+
+
+# token auth only, so no CSRF (as with DRF's TokenAuthentication)
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncAuthenticatedView(View):
+    """
+    The async counterpart of APIView with CachedTokenAuthentication and
+    IsAuthenticated: sets request.user and request.auth, or answers 401.
+    With `admission_scope`, also applies admission control, answering 429.
+    """
+
+    authentication = CachedTokenAuthentication()
+    # admission control scope (see admission.py), None for none
+    admission_scope = None
+
+    def unauthorized(self, detail):
+        response = json_response({"detail": detail}, status=401)
+        response["WWW-Authenticate"] = self.authentication.keyword
+        return response
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            result = await self.authentication.aauthenticate(request)
+        except AuthenticationFailed as failed:
+            return self.unauthorized(failed.detail)
+        if result is None:
+            return self.unauthorized("Authentication credentials were not provided.")
+        request.user, request.auth = result
+
+        slot = None
+        if self.admission_scope is not None and admission_enabled():
+            # the same gates as ExamAdmissionMixin
+            try:
+                wait = await acheck_user_rate(self.admission_scope, request.user.pk)
+                if wait:
+                    raise Rejected(math.ceil(wait))
+                slot = await aacquire_exam_slot(self.admission_scope, kwargs["exam_id"])
+            except Rejected as rejected:
+                return self.throttled(rejected.retry_after)
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except Http404 as missing:
+            return json_response({"detail": str(missing) or "Not found."}, status=404)
+        finally:
+            if slot is not None:
+                await slot.arelease()
+
+    def throttled(self, wait):
+        response = json_response({"detail": Throttled(wait=wait).detail}, status=429)
+        response["Retry-After"] = str(wait)
+        return response
+
+
+# STUDENT VIEW EXAM (async)
+class AsyncExamDetailView(AsyncAuthenticatedView):
+    admission_scope = "exam-start"
+
+    async def get(self, request, exam_id):
+        payload = await aget_exam_payload(exam_id)
+        if payload.matches(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(payload.content, content_type="application/json")
+        response["ETag"] = payload.etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
+# STUDENT SUBMIT EXAM (async)
+class AsyncSubmitExamView(AsyncAuthenticatedView):
+    admission_scope = "submit"
+
+    async def post(self, request, exam_id):
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError as error:
+            return json_response({"detail": f"JSON parse error - {error}"}, status=400)
+        answers = data.get("answers") if isinstance(data, dict) else None
+
+        try:
+            exam = await Exam.objects.aget(id=exam_id)
+        except Exam.DoesNotExist:
+            return json_response({"detail": "No Exam matches the given query."}, status=404)
+
+        graded = None
+        # a draft was graded as it was saved, submit_exam promotes it
+        has_draft = await Draft.objects.filter(student=request.user, exam=exam).aexists()
+        if not settings.GRADING_ASYNC and not has_draft:
+            # compiled (or cached) plan first, then only CPU work in the pool
+            plan = await sync_to_async(get_grading_plan)(exam)
+            graded = plan, await agrade_outcomes(plan, answers)
+
+        try:
+            submission = await sync_to_async(submit_exam)(
+                request.user, exam, answers, queue=settings.GRADING_ASYNC, graded=graded
+            )
+        except DuplicateSubmission as duplicate:
+            return json_response(
+                {"message": "You have already submitted this exam.", "score": duplicate.existing.score},
+                status=400
+            )
+
+        if settings.GRADING_ASYNC:
+            return json_response(
+                {"message": "Submission accepted", "submission_id": submission.id, "status": "pending"},
+                status=202
+            )
+        return json_response({"message": "Submitted successfully", "score": submission.score})
+
+
+# STUDENT VIEW SUBMISSIONS (async)
+class AsyncStudentSubmissionsView(AsyncAuthenticatedView):
+    async def get(self, request):
+        # like ReplicaReadMixin: replica reads unless the student just wrote
+        use_replica = bool(replica_aliases()) and not await ais_pinned(request.user)
+        serializer = StudentSubmissionValuesSerializer()
+        with replica_reads(use_replica):
+            rows = [row async for row in serializer.values(Submission.objects.filter(student=request.user))]
+        return json_response(serializer.to_representation(rows))
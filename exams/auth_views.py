@@ -5,9 +5,9 @@ from rest_framework.views import APIView
 from rest_framework import status
 
 from rest_framework.authtoken.views import ObtainAuthToken  #for login
-from rest_framework.permissions import AllowAny
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.permissions import AllowAny, IsAdminUser
 
+from .authentication import token_cache
 from .serializers import RegisterSerializer
 from drf_spectacular.utils import extend_schema, OpenApiExample, extend_schema_view, OpenApiResponse
 
@@ -139,7 +139,6 @@ class RegisterView(APIView):
 )
 
 class LoginView(ObtainAuthToken):
-    authentication_classes = [TokenAuthentication]
     # pass  #behave exactly like the default login view no custom is add.
 
     def post(self, request, *args, **kwargs):
@@ -153,3 +152,45 @@ class LoginView(ObtainAuthToken):
             "user_id": token.user_id,
             "username": token.user.username
         })
+
+
+@extend_schema_view(
+    get=extend_schema(
+        description="Admin-only: Hit/miss counters of this process's token authentication cache.",
+        responses={
+            200: OpenApiResponse(
+                description="Token cache statistics",
+                examples=[
+                    OpenApiExample(
+                        name="TokenCacheStats",
+                        value={
+                            "size": 412,
+                            "max_size": 10000,
+                            "ttl": 60,
+                            "hits": 18230,
+                            "misses": 655,
+                            "evictions": 0,
+                            "hit_rate": 0.9653
+                        },
+                        response_only=True
+                    )
+                ]
+            ),
+            403: OpenApiResponse(
+                description="Forbidden",
+                examples=[
+                    OpenApiExample(
+                        name="Forbidden",
+                        value={"detail": "You do not have permission to perform this action."},
+                        response_only=True
+                    )
+                ]
+            ),
+        }
+    )
+)
+class TokenCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(token_cache.stats())
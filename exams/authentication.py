@@ -0,0 +1,148 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+
+class TokenCache:
+    """
+    Bounded LRU of token key -> (user, token) with a TTL.
+
+    Entries are dropped by signals when a token is deleted or regenerated or
+    its user changes (see signals.py). That only reaches this process; other
+    processes pick the change up when their entry expires, so the TTL bounds
+    how long a deactivated user can keep going there.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def ttl(self):
+        return getattr(settings, "TOKEN_AUTH_CACHE_TTL", 60)
+
+    @property
+    def max_size(self):
+        return getattr(settings, "TOKEN_AUTH_CACHE_SIZE", 10000)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def set(self, key, user, token):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, user, token)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, user, _ = self._entries.pop(key)
+        keys = self._keys_by_user.get(user.pk)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user.pk]
+
+    def invalidate_key(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that remembers token -> user for a short while, so
+    repeated requests from the same client skip the token/user query.
+    Accepts and rejects exactly the same tokens.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, user, token)
+            cached = user, token
+        user, token = cached
+        # each request gets its own instance, views may set attributes on request.user
+        return copy.copy(user), token
+
+    async def aauthenticate(self, request):
+        """
+        authenticate() for async views, on the async ORM; a cache hit doesn't
+        leave the event loop. Returns None without a token header.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 1:
+            raise AuthenticationFailed(_("Invalid token header. No credentials provided."))
+        if len(auth) > 2:
+            raise AuthenticationFailed(_("Invalid token header. Token string should not contain spaces."))
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed(_("Invalid token header. Token string should not contain invalid characters."))
+
+        cached = token_cache.get(key)
+        if cached is None:
+            model = self.get_model()
+            try:
+                token = await model.objects.select_related("user").aget(key=key)
+            except model.DoesNotExist:
+                raise AuthenticationFailed(_("Invalid token."))
+            if not token.user.is_active:
+                raise AuthenticationFailed(_("User inactive or deleted."))
+            token_cache.set(key, token.user, token)
+            cached = token.user, token
+        user, token = cached
+        return copy.copy(user), token
@@ -0,0 +1,435 @@
+import json
+import random
+import statistics
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .analytics import rebuild_exam_stats, rebuild_item_stats
+from .authentication import token_cache
+from .cohort import encode_cohort, grade_cohort, np, score_cohort
+from .compression import available_encodings, brotli
+from .grading import GRADER_VERSION, GradingPlan, clear_grading_plans, compile_question, get_grading_plan, grade_answers, grade_outcomes, pack_outcomes, percentage
+from .matching import KeywordMatcher
+from .models import Exam, Question, Submission
+from .renderers import FastJSONRenderer, orjson
+from .serializers import (
+    AdminExamSerializer,
+    AdminExamValuesSerializer,
+    AdminSubmissionSerializer,
+    AdminSubmissionValuesSerializer,
+    StudentExamSerializer,
+    StudentSubmissionSerializer,
+    StudentSubmissionValuesSerializer,
+)
+
+OPTIONS = [str(n) for n in range(2, 30)]
+WORDS = "python variable function loop value storage named data type class list string".split()
+
+
+def synthetic_plan(questions, mcq_ratio, rng):
+    entries = []
+    for question_id in range(1, questions + 1):
+        if rng.random() < mcq_ratio:
+            expected = rng.sample(OPTIONS[:6], rng.randint(1, 3))
+            entries.append((str(question_id), "mcq", compile_question("mcq", expected)))
+        else:
+            expected = " ".join(rng.sample(WORDS, 4))
+            entries.append((str(question_id), "text", compile_question("text", expected)))
+    return GradingPlan(0, 0, entries)
+
+
+def synthetic_answers(plan, count, rng):
+    cohort = []
+    for _ in range(count):
+        answers = {}
+        for key, question_type, expected in plan.entries:
+            roll = rng.random()
+            if roll < 0.05:
+                continue  # left blank
+            if question_type == "mcq":
+                answers[key] = list(expected) if roll < 0.6 else rng.sample(OPTIONS[:6], rng.randint(1, 3))
+            else:
+                answers[key] = " ".join(rng.sample(WORDS, 6))
+        cohort.append(answers)
+    return cohort
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def bench_cohort(submissions=20000, questions=40, mcq_ratio=0.9, seed=1):
+    """
+    Per-submission grade_answers against the vectorized cohort engine, both for
+    a first grading pass and for re-scoring the same cohort after a key change.
+    """
+    rng = random.Random(seed)
+    plan = synthetic_plan(questions, mcq_ratio, rng)
+    cohort = synthetic_answers(plan, submissions, rng)
+    changed_plan = GradingPlan(0, 1, [
+        (key, question_type, compile_question("mcq", rng.sample(OPTIONS[:6], 2)) if question_type == "mcq" else expected)
+        for key, question_type, expected in plan.entries
+    ])
+
+    expected, loop_seconds = timed(lambda: [grade_answers(plan, answers) for answers in cohort])
+    scores, cohort_seconds = timed(grade_cohort, plan, cohort)
+    result = {
+        "suite": "cohort",
+        "submissions": submissions,
+        "questions": questions,
+        "mcq_ratio": mcq_ratio,
+        "numpy": np is not None,
+        "parity": scores == expected,
+        "per_submission_seconds": round(loop_seconds, 4),
+        "cohort_seconds": round(cohort_seconds, 4),
+        "speedup": round(loop_seconds / cohort_seconds, 2) if cohort_seconds else None,
+    }
+    if np is None:
+        return result
+
+    expected, loop_seconds = timed(lambda: [grade_answers(changed_plan, answers) for answers in cohort])
+    encoded = encode_cohort(plan, cohort)
+    scores, rescore_seconds = timed(score_cohort, changed_plan, encoded)
+    result.update({
+        "rescore_parity": scores == expected,
+        "rescore_per_submission_seconds": round(loop_seconds, 4),
+        "rescore_cohort_seconds": round(rescore_seconds, 4),
+        "rescore_speedup": round(loop_seconds / rescore_seconds, 2) if rescore_seconds else None,
+    })
+    return result
+
+
+def synthetic_essay(size, vocabulary, rng):
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(vocabulary)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def bench_keywords(submissions=2000, answer_bytes=5000, keywords=150, phrases=20, seed=1):
+    """
+    Substring (compatibility) against token-indexed matching of long rubrics on ~5 KB answers.
+    """
+    rng = random.Random(seed)
+    vocabulary = [f"term{n}" for n in range(400)] + WORDS
+    rubric = rng.sample(vocabulary, keywords) + [" ".join(rng.sample(vocabulary, 2)) for _ in range(phrases)]
+    essays = [synthetic_essay(answer_bytes, vocabulary, rng) for _ in range(submissions)]
+
+    result = {"suite": "keywords", "answers": submissions, "answer_bytes": answer_bytes,
+              "keywords": keywords, "phrases": phrases}
+    for mode in ["substring", "token"]:
+        matcher = KeywordMatcher(rubric if mode == "token" else " ".join(rubric), mode)
+        _, seconds = timed(lambda: [matcher.matches(essay) for essay in essays])
+        result[f"{mode}_seconds"] = round(seconds, 4)
+        result[f"{mode}_answers_per_sec"] = round(submissions / seconds, 1)
+    result["speedup"] = round(result["substring_seconds"] / result["token_seconds"], 2)
+    return result
+
+
+def bench_grading(submissions=2000, seed=1):
+    """
+    Per-submission grade_answers throughput for MCQ-only, mixed and text-only
+    exams of several sizes.
+    """
+    rng = random.Random(seed)
+    cases = []
+    for questions in (10, 50, 200):
+        for mcq_ratio in (1.0, 0.5, 0.0):
+            plan = synthetic_plan(questions, mcq_ratio, rng)
+            cohort = synthetic_answers(plan, submissions, rng)
+            _, seconds = timed(lambda: [grade_answers(plan, answers) for answers in cohort])
+            cases.append({
+                "questions": questions,
+                "mcq_ratio": mcq_ratio,
+                "seconds": round(seconds, 4),
+                "submissions_per_sec": round(submissions / seconds, 1) if seconds else None,
+            })
+    return {"suite": "grading", "submissions": submissions, "cases": cases}
+
+
+# Database suites run against a throwaway test database, see the bench command.
+
+BENCH_PASSWORD = "bench-pass"
+
+
+def reset_database():
+    """
+    Empties the (throwaway) database and every cache keyed on its ids, so the
+    next suite seeds from scratch.
+    """
+    call_command("flush", interactive=False, verbosity=0)
+    cache.clear()
+    token_cache.clear()
+    clear_grading_plans()
+
+
+def seed_dataset(submissions, questions=20, seed=1):
+    """
+    One exam of `questions` questions answered by `submissions` students,
+    written with bulk_create, graded, with statistics rebuilt.
+    Returns (exam, admin, students).
+    """
+    rng = random.Random(seed)
+    admin = User.objects.create_superuser("bench-admin", password=BENCH_PASSWORD)
+    exam = Exam.objects.create(title="Benchmark exam", duration=60, course="BENCH101", metadata={"term": "bench"})
+    Question.objects.bulk_create([
+        Question(
+            exam=exam,
+            question_text=f"Question {n}",
+            question_type="mcq" if n % 4 else "text",
+            expected_answer=rng.sample(OPTIONS[:6], 2) if n % 4 else " ".join(rng.sample(WORDS, 4)),
+        )
+        for n in range(questions)
+    ])
+    exam.refresh_from_db()
+    plan = get_grading_plan(exam)
+
+    password = make_password(BENCH_PASSWORD)
+    batch = 2000
+    for start in range(0, submissions, batch):
+        count = min(batch, submissions - start)
+        students = User.objects.bulk_create([
+            User(username=f"bench-student-{start + n}", password=password) for n in range(count)
+        ])
+        rows = []
+        for student, answers in zip(students, synthetic_answers(plan, count, rng)):
+            outcomes = grade_outcomes(plan, answers)
+            rows.append(Submission(
+                student=student,
+                exam=exam,
+                answers=answers,
+                score=percentage(sum(outcomes), plan.total),
+                outcomes=pack_outcomes(outcomes),
+                grader_version=GRADER_VERSION,
+                outcomes_layout=plan.layout,
+            ))
+        Submission.objects.bulk_create(rows)
+
+    rebuild_exam_stats(exam.id)
+    rebuild_item_stats(exam)
+    return exam, admin, User.objects.filter(username__startswith="bench-student-")
+
+
+def token_client(user):
+    client = APIClient()
+    token, _ = Token.objects.get_or_create(user=user)
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+def measure(call, repeat):
+    """
+    Runs call() `repeat` times. Returns the median and p95 latency in ms, the
+    queries of the last run and the last response.
+    """
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = call()
+            if getattr(response, "streaming", False):
+                body = b"".join(response.streaming_content)
+            else:
+                body = response.content
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "status": response.status_code,
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "queries": len(queries),
+        "bytes": len(body),
+    }
+
+
+def throwaway_exam(questions=3):
+    exam = Exam.objects.create(title="Throwaway", duration=10, course="BENCH999")
+    Question.objects.bulk_create([
+        Question(exam=exam, question_text=f"Q{n}", question_type="text", expected_answer="x") for n in range(questions)
+    ])
+    return exam
+
+
+def bench_endpoints(submissions=1000, repeat=20, seed=1):
+    """
+    Latency, query count and response size of every endpoint in exams/urls.py
+    against a seeded exam with `submissions` submissions.
+    """
+    exam, admin_user, students = seed_dataset(submissions, seed=seed)
+    admin = token_client(admin_user)
+    student_user = students.first()
+    student = token_client(student_user)
+    submission = Submission.objects.filter(student=student_user).first()
+    question = exam.questions.order_by("id").first()
+    api = "/api"
+
+    # one client per submit, set up before timing
+    fresh_clients = iter([
+        token_client(user) for user in User.objects.bulk_create([
+            User(username=f"bench-fresh-{n}", password=make_password(BENCH_PASSWORD)) for n in range(repeat)
+        ])
+    ])
+    counter = iter(range(10 ** 9))
+    import_file = json.dumps([
+        {"title": f"Imported {n}", "duration": 30, "course": "BENCH201",
+         "questions": [{"question_text": f"Q{q}", "question_type": "text", "expected_answer": "x"} for q in range(20)]}
+        for n in range(5)
+    ]).encode()
+    create_payload = {
+        "title": "Created", "duration": 30, "course": "BENCH301",
+        "questions": [{"question_text": f"Q{q}", "question_type": "mcq", "expected_answer": ["2", "3"]} for q in range(10)],
+    }
+
+    def submit():
+        return next(fresh_clients).post(f"{api}/exams/{exam.id}/submit/", {"answers": {str(question.id): ["2", "3"]}}, format="json")
+
+    def delete_exam():
+        return admin.delete(f"{api}/exams/{throwaway_exam().id}/delete/")
+
+    def update_question():
+        target = throwaway_exam(1).questions.first()
+        return admin.put(f"{api}/questions/{target.id}/update/",
+                         {"question_text": "Updated", "question_type": "text", "expected_answer": "y"}, format="json")
+
+    def delete_question():
+        target = throwaway_exam(1).questions.first()
+        return admin.delete(f"{api}/questions/{target.id}/delete/")
+
+    endpoints = {
+        "register": lambda: APIClient().post(f"{api}/auth/register/", {"username": f"bench-reg-{next(counter)}", "password": BENCH_PASSWORD}, format="json"),
+        "login": lambda: APIClient().post(f"{api}/auth/login/", {"username": student_user.username, "password": BENCH_PASSWORD}, format="json"),
+        "token_cache_stats": lambda: admin.get(f"{api}/auth/token-cache/"),
+        "create_exam": lambda: admin.post(f"{api}/exams/create/", create_payload, format="json"),
+        "import_exams": lambda: admin.post(f"{api}/exams/import/", {"file": SimpleUploadedFile("bench.json", import_file)}, format="multipart"),
+        "update_exam": lambda: admin.put(f"{api}/exams/{exam.id}/update/", {"title": "Benchmark exam", "duration": 60, "course": "BENCH101"}, format="json"),
+        "delete_exam": delete_exam,
+        "update_question": update_question,
+        "delete_question": delete_question,
+        "item_analysis": lambda: admin.get(f"{api}/exams/{exam.id}/item-analysis/"),
+        "exam_stats": lambda: admin.get(f"{api}/exams/{exam.id}/stats/"),
+        "export_csv": lambda: admin.get(f"{api}/exams/{exam.id}/submissions/export/?format=csv"),
+        "exam_list": lambda: admin.get(f"{api}/exams/"),
+        "exam_list_sparse": lambda: admin.get(f"{api}/exams/?fields=id,title,course"),
+        "admin_submissions": lambda: admin.get(f"{api}/submissions/grade/Admin/"),
+        "exam_detail": lambda: student.get(f"{api}/exams/{exam.id}/"),
+        "submit": submit,
+        "student_submissions": lambda: student.get(f"{api}/submissions/grade/student"),
+        "submission_status": lambda: student.get(f"{api}/submissions/{submission.id}/status/"),
+    }
+    # one client at full speed would only time the admission control's 429s
+    with override_settings(ADMISSION_ENABLED=False):
+        results = {name: measure(call, repeat) for name, call in endpoints.items()}
+        # regrading reads every submission, once is enough
+        results["regrade"] = measure(lambda: admin.post(f"{api}/exams/{exam.id}/regrade/", {}, format="json"), 1)
+    return {"suite": "endpoints", "submissions": submissions, "repeat": repeat, "endpoints": results}
+
+
+def bench_serializers(submissions=1000, seed=1):
+    """
+    Rows per second of the list serializers over already loaded instances,
+    so only serialization is timed. Then the list endpoints' read paths end
+    to end (queries included): ModelSerializer over model instances against
+    the values() serializers, with a parity check.
+    """
+    exam, _, _ = seed_dataset(submissions, seed=seed)
+    rows = list(Submission.objects.select_related("student", "exam"))
+    exams = list(Exam.objects.prefetch_related("questions"))
+
+    result = {"suite": "serializers", "submissions": submissions}
+    for name, serializer, instances in [
+        ("admin_submission", AdminSubmissionSerializer, rows),
+        ("admin_exam", AdminExamSerializer, exams),
+        ("student_exam", StudentExamSerializer, exams),
+    ]:
+        _, seconds = timed(lambda: serializer(instances, many=True).data)
+        result[f"{name}_rows_per_sec"] = round(len(instances) / seconds, 1) if seconds else None
+
+    # more exams than the seeded one, so the exam list has rows to speak of
+    for _ in range(50):
+        throwaway_exam(20)
+    submissions_query = Submission.objects.order_by("id")
+    exams_query = Exam.objects.order_by("id")
+    for name, model_path, values_path in [
+        (
+            "admin_submissions",
+            lambda: AdminSubmissionSerializer(submissions_query.select_related("student", "exam"), many=True).data,
+            lambda: AdminSubmissionValuesSerializer().to_representation(AdminSubmissionValuesSerializer().values(submissions_query)),
+        ),
+        (
+            "student_submissions",
+            lambda: StudentSubmissionSerializer(submissions_query.select_related("student", "exam"), many=True).data,
+            lambda: StudentSubmissionValuesSerializer().to_representation(StudentSubmissionValuesSerializer().values(submissions_query)),
+        ),
+        (
+            "exam_list",
+            lambda: AdminExamSerializer(exams_query.prefetch_related("questions"), many=True).data,
+            lambda: AdminExamValuesSerializer().to_representation(AdminExamValuesSerializer().values(exams_query)),
+        ),
+    ]:
+        expected, model_seconds = timed(model_path)
+        output, values_seconds = timed(values_path)
+        count = len(output)
+        result[f"{name}_parity"] = json.loads(json.dumps(expected)) == json.loads(json.dumps(output))
+        result[f"{name}_model_rows_per_sec"] = round(count / model_seconds, 1) if model_seconds else None
+        result[f"{name}_values_rows_per_sec"] = round(count / values_seconds, 1) if values_seconds else None
+        result[f"{name}_speedup"] = round(model_seconds / values_seconds, 2) if values_seconds else None
+    return result
+
+
+def bench_encoding(submissions=1000, repeat=20, seed=1):
+    """
+    JSON encode time (stdlib JSONRenderer against FastJSONRenderer) and bytes
+    on the wire per Accept-Encoding for the exam list and the admin
+    submissions list, at their largest page size.
+    """
+    exam, admin_user, _ = seed_dataset(submissions, seed=seed)
+    for _ in range(50):
+        throwaway_exam(20)
+    admin = token_client(admin_user)
+
+    result = {"suite": "encoding", "submissions": submissions, "repeat": repeat,
+              "orjson": orjson is not None, "brotli": brotli is not None, "endpoints": {}}
+    for name, path in [
+        ("exam_list", "/api/exams/?page_size=500"),
+        ("admin_submissions", "/api/submissions/grade/Admin/?page_size=500"),
+    ]:
+        data = admin.get(path).data
+        row = {}
+        for label, renderer in (("stdlib", JSONRenderer()), ("fast", FastJSONRenderer())):
+            _, seconds = timed(lambda: [renderer.render(data) for _ in range(repeat)])
+            row[f"{label}_encode_ms"] = round(seconds / repeat * 1000, 3)
+        row["encode_speedup"] = round(row["stdlib_encode_ms"] / row["fast_encode_ms"], 2) if row["fast_encode_ms"] else None
+        for encoding in available_encodings() + ("identity",):
+            measured = measure(lambda: admin.get(path, HTTP_ACCEPT_ENCODING=encoding), repeat)
+            row[f"{encoding}_bytes"] = measured["bytes"]
+            row[f"{encoding}_median_ms"] = measured["median_ms"]
+        result["endpoints"][name] = row
+    return result
+
+
+SUITES = {
+    "cohort": bench_cohort,
+    "keywords": bench_keywords,
+    "grading": bench_grading,
+    "serializers": bench_serializers,
+    "endpoints": bench_endpoints,
+    "encoding": bench_encoding,
+}
+
+# suites that write to the database and must run in a throwaway test database
+DATABASE_SUITES = {"serializers", "endpoints", "encoding"}
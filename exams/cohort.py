@@ -0,0 +1,209 @@
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, grade_cohort falls back to per-submission grading
+    np = None
+
+from .grading import grade_answer, grade_answers, grade_outcomes, pack_outcomes, percentage
+
+# Mask for answers that can never be right (not a list).
+INVALID_MASK = 1 << 63
+# Expected mask for answer keys no answer in the cohort can match.
+UNMATCHABLE_MASK = INVALID_MASK - 1
+MAX_OPTIONS = 62
+
+
+class EncodedCohort:
+    """
+    A cohort's answers encoded independently of the answer key, so it can be
+    scored (and re-scored after a key change) with vectorized operations.
+
+    Every option seen in the cohort for an MCQ question gets one bit. `masks`
+    and `lengths` are (submissions x MCQ questions) matrices holding each
+    answer's option mask and list length. `distinct` keeps, per MCQ question,
+    the code of each submission's answer and the distinct answers themselves,
+    for keys a bitmask can't express. Text answers are kept as-is.
+    """
+
+    def __init__(self, count, layout):
+        self.count = count
+        self.layout = layout
+        self.mcq_keys = []
+        self.option_bits = []
+        self.masks = None
+        self.lengths = None
+        self.distinct = {}
+        self.text_columns = {}
+
+
+def _encode_distinct(column):
+    """
+    Returns (codes, distinct answers) for one MCQ column. Each distinct answer
+    is a tuple of str() options, the same form grading compares, or None.
+    """
+    distinct = {}
+    add = distinct.setdefault
+    try:
+        codes = [add(tuple(answer) if isinstance(answer, list) else None, len(distinct))
+                 for answer in column]
+        # 1, 1.0 and True hash alike but grade differently, so only str-only keys are safe
+        exact = all(answer is None or all(type(option) is str for option in answer) for answer in distinct)
+    except TypeError:
+        exact = False
+    if not exact:
+        distinct = {}
+        add = distinct.setdefault
+        codes = [add(tuple(map(str, answer)) if isinstance(answer, list) else None, len(distinct))
+                 for answer in column]
+    return np.array(codes, dtype=np.intp), list(distinct)
+
+
+def encode_cohort(plan, answers_list):
+    cohort = EncodedCohort(len(answers_list), [(key, question_type) for key, question_type, _ in plan.entries])
+    mask_columns = []
+    length_columns = []
+
+    for key, question_type, _ in plan.entries:
+        column = [answers.get(key) for answers in answers_list]
+        if question_type != "mcq":
+            cohort.text_columns[key] = column
+            continue
+
+        codes, distinct = _encode_distinct(column)
+        cohort.distinct[key] = (codes, distinct)
+
+        bits = {}
+        for answer in distinct:
+            for option in answer or ():
+                bits.setdefault(option.strip(), 1 << len(bits))
+        if len(bits) > MAX_OPTIONS:
+            continue
+
+        masks = []
+        lengths = []
+        for answer in distinct:
+            if answer is None:
+                masks.append(INVALID_MASK)
+                lengths.append(-1)
+                continue
+            mask = 0
+            for option in answer:
+                mask |= bits[option.strip()]
+            masks.append(mask)
+            lengths.append(len(answer))
+
+        cohort.mcq_keys.append(key)
+        cohort.option_bits.append(bits)
+        mask_columns.append(np.array(masks, dtype=np.uint64)[codes])
+        length_columns.append(np.array(lengths, dtype=np.int64)[codes])
+
+    if mask_columns:
+        cohort.masks = np.column_stack(mask_columns)
+        cohort.lengths = np.column_stack(length_columns)
+    return cohort
+
+
+def _expected_mask(bits, expected):
+    """
+    Mask a right answer has, UNMATCHABLE_MASK if nobody picked one of the
+    expected options, or None if the key repeats an option (a mask can't count).
+    """
+    if len(set(expected)) != len(expected):
+        return None
+    mask = 0
+    for option in expected:
+        if option not in bits:
+            return UNMATCHABLE_MASK
+        mask |= bits[option]
+    return mask
+
+
+def _distinct_correct(expected, codes, distinct):
+    """
+    Grades each distinct answer once and spreads the result over the cohort.
+    """
+    results = np.array(
+        [answer is not None and grade_answer("mcq", expected, list(answer)) for answer in distinct],
+        dtype=np.bool_,
+    )
+    return results[codes]
+
+
+def cohort_outcomes(plan, cohort):
+    """
+    (submissions x questions) boolean matrix of per-question correctness for an
+    encoded cohort, with columns in plan order.
+    """
+    if [(key, question_type) for key, question_type, _ in plan.entries] != cohort.layout:
+        raise ValueError("The cohort was encoded for a different set of questions.")
+
+    entries = {key: (question_type, expected) for key, question_type, expected in plan.entries}
+    columns = {}
+
+    if cohort.masks is not None:
+        expected_masks = []
+        expected_lengths = []
+        for index, key in enumerate(cohort.mcq_keys):
+            expected = entries[key][1]
+            mask = _expected_mask(cohort.option_bits[index], expected)
+            if mask is None:
+                # leave this column to the exact per-distinct-answer path
+                expected_masks.append(UNMATCHABLE_MASK)
+                expected_lengths.append(-2)
+                continue
+            columns[key] = index
+            expected_masks.append(mask)
+            expected_lengths.append(len(expected))
+
+        matches = (cohort.masks == np.array(expected_masks, dtype=np.uint64)) & (
+            cohort.lengths == np.array(expected_lengths, dtype=np.int64)
+        )
+        for key, index in list(columns.items()):
+            columns[key] = matches[:, index]
+
+    for key, (codes, distinct) in cohort.distinct.items():
+        if key not in columns:
+            columns[key] = _distinct_correct(entries[key][1], codes, distinct)
+
+    for key, column in cohort.text_columns.items():
+        question_type, expected = entries[key]
+        columns[key] = np.fromiter(
+            (grade_answer(question_type, expected, answer) for answer in column),
+            dtype=np.bool_,
+            count=cohort.count,
+        )
+
+    if not plan.entries:
+        return np.zeros((cohort.count, 0), dtype=np.bool_)
+    return np.column_stack([columns[key] for key, _, _ in plan.entries])
+
+
+def score_cohort(plan, cohort, with_outcomes=False):
+    """
+    Scores an encoded cohort against a plan, returning the same scores, in the
+    same order, as grade_answers on each submission. With with_outcomes, also
+    returns each submission's packed outcomes, as grading.pack_outcomes does.
+    """
+    outcomes = cohort_outcomes(plan, cohort)
+
+    # same rounding as grade_answers, looked up per number of correct answers
+    table = np.array([percentage(score, plan.total) for score in range(plan.total + 1)])
+    scores = table[outcomes.sum(axis=1)].tolist()
+    if not with_outcomes:
+        return scores
+    packed = np.packbits(outcomes, axis=1, bitorder="little")
+    return scores, [row.tobytes() for row in packed]
+
+
+def grade_cohort(plan, answers_list, with_outcomes=False):
+    """
+    Grades many answers dicts against one plan at once.
+    Returns the same scores, in the same order, as grade_answers on each dict,
+    plus the packed outcomes of each when with_outcomes is set.
+    """
+    answers_list = [answers or {} for answers in answers_list]
+    if np is None or not answers_list:
+        if not with_outcomes:
+            return [grade_answers(plan, answers) for answers in answers_list]
+        outcomes = [grade_outcomes(plan, answers) for answers in answers_list]
+        return [percentage(sum(row), plan.total) for row in outcomes], [pack_outcomes(row) for row in outcomes]
+    return score_cohort(plan, encode_cohort(plan, answers_list), with_outcomes)
@@ -0,0 +1,98 @@
+"""
+Response compression for CompressionMiddleware: brotli when the `brotli`
+(or `brotlicffi`) package is installed and the client accepts it, gzip
+otherwise. Gzip goes through Django's helpers, which pad each response with
+random bytes against BREACH, as GZipMiddleware does.
+"""
+from django.conf import settings
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:  # brotli is optional, responses are gzipped only
+        brotli = None
+
+# random bytes added to gzip output, as in django.middleware.gzip.GZipMiddleware
+GZIP_MAX_RANDOM_BYTES = 100
+
+
+def available_encodings():
+    # preferred first, for clients that accept several equally
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def accepted_weights(header):
+    """
+    {coding: q} from an Accept-Encoding header; a coding without q is 1.
+    """
+    weights = {}
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+
+def choose_encoding(header):
+    """
+    The content coding to use for a request's Accept-Encoding, or None to
+    send the response as is. Codings not named take the weight of `*`.
+    """
+    weights = accepted_weights(header)
+
+    def weight(coding):
+        return weights.get(coding, weights.get("*", 0.0))
+
+    best = max(available_encodings(), key=weight)
+    return best if weight(best) > 0 else None
+
+
+def brotli_quality():
+    # 4-5 is the usual setting for dynamic responses: close to gzip's speed, smaller output
+    return getattr(settings, "COMPRESSION_BROTLI_QUALITY", 4)
+
+
+def compress(content, encoding):
+    if encoding == "br":
+        return brotli.compress(content, quality=brotli_quality())
+    return compress_string(content, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+
+def compress_stream(chunks, encoding):
+    if encoding != "br":
+        yield from compress_sequence(chunks, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+        return
+    compressor = brotli.Compressor(quality=brotli_quality())
+    for chunk in chunks:
+        # flushed per chunk, so a streamed response keeps streaming
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_stream(chunks, encoding):
+    if encoding != "br":
+        async for chunk in chunks:
+            # one gzip member per chunk, as GZipMiddleware does for async streams
+            yield compress_string(chunk, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+        return
+    compressor = brotli.Compressor(quality=brotli_quality())
+    async for chunk in chunks:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
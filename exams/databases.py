@@ -0,0 +1,125 @@
+"""
+DATABASES (and the CACHES they rely on) from environment variables, used by
+settings.py.
+
+DATABASE_URL is the primary (default: the project's db.sqlite3) and
+DATABASE_REPLICA_URLS a comma-separated list of read replicas, which become
+the aliases replica1, replica2, ... CACHE_URL is the shared cache (default:
+per-process memory), which replicas require. Nothing here imports models, so
+settings can use it.
+"""
+from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+ENGINES = {
+    "sqlite": "django.db.backends.sqlite3",
+    "postgres": "django.db.backends.postgresql",
+    "postgresql": "django.db.backends.postgresql",
+    "pgsql": "django.db.backends.postgresql",
+    "mysql": "django.db.backends.mysql",
+}
+
+CACHE_BACKENDS = {
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "rediss": "django.core.cache.backends.redis.RedisCache",
+    "memcached": "django.core.cache.backends.memcached.PyMemcacheCache",
+    # a directory, shared by the processes of one host
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+}
+
+# backends whose entries are only seen by the process that wrote them
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def parse_database_url(url, base_dir=None, conn_max_age=0):
+    """
+    One DATABASES entry from a URL such as
+    `postgres://user:secret@db:5432/exams?sslmode=require` or
+    `sqlite:///db.sqlite3` (relative to base_dir) / `sqlite:////abs/path.sqlite3`.
+    Query parameters become OPTIONS.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ENGINES:
+        raise ValueError(f"Unsupported database URL scheme: {parts.scheme!r}")
+
+    config = {
+        "ENGINE": ENGINES[parts.scheme],
+        "CONN_MAX_AGE": conn_max_age,
+        "CONN_HEALTH_CHECKS": conn_max_age != 0,
+    }
+    if parts.scheme == "sqlite":
+        name = unquote(parts.path[1:] if parts.path.startswith("/") else parts.path)
+        if base_dir is not None and not Path(name).is_absolute():
+            name = Path(base_dir) / name
+        config["NAME"] = name
+    else:
+        config.update({
+            "NAME": unquote(parts.path.lstrip("/")),
+            "USER": unquote(parts.username or ""),
+            "PASSWORD": unquote(parts.password or ""),
+            "HOST": parts.hostname or "",
+            "PORT": str(parts.port or ""),
+        })
+    options = dict(parse_qsl(parts.query))
+    if options:
+        config["OPTIONS"] = options
+    return config
+
+
+def database_config(environ, base_dir):
+    """
+    DATABASES for the primary and its replicas. Replicas mirror the primary in
+    tests, so the test suite runs against one database whatever is configured.
+    """
+    conn_max_age = int(environ.get("DATABASE_CONN_MAX_AGE", 60))
+    databases = {
+        "default": parse_database_url(environ.get("DATABASE_URL", "sqlite:///db.sqlite3"), base_dir, conn_max_age),
+    }
+    replica_urls = [url.strip() for url in environ.get("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    for number, url in enumerate(replica_urls, start=1):
+        replica = parse_database_url(url, base_dir, conn_max_age)
+        replica["TEST"] = {"MIRROR": "default"}
+        databases[f"replica{number}"] = replica
+    return databases
+
+
+def cache_config(environ):
+    """
+    CACHES from CACHE_URL: `redis://cache:6379/0` (or rediss://),
+    `memcached://cache:11211`, `file:///var/tmp/exams-cache`, or unset for
+    the per-process memory cache.
+    """
+    url = environ.get("CACHE_URL", "")
+    if not url:
+        return {"default": {"BACKEND": CACHE_BACKENDS["locmem"]}}
+    parts = urlsplit(url)
+    if parts.scheme not in CACHE_BACKENDS:
+        raise ValueError(f"Unsupported cache URL scheme: {parts.scheme!r}")
+    config = {"BACKEND": CACHE_BACKENDS[parts.scheme]}
+    if parts.scheme == "memcached":
+        config["LOCATION"] = parts.netloc
+    elif parts.scheme == "file":
+        config["LOCATION"] = unquote(parts.path)
+    elif parts.scheme != "locmem":
+        config["LOCATION"] = url
+    return {"default": config}
+
+
+def require_shared_cache(databases, caches):
+    """
+    Replica reads keep each user's read-your-writes pin (exams.routers) in the
+    default cache, so every process must see it: a per-process cache would
+    let the next request, on another worker, read a lagging replica.
+    """
+    replicas = [alias for alias in databases if alias != "default"]
+    if replicas and caches["default"]["BACKEND"] in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            "DATABASE_REPLICA_URLS needs a cache shared by all processes (set CACHE_URL), "
+            "the primary pin after a write is kept there"
+        )
@@ -0,0 +1,91 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_FIELDS = ["id", "student_id", "student__username", "exam_id", "score", "created_at"]
+EXPORT_COLUMNS = ["id", "student_id", "student_name", "exam_id", "score", "created_at"]
+
+# rows fetched per database round trip and joined per yielded chunk
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """
+    File-like object whose write() hands the line back, so csv.writer can
+    format rows one at a time without a buffer.
+    """
+
+    def write(self, value):
+        return value
+
+
+def answer_cell(value):
+    # plain text stays as is, MCQ lists and anything else become JSON
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def export_rows(submissions, question_ids=None):
+    """
+    Yields one dict per submission (of an exam's or a course's queryset),
+    built from a values() projection streamed with iterator(), so no model
+    instances are created and memory stays flat. With question_ids, answers
+    are flattened into one `q_<id>` key per question instead of a single
+    `answers` JSON value; questions of another exam are left empty.
+    """
+    rows = (
+        submissions.order_by("id")
+        .values_list(*EXPORT_FIELDS, "answers")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    for *values, answers in rows:
+        row = dict(zip(EXPORT_COLUMNS, values))
+        answers = answers or {}
+        if question_ids is None:
+            row["answers"] = answers
+        else:
+            for question_id in question_ids:
+                row[f"q_{question_id}"] = answers.get(str(question_id))
+        yield row
+
+
+def export_columns(question_ids=None):
+    if question_ids is None:
+        return EXPORT_COLUMNS + ["answers"]
+    return EXPORT_COLUMNS + [f"q_{question_id}" for question_id in question_ids]
+
+
+def _chunked(lines):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= EXPORT_CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def stream_csv(submissions, question_ids=None):
+    writer = csv.writer(Echo())
+    columns = export_columns(question_ids)
+
+    def lines():
+        yield writer.writerow(columns)
+        for row in export_rows(submissions, question_ids):
+            row["created_at"] = row["created_at"].isoformat()
+            yield writer.writerow([
+                answer_cell(row[column]) if column == "answers" or column.startswith("q_") else row[column]
+                for column in columns
+            ])
+
+    return _chunked(lines())
+
+
+def stream_ndjson(submissions, question_ids=None):
+    encoder = DjangoJSONEncoder()
+    return _chunked(encoder.encode(row) + "\n" for row in export_rows(submissions, question_ids))
@@ -0,0 +1,19 @@
+import json
+
+from django.db.models import Q
+
+
+def metadata_filter(key, value):
+    """
+    Q for exams whose metadata holds value at key. A query string value is
+    always text, so when it parses as JSON (2026, true) that value matches too.
+    """
+    lookup = f"metadata__{key}"
+    condition = Q(**{lookup: value})
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        return condition
+    if parsed != value:
+        condition |= Q(**{lookup: parsed})
+    return condition
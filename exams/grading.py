@@ -1,55 +1,257 @@
+import hashlib
 import json
+import threading
+from collections import OrderedDict
 
-def grade_submission(exam, submission):
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .matching import KeywordMatcher, text_match_mode
+from .metrics import timed_grading
+from .models import Exam
+
+
+# Bump when grading rules change, so stored outcomes from older rules can be found.
+GRADER_VERSION = 1
+
+
+class GradingPlan:
     """
-    Grades a student's submission for a given exam.
-    Returns the score as a percentage (0-100).
+    Compiled, query-free view of an exam's questions.
+    Each entry is (question_key, question_type, expected), where expected is
+    the pre-sorted MCQ answer list or the compiled KeywordMatcher.
     """
 
-    total_questions = exam.questions.count()
-    if total_questions == 0:
-        return 0.0
+    def __init__(self, exam_id, version, entries):
+        self.exam_id = exam_id
+        self.version = version
+        self.entries = tuple(entries)
+        # question key -> (question_type, expected), for grading single answers
+        self.by_key = {key: (question_type, expected) for key, question_type, expected in self.entries}
+        # identifies the question order stored outcomes are packed in: adding or deleting a
+        # question shifts the later bits without necessarily changing the byte length
+        self.layout = hashlib.blake2b(
+            ",".join(key for key, _, _ in self.entries).encode(), digest_size=8
+        ).hexdigest()
+
+    @property
+    def total(self):
+        return len(self.entries)
+
+    @property
+    def question_ids(self):
+        return [int(key) for key, _, _ in self.entries]
+
+    def position(self, question_id):
+        """
+        Bit position of a question in stored outcomes, or None if it isn't part of the plan.
+        """
+        key = str(question_id)
+        for position, (entry_key, _, _) in enumerate(self.entries):
+            if entry_key == key:
+                return position
+        return None
+
+
+def compile_question(question_type, expected_answer):
+    """
+    Parses a question's expected answer once, the same way grading used to
+    do it for every submission.
+    """
+    if question_type == "text":
+        return KeywordMatcher(expected_answer, text_match_mode())
+
+    if question_type == "mcq":
+        try:
+            # Load expected answer as list
+            expected_list = json.loads(expected_answer) if isinstance(expected_answer, str) else expected_answer
+            return sorted([str(x).strip() for x in expected_list])
+        except:
+            return []
+
+    return None
+
+
+def compile_grading_plan(exam):
+    questions = exam.questions.order_by("id").values_list("id", "question_type", "expected_answer")
+    entries = [
+        (str(question_id), question_type, compile_question(question_type, expected_answer))
+        for question_id, question_type, expected_answer in questions
+    ]
+    return GradingPlan(exam.id, exam.content_version, entries)
+
+
+# In-process LRU of compiled plans, keyed by (exam id, content version, text match mode).
+_plan_cache = OrderedDict()
+_plan_cache_lock = threading.Lock()
+
+
+def get_grading_plan(exam):
+    """
+    Returns the compiled plan for the exam, compiling it on a cache miss.
+    A warm lookup issues no queries.
+    """
+    key = (exam.id, exam.content_version, text_match_mode())
+    with _plan_cache_lock:
+        plan = _plan_cache.get(key)
+        if plan is not None:
+            _plan_cache.move_to_end(key)
+            return plan
+
+    plan = compile_grading_plan(exam)
+
+    max_size = getattr(settings, "GRADING_PLAN_CACHE_SIZE", 256)
+    with _plan_cache_lock:
+        _plan_cache[key] = plan
+        _plan_cache.move_to_end(key)
+        while len(_plan_cache) > max_size:
+            _plan_cache.popitem(last=False)
+    return plan
+
+
+def evict_grading_plan(exam_id):
+    with _plan_cache_lock:
+        for key in [key for key in _plan_cache if key[0] == exam_id]:
+            del _plan_cache[key]
+
+
+def clear_grading_plans():
+    with _plan_cache_lock:
+        _plan_cache.clear()
+
+
+def grade_answer(question_type, expected, student_answer):
+    """
+    Returns True if a single answer is correct for a compiled question.
+    """
+    # Skip if no answer provided
+    if student_answer is None:
+        return False
+
+    #  text question
+    if question_type == "text":
+        return expected.matches(student_answer)
+
+    # multiple choice questions
+    if question_type == "mcq":
+        if not isinstance(student_answer, list):
+            # skip, if student sends a wrong type,
+            return False
+        student_list = sorted([str(x).strip() for x in student_answer])
+        return student_list == expected
+
+    return False
+
+
+def grade_outcomes(plan, answers):
+    """
+    Per-question correctness of an answers dict, in plan (question id) order.
+    """
+    return [grade_answer(question_type, expected, answers.get(key)) for key, question_type, expected in plan.entries]
+
 
-    score = 0
+def grading_key(exam):
+    """
+    Identifies the rules answers are graded under: the exam's content, the
+    text match mode and the grader. Drafts graded under another key are stale.
+    """
+    return f"{exam.content_version}:{text_match_mode()}:{GRADER_VERSION}"
 
-    for question in exam.questions.all():
-        # Fetch the student's answer for this question
-        student_answer = submission.answers.get(str(question.id))
 
-        # Skip if no answer provided
-        if student_answer is None:
+def grade_changes(plan, answers, outcomes, changes):
+    """
+    Applies a delta of answers to a draft, grading only what changed.
+    `answers` and `outcomes` ({question key: correct}) are updated in place;
+    a None answer removes it. Answers to questions outside the plan are kept
+    but not graded, as grade_outcomes ignores them.
+    """
+    for key, answer in changes.items():
+        key = str(key)
+        if answer is None:
+            answers.pop(key, None)
+            outcomes.pop(key, None)
             continue
+        if key in answers and answers[key] == answer and (key in outcomes or key not in plan.by_key):
+            continue
+        answers[key] = answer
+        entry = plan.by_key.get(key)
+        if entry is not None:
+            outcomes[key] = grade_answer(entry[0], entry[1], answer)
+
+
+def ordered_outcomes(plan, outcomes):
+    """
+    A draft's outcomes in plan order, as grade_outcomes returns them.
+    """
+    return [outcomes.get(key, False) for key, _, _ in plan.entries]
 
-        #  text question
-        if question.question_type == "text":
-            expected = str(question.expected_answer).strip().lower()
-            student_text = str(student_answer).strip().lower()
-
-            # Split expected answer into keywords
-            expected_keywords = expected.split()
-            match_count = sum(1 for kw in expected_keywords if kw in student_text)
-
-            # If 60% or more keywords match, count as correct
-            if len(expected_keywords) == 0 or match_count / len(expected_keywords) >= 0.6:
-                score += 1
-
-        # multiple choice questions
-        elif question.question_type == "mcq":
-            try:
-                # Load expected answer as list
-                expected_list = json.loads(question.expected_answer) if isinstance(question.expected_answer, str) else question.expected_answer
-                expected_list = sorted([str(x).strip() for x in expected_list])
-            except:
-                expected_list = []
-
-            if isinstance(student_answer, list):
-                student_list = sorted([str(x).strip() for x in student_answer])
-            else:
-                # skip, if student sends a wrong type,
-                continue
-
-            if student_list == expected_list:
-                score += 1
 
+def percentage(score, total):
+    if total == 0:
+        return 0.0
     # Return percentage score rounded to 2 decimal places
-    return round((score / total_questions) * 100, 2)
+    return round((score / total) * 100, 2)
+
+
+def grade_answers(plan, answers):
+    """
+    Grades an answers dict against a compiled plan without touching the database.
+    Returns the score as a percentage (0-100).
+    """
+    return percentage(sum(grade_outcomes(plan, answers)), plan.total)
+
+
+def pack_outcomes(outcomes):
+    """
+    Packs per-question booleans into bytes, question i at bit i % 8 of byte i // 8.
+    """
+    data = bytearray((len(outcomes) + 7) // 8)
+    for position, correct in enumerate(outcomes):
+        if correct:
+            data[position >> 3] |= 1 << (position & 7)
+    return bytes(data)
+
+
+def outcome_at(data, position):
+    """
+    Reads one question's stored outcome, or None if the bitmap is too short.
+    """
+    if data is None or position >> 3 >= len(data):
+        return None
+    return bool(data[position >> 3] >> (position & 7) & 1)
+
+
+def count_correct(data):
+    return int.from_bytes(data, "little").bit_count()
+
+
+@timed_grading
+def grade_submission(exam, submission):
+    """
+    Grades a student's submission for a given exam.
+    Also sets the submission's per-question outcomes and grader version (not saved).
+    Returns the score as a percentage (0-100).
+    """
+    plan = get_grading_plan(exam)
+    return apply_outcomes(plan, submission, grade_outcomes(plan, submission.answers))
+
+
+def apply_outcomes(plan, submission, outcomes):
+    """
+    Stores already computed outcomes on the submission (not saved) and
+    returns the score; grading done elsewhere (see pools.py) ends here.
+    """
+    submission.outcomes = pack_outcomes(outcomes)
+    submission.grader_version = GRADER_VERSION
+    submission.outcomes_layout = plan.layout
+    return percentage(sum(outcomes), plan.total)
+
+
+def invalidate_grading_plan(exam_id):
+    """
+    Bumps the exam's content version (and updated_at) so every process
+    recompiles its plan, and drops this process's stale entries straight away.
+    """
+    Exam.objects.filter(pk=exam_id).update(content_version=F("content_version") + 1, updated_at=timezone.now())
+    evict_grading_plan(exam_id)
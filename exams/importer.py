@@ -0,0 +1,309 @@
+import csv
+import io
+import json
+import re
+import time
+
+from django.db import transaction
+
+from .models import Exam, Question
+from .serializers import AdminExamSerializer, AdminQuestionSerializer
+
+IMPORT_FORMATS = ("json", "ndjson", "csv")
+IMPORT_BATCH_SIZE = 500
+
+# characters read from the file at a time while parsing JSON
+READ_SIZE = 1 << 16
+
+CSV_EXAM_FIELDS = ("title", "duration", "course")
+CSV_QUESTION_FIELDS = ("question_text", "question_type", "expected_answer")
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+def import_format(filename, default=None):
+    """
+    Guesses the format from a file name: .json, .ndjson/.jsonl or .csv.
+    """
+    extension = filename.rsplit(".", 1)[-1].lower() if filename and "." in filename else ""
+    if extension == "jsonl":
+        return "ndjson"
+    return extension if extension in IMPORT_FORMATS else default
+
+
+def text_stream(upload):
+    # decodes lazily, so large uploads are never read whole; utf-8-sig drops a BOM
+    return io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+
+
+class _ValueScanner:
+    """
+    Finds where the object or array at the start of a growing buffer ends,
+    keeping its place between calls, so each character is looked at once
+    however many chunks the value spans.
+    """
+
+    STRING_SPECIAL = re.compile(r'["\\]')
+    SPECIAL = re.compile(r'["\[\]{}]')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.position = 0
+        self.depth = 0
+        self.in_string = False
+
+    def scan(self, buffer):
+        """
+        The end index of the value, or None if the buffer doesn't hold all of it yet.
+        """
+        while True:
+            pattern = self.STRING_SPECIAL if self.in_string else self.SPECIAL
+            match = pattern.search(buffer, self.position)
+            if match is None:
+                self.position = max(self.position, len(buffer))
+                return None
+            char = match.group()
+            self.position = match.end()
+            if self.in_string:
+                if char == "\\":
+                    # skip the escaped character, even if it is still to be read
+                    self.position += 1
+                else:
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "[{":
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    return self.position
+
+
+def _json_records(stream):
+    """
+    Yields the exam objects of a JSON list (or a single exam object) one at a
+    time, reading the file in chunks with JSONDecoder.raw_decode instead of
+    loading it whole. An object is decoded once, when its closing brace has
+    been read.
+    """
+    decoder = json.JSONDecoder()
+    scanner = _ValueScanner()
+    buffer = ""
+    eof = False
+    state = "start"
+
+    while True:
+        buffer = buffer.lstrip()
+        if not buffer:
+            if eof:
+                break
+            chunk = stream.read(READ_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        if state == "start":
+            state = "items" if buffer[0] == "[" else "single"
+            if state == "items":
+                buffer = buffer[1:]
+            continue
+        if state == "items" and buffer[0] == ",":
+            buffer = buffer[1:]
+            continue
+        if state == "items" and buffer[0] == "]":
+            buffer = buffer[1:]
+            state = "done"
+            continue
+        if state == "done":
+            raise ImportFormatError("Unexpected data after the list of exams")
+
+        if buffer[0] in "[{" and scanner.scan(buffer) is None:
+            if eof:
+                raise ImportFormatError("Invalid JSON: unexpected end of file")
+            # the object continues in the next chunk
+            chunk = stream.read(READ_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError as error:
+            if eof or buffer[0] in "[{":
+                raise ImportFormatError(f"Invalid JSON: {error}")
+            # a number or literal may continue in the next chunk
+            chunk = stream.read(READ_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+        scanner.reset()
+        buffer = buffer[end:]
+        if state == "single":
+            state = "done"
+        yield record
+
+    if state == "items":
+        raise ImportFormatError("Invalid JSON: the list of exams is not closed")
+
+
+def _ndjson_records(stream):
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ImportFormatError(f"Invalid JSON on line {number}: {error}")
+
+
+def _csv_value(value):
+    # expected answers and metadata may be JSON ("[\"2\", \"3\"]"), anything else is text
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _csv_records(stream):
+    """
+    One row per question. Consecutive rows with the same `exam` key (or, without
+    that column, the same title, duration and course) make up one exam.
+    """
+    reader = csv.DictReader(stream)
+    try:
+        yield from _csv_rows_to_records(reader)
+    except csv.Error as error:
+        raise ImportFormatError(f"Invalid CSV after line {reader.line_num}: {error}")
+
+
+def _csv_rows_to_records(reader):
+    missing = [field for field in CSV_EXAM_FIELDS + CSV_QUESTION_FIELDS if field not in (reader.fieldnames or [])]
+    if missing:
+        raise ImportFormatError(f"CSV is missing columns: {', '.join(missing)}")
+
+    key = record = None
+    for row in reader:
+        row_key = row.get("exam") or tuple(row[field] for field in CSV_EXAM_FIELDS)
+        if row_key != key:
+            if record is not None:
+                yield record
+            key = row_key
+            record = {field: row[field] for field in CSV_EXAM_FIELDS}
+            if row.get("metadata"):
+                record["metadata"] = _csv_value(row["metadata"])
+            record["questions"] = []
+        if row.get("question_text"):
+            question = {field: row[field] for field in CSV_QUESTION_FIELDS}
+            question["expected_answer"] = _csv_value(question["expected_answer"])
+            record["questions"].append(question)
+    if record is not None:
+        yield record
+
+
+def _decoded(records):
+    # text_stream() decodes as it reads, so bad bytes surface in the middle of parsing
+    count = 0
+    try:
+        for record in records:
+            yield record
+            count += 1
+    except UnicodeDecodeError as error:
+        byte = error.object[error.start:error.start + 1].hex()
+        raise ImportFormatError(f"The file is not UTF-8 text: byte 0x{byte} after {count} exams ({error.reason})")
+
+
+def exam_records(stream, input_format):
+    """
+    Yields one exam dict (title, duration, course, metadata, questions) at a
+    time from a text stream in the given format.
+    """
+    if input_format == "json":
+        return _decoded(_json_records(stream))
+    if input_format == "ndjson":
+        return _decoded(_ndjson_records(stream))
+    if input_format == "csv":
+        return _decoded(_csv_records(stream))
+    raise ImportFormatError(f"Unknown format {input_format!r}, expected one of: {', '.join(IMPORT_FORMATS)}")
+
+
+def validate_exam(record, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Validates an exam record with the admin serializers, its questions in
+    batches. Returns (exam fields, question dicts, errors).
+    """
+    if not isinstance(record, dict):
+        return None, None, {"non_field_errors": ["Expected an exam object"]}
+
+    questions = record.get("questions", [])
+    if not isinstance(questions, list):
+        return None, None, {"questions": ["Expected a list of questions"]}
+
+    exam = AdminExamSerializer(data={**record, "questions": []})
+    if not exam.is_valid():
+        return None, None, exam.errors
+    fields = dict(exam.validated_data)
+    fields.pop("questions", None)
+
+    validated = []
+    for start in range(0, len(questions), batch_size):
+        batch = AdminQuestionSerializer(data=questions[start:start + batch_size], many=True)
+        if not batch.is_valid():
+            errors = {start + index: error for index, error in enumerate(batch.errors) if error}
+            return None, None, {"questions": errors}
+        validated.extend(batch.validated_data)
+    return fields, validated, None
+
+
+def import_exams(records, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Creates exams from an iterable of exam dicts. Each exam is validated, then
+    written with one Exam INSERT and bulk_create for its questions inside its
+    own transaction, so a bad exam never leaves half its questions behind and
+    doesn't stop the others. A format error stops the import; exams before it
+    are kept and the error is reported.
+    """
+    started = time.perf_counter()
+    results = []
+    created = questions_created = 0
+    error = None
+
+    try:
+        for index, record in enumerate(records):
+            fields, questions, errors = validate_exam(record, batch_size)
+            title = record.get("title") if isinstance(record, dict) else None
+            if errors:
+                results.append({"index": index, "title": title, "status": "invalid", "errors": errors})
+                continue
+
+            with transaction.atomic():
+                exam = Exam.objects.create(**fields)
+                Question.objects.bulk_create(
+                    [Question(exam=exam, **question) for question in questions], batch_size=batch_size
+                )
+            created += 1
+            questions_created += len(questions)
+            results.append({
+                "index": index,
+                "title": exam.title,
+                "status": "created",
+                "exam_id": exam.id,
+                "questions": len(questions),
+            })
+    except ImportFormatError as format_error:
+        error = str(format_error)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "exams": created,
+        "invalid": sum(1 for result in results if result["status"] == "invalid"),
+        "questions": questions_created,
+        "seconds": round(elapsed, 3),
+        "questions_per_sec": round(questions_created / elapsed, 1) if elapsed else float(questions_created),
+        "error": error,
+        "results": results,
+    }
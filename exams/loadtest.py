@@ -0,0 +1,136 @@
+"""
+Concurrent-connection load test against running servers, for comparing the
+WSGI stack (DRF views) with the ASGI one (/api/async/ views), e.g.
+
+    export ADMISSION_ENABLED=0  # one user at full speed would only measure the rate limit
+    gunicorn assessment_engine.wsgi -w 1 --threads 8 -b 127.0.0.1:8000
+    uvicorn assessment_engine.asgi:application --workers 1 --port 8001
+    python manage.py loadtest --seed --wsgi-url http://127.0.0.1:8000 --asgi-url http://127.0.0.1:8001
+
+Every connection is its own keep-alive HTTP/1.1 client sending requests back
+to back, so `connections` is the number of requests in flight. The driver is
+plain asyncio, so it holds thousands of connections from one process.
+"""
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+# endpoint -> (sync path, async path)
+ENDPOINTS = {
+    "detail": ("/api/exams/{exam_id}/", "/api/async/exams/{exam_id}/"),
+    "submissions": ("/api/submissions/grade/student", "/api/async/submissions/grade/student"),
+}
+
+
+class HTTPConnection:
+    """
+    A minimal keep-alive HTTP/1.1 GET client over asyncio streams.
+    """
+
+    def __init__(self, url, headers):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.headers = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\n{self.headers}\r\n".encode("latin1"))
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if status in (204, 304):
+            pass
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif "content-length" in headers:
+            await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            await self.reader.read()
+            self.close()
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def _client(url, path, headers, deadline, timeout, results):
+    connection = HTTPConnection(url, headers)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(connection.get(path), timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+                results["errors"] += 1
+                connection.close()
+                # don't spin on a refused connection
+                await asyncio.sleep(0.05)
+                continue
+            if 200 <= status < 400:
+                results["latencies"].append(time.perf_counter() - started)
+            else:
+                results["errors"] += 1
+    finally:
+        connection.close()
+
+
+async def _run_level(url, path, headers, connections, duration, timeout):
+    results = {"latencies": [], "errors": 0}
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        _client(url, path, headers, deadline, timeout, results) for _ in range(connections)
+    ])
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(results["latencies"])
+    total = len(latencies) + results["errors"]
+
+    def percentile(fraction):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000, 2) if latencies else None
+
+    return {
+        "connections": connections,
+        "requests": total,
+        "ok": len(latencies),
+        "errors": results["errors"],
+        "error_rate": round(results["errors"] / total, 4) if total else None,
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "median_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def run_load(url, path, token, levels, duration=10.0, timeout=5.0, slo_ms=500.0, max_error_rate=0.01):
+    """
+    Runs each concurrency level in turn against url + path. `capacity` is
+    the largest level that stayed within the error rate and p95 SLO.
+    """
+    headers = {"Authorization": f"Token {token}", "Connection": "keep-alive"}
+    runs = [asyncio.run(_run_level(url, path, headers, level, duration, timeout)) for level in levels]
+    capacity = None
+    for run in runs:
+        if run["ok"] and run["error_rate"] <= max_error_rate and run["p95_ms"] <= slo_ms:
+            capacity = run["connections"]
+    return {"url": url, "path": path, "capacity": capacity, "levels": runs}
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from exams.answers import backfill_answers, missing_answers
+from exams.models import Exam, Submission
+
+
+class Command(BaseCommand):
+    help = (
+        "Write Answer rows for submissions graded before the table existed, from their stored outcomes. "
+        "Run backfill_outcomes first for submissions graded by an older grader."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--exam", type=int, help="Only backfill this exam.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        exam_ids = missing_answers(Submission.objects.all()).values_list("exam_id", flat=True).distinct()
+        if options["exam"] is not None:
+            exam_ids = exam_ids.filter(exam_id=options["exam"])
+
+        stale = 0
+        for exam in Exam.objects.filter(id__in=list(exam_ids)).order_by("id"):
+            result = backfill_answers(exam, chunk_size=options["chunk_size"])
+            stale += result["stale"]
+            self.stdout.write(
+                f"Exam {exam.id}: {result['rows']} submissions, {result['written']} answer rows written, "
+                f"{result['stale']} stale ({result['rows_per_sec']} rows/sec)"
+            )
+        if stale:
+            self.stdout.write(self.style.WARNING(f"{stale} submissions need backfill_outcomes first"))
+        self.stdout.write(self.style.SUCCESS("Backfill complete"))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from exams.models import Exam, Submission
+from exams.regrade import regrade_exam
+
+
+class Command(BaseCommand):
+    help = (
+        "Store per-question outcomes for submissions graded before outcomes were kept, "
+        "by an older grader, or before the exam's questions last changed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--exam", type=int, help="Only backfill this exam.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--workers", type=int, default=0, help="Grade chunks in a process pool of this size.")
+
+    def handle(self, *args, **options):
+        # stale layouts depend on each exam's current questions, so regrade_exam
+        # (stale_only) narrows the rows down per exam
+        exam_ids = Submission.objects.values_list("exam_id", flat=True).distinct()
+        if options["exam"] is not None:
+            exam_ids = exam_ids.filter(exam_id=options["exam"])
+
+        for exam in Exam.objects.filter(id__in=list(exam_ids)).order_by("id"):
+            result = regrade_exam(
+                exam, chunk_size=options["chunk_size"], workers=options["workers"], stale_only=True
+            )
+            self.stdout.write(
+                f"Exam {exam.id}: backfilled {result['rows']} submissions "
+                f"({result['updated']} rows written, {result['rows_per_sec']} rows/sec)"
+            )
+        self.stdout.write(self.style.SUCCESS("Backfill complete"))
@@ -0,0 +1,80 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.test.runner import DiscoverRunner
+
+from exams.benchmarks import DATABASE_SUITES, SUITES, reset_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Run benchmarks on synthetic data and print the timings. Suites that need data "
+        "(serializers, endpoints, encoding) seed a throwaway test database, never the real one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("suites", nargs="*", help=f"Suites to run (default: all of {', '.join(sorted(SUITES))}).")
+        parser.add_argument("--submissions", type=int, help="Cohort size for the grading suites, dataset size for the database ones.")
+        parser.add_argument("--repeat", type=int, help="Requests per endpoint for the endpoints suite.")
+        parser.add_argument("--output", help="Also write the results as JSON to this file, for comparing commits.")
+
+    def handle(self, *args, **options):
+        names = options["suites"] or sorted(SUITES)
+        unknown = [name for name in names if name not in SUITES]
+        if unknown:
+            raise CommandError(f"Unknown suite(s): {', '.join(unknown)}")
+
+        results = []
+        needs_database = any(name in DATABASE_SUITES for name in names)
+        if needs_database:
+            setup_test_environment()
+            runner = DiscoverRunner(verbosity=0, interactive=False)
+            old_config = runner.setup_databases()
+        try:
+            for name in names:
+                kwargs = {}
+                if options["submissions"]:
+                    kwargs["submissions"] = options["submissions"]
+                if options["repeat"] and name == "endpoints":
+                    kwargs["repeat"] = options["repeat"]
+                result = SUITES[name](**kwargs)
+                if name in DATABASE_SUITES:
+                    reset_database()
+                results.append(result)
+                self.write_result(result)
+        finally:
+            if needs_database:
+                runner.teardown_databases(old_config)
+                teardown_test_environment()
+
+        if options["output"]:
+            report = {
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "results": results,
+            }
+            with open(options["output"], "w") as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def write_result(self, result):
+        flat = {key: value for key, value in result.items() if not isinstance(value, (list, dict))}
+        self.stdout.write(", ".join(f"{key}={value}" for key, value in flat.items()))
+        for case in result.get("cases", []):
+            self.stdout.write("  " + ", ".join(f"{key}={value}" for key, value in case.items()))
+        for name, values in result.get("endpoints", {}).items():
+            self.stdout.write(f"  {name}: " + ", ".join(f"{key}={value}" for key, value in values.items()))
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
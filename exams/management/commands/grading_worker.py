@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from exams.worker import claim_jobs, process_jobs, release_stale_jobs, worker_name
+
+
+class Command(BaseCommand):
+    help = "Grade queued submissions (GRADING_ASYNC mode). Several workers can run side by side."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--stale-after", type=int, default=300, help="Requeue running jobs claimed longer ago than this (seconds).")
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit.")
+
+    def handle(self, *args, **options):
+        worker = worker_name()
+        self.stdout.write(f"Grading worker {worker} started")
+        total = 0
+        try:
+            while True:
+                release_stale_jobs(options["stale_after"])
+                jobs = claim_jobs(worker, options["batch_size"])
+                if jobs:
+                    total += process_jobs(jobs)
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Graded {total} submissions"))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from exams.importer import IMPORT_BATCH_SIZE, IMPORT_FORMATS, exam_records, import_exams, import_format
+
+
+class Command(BaseCommand):
+    help = "Import exams and their questions from a JSON, NDJSON or CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", dest="input_format", help="json, ndjson or csv (default: from the file extension).")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Questions validated and inserted per batch.")
+
+    def handle(self, *args, **options):
+        input_format = options["input_format"] or import_format(options["path"])
+        if input_format not in IMPORT_FORMATS:
+            raise CommandError(f"Can't tell the format of {options['path']}, pass --format ({', '.join(IMPORT_FORMATS)})")
+
+        try:
+            stream = open(options["path"], encoding="utf-8-sig", newline="")
+        except OSError as error:
+            raise CommandError(str(error))
+        with stream:
+            report = import_exams(exam_records(stream, input_format), batch_size=options["batch_size"])
+
+        for result in report["results"]:
+            if result["status"] == "created":
+                self.stdout.write(f"#{result['index']} {result['title']}: exam {result['exam_id']}, {result['questions']} questions")
+            else:
+                self.stdout.write(self.style.WARNING(f"#{result['index']} {result['title']}: invalid {result['errors']}"))
+        if report["error"]:
+            self.stdout.write(self.style.ERROR(f"Stopped: {report['error']}"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['exams']} exams ({report['invalid']} invalid), {report['questions']} questions "
+            f"in {report['seconds']}s ({report['questions_per_sec']} questions/sec)"
+        ))
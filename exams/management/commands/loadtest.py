@@ -0,0 +1,71 @@
+import json
+from datetime import datetime, timezone
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from exams.benchmarks import throwaway_exam
+from exams.loadtest import ENDPOINTS, run_load
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test running servers with many concurrent keep-alive connections: the DRF views on "
+        "--wsgi-url against the /api/async/ views on --asgi-url. See exams/loadtest.py for a recipe."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wsgi-url", help="Base URL of the WSGI server (e.g. gunicorn), hits the sync views.")
+        parser.add_argument("--asgi-url", help="Base URL of the ASGI server (e.g. uvicorn), hits the async views.")
+        parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="detail")
+        parser.add_argument("--connections", default="10,50,200,500", help="Comma-separated concurrency levels.")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level.")
+        parser.add_argument("--timeout", type=float, default=5.0, help="Seconds before a request counts as failed.")
+        parser.add_argument("--slo-ms", type=float, default=500.0, help="p95 latency a level must stay under.")
+        parser.add_argument("--token", help="Student API token to send.")
+        parser.add_argument("--exam", type=int, help="Exam id for the detail endpoint.")
+        parser.add_argument(
+            "--seed", action="store_true",
+            help="Create (or reuse) a loadtest student and exam in the configured database and use them.",
+        )
+        parser.add_argument("--output", help="Also write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        targets = [(name, options[f"{name}_url"]) for name in ("wsgi", "asgi") if options[f"{name}_url"]]
+        if not targets:
+            raise CommandError("Give --wsgi-url, --asgi-url or both.")
+        try:
+            levels = [int(level) for level in options["connections"].split(",")]
+        except ValueError:
+            raise CommandError("--connections takes comma-separated integers.")
+
+        token, exam_id = options["token"], options["exam"]
+        if options["seed"]:
+            student, _ = User.objects.get_or_create(username="loadtest-student")
+            token = Token.objects.get_or_create(user=student)[0].key
+            if exam_id is None:
+                exam_id = throwaway_exam(questions=10).id
+            self.stdout.write(f"Seeded student loadtest-student (token {token}) and exam {exam_id}")
+        if not token:
+            raise CommandError("Give --token (or --seed).")
+        if options["endpoint"] == "detail" and exam_id is None:
+            raise CommandError("The detail endpoint needs --exam (or --seed).")
+
+        results = {}
+        for name, url in targets:
+            path = ENDPOINTS[options["endpoint"]][0 if name == "wsgi" else 1].format(exam_id=exam_id)
+            self.stdout.write(f"{name}: {url.rstrip('/')}{path}")
+            result = run_load(
+                url, path, token, levels, options["duration"], options["timeout"], options["slo_ms"]
+            )
+            for level in result["levels"]:
+                self.stdout.write("  " + ", ".join(f"{key}={value}" for key, value in level.items()))
+            self.stdout.write(f"  capacity={result['capacity']} connections within p95<{options['slo_ms']}ms")
+            results[name] = result
+
+        if options["output"]:
+            report = {"created_at": datetime.now(timezone.utc).isoformat(), "endpoint": options["endpoint"], "results": results}
+            with open(options["output"], "w") as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
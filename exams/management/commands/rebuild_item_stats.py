@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from exams.analytics import rebuild_item_stats
+from exams.models import Exam
+
+
+class Command(BaseCommand):
+    help = "Recompute per-question item-analysis statistics from stored submission outcomes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--exam", type=int, help="Only rebuild this exam.")
+
+    def handle(self, *args, **options):
+        exams = Exam.objects.order_by("id")
+        if options["exam"] is not None:
+            exams = exams.filter(id=options["exam"])
+
+        for exam in exams:
+            questions = rebuild_item_stats(exam)
+            self.stdout.write(f"Exam {exam.id}: rebuilt statistics for {questions} questions")
+        self.stdout.write(self.style.SUCCESS("Rebuild complete"))
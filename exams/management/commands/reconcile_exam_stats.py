@@ -0,0 +1,50 @@
+import math
+
+from django.core.management.base import BaseCommand
+
+from exams.analytics import compute_exam_stats, rebuild_exam_stats
+from exams.models import Exam, ExamStats
+
+
+class Command(BaseCommand):
+    help = "Compare each exam's running score statistics with a full recompute and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--exam", type=int, help="Only check this exam.")
+        parser.add_argument("--fix", action="store_true", help="Overwrite drifted rows with the recomputed values.")
+
+    def handle(self, *args, **options):
+        exams = Exam.objects.order_by("id")
+        if options["exam"] is not None:
+            exams = exams.filter(id=options["exam"])
+        stored = {stats.exam_id: stats for stats in ExamStats.objects.filter(exam__in=exams)}
+
+        drifted = 0
+        for exam_id in exams.values_list("id", flat=True):
+            expected = compute_exam_stats(exam_id)
+            stats = stored.get(exam_id)
+            fields = [
+                field for field, value in expected.items()
+                if not _same(getattr(stats, field) if stats else None, value)
+            ]
+            # an exam without submissions or a stats row has nothing to drift
+            if not fields or (stats is None and not expected["count"]):
+                continue
+            drifted += 1
+            self.stdout.write(f"Exam {exam_id}: drift in {', '.join(fields)}")
+            if options["fix"]:
+                rebuild_exam_stats(exam_id)
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("No drift"))
+        elif options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"Fixed {drifted} exam(s)"))
+        else:
+            self.stdout.write(self.style.WARNING(f"{drifted} exam(s) drifted, run with --fix to rebuild"))
+
+
+def _same(stored, expected):
+    if stored is None or expected is None:
+        return stored is None and expected is None
+    # running float sums pick up rounding error
+    return math.isclose(stored, expected, rel_tol=1e-9, abs_tol=1e-6)
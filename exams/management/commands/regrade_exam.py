@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from exams.models import Exam, Question
+from exams.regrade import regrade_exam
+
+
+class Command(BaseCommand):
+    help = "Recompute stored submission scores for an exam after its answer key changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("exam_id", type=int)
+        parser.add_argument("--question", type=int, help="Only re-evaluate this question's contribution.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--workers", type=int, default=0, help="Grade chunks in a process pool of this size.")
+
+    def handle(self, *args, **options):
+        exam = Exam.objects.filter(id=options["exam_id"]).first()
+        if not exam:
+            raise CommandError(f"Exam {options['exam_id']} not found")
+
+        question = None
+        if options["question"] is not None:
+            question = Question.objects.filter(id=options["question"], exam=exam).first()
+            if not question:
+                raise CommandError(f"Question {options['question']} not found on exam {exam.id}")
+
+        result = regrade_exam(
+            exam,
+            question=question,
+            chunk_size=options["chunk_size"],
+            workers=options["workers"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Regraded {result['rows']} submissions of exam {exam.id} ({result['mode']} mode), "
+            f"{result['updated']} scores changed in {result['seconds']}s "
+            f"({result['rows_per_sec']} rows/sec)"
+        ))
@@ -0,0 +1,136 @@
+import string
+from collections import deque
+
+from django.conf import settings
+
+# Punctuation splits words, except inner dots, apostrophes and hyphens: "3.14", "don't", "e-mail".
+WORD_JOINERS = ".'-"
+SEPARATORS = str.maketrans({char: " " for char in string.punctuation if char not in WORD_JOINERS})
+
+# Share of rubric keywords a text answer must contain to count as correct.
+KEYWORD_THRESHOLD = 0.6
+
+
+def tokenize(text):
+    """
+    Lower-cased word tokens of text. str.translate + split keeps this in C,
+    which is much faster than a regex on multi-KB answers.
+    """
+    return [word.strip(WORD_JOINERS) for word in str(text).lower().translate(SEPARATORS).split()]
+
+
+def text_match_mode():
+    """
+    "token" matches whole words and phrases; "substring" keeps the original
+    `kw in student_text` behaviour for compatibility.
+    """
+    return getattr(settings, "GRADING_TEXT_MATCH", "token")
+
+
+class PhraseAutomaton:
+    """
+    Aho-Corasick automaton over token sequences, so every multi-word phrase
+    of a rubric is found in a single pass over the answer's tokens.
+    """
+
+    def __init__(self, phrases):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [set()]
+
+        for index, phrase in enumerate(phrases):
+            state = 0
+            for token in phrase:
+                next_state = self.goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][token] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(set())
+                state = next_state
+            self.output[state].add(index)
+
+        # breadth-first to set failure links
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(token, 0)
+                self.output[next_state] |= self.output[self.fail[next_state]]
+
+    def find(self, tokens):
+        """
+        Returns the indexes of the phrases that occur in tokens.
+        """
+        goto, fail, output = self.goto, self.fail, self.output
+        root = goto[0]
+        found = set()
+        state = 0
+        for token in tokens:
+            if not state:
+                # most tokens of an essay aren't in any phrase
+                state = root.get(token, 0)
+            else:
+                while state and token not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(token, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+class KeywordMatcher:
+    """
+    Compiled rubric for a text question.
+
+    A string expected answer is a list of single-word keywords; a list expected
+    answer holds one keyword or multi-word phrase per item. The answer is
+    tokenized once: single keywords are looked up in its token set and phrases
+    are found with one Aho-Corasick pass. In "substring" mode the original
+    keyword-in-text check is used instead.
+    """
+
+    def __init__(self, expected_answer, mode="token"):
+        self.mode = mode
+        if mode == "substring":
+            self.keywords = str(expected_answer).strip().lower().split()
+            self.phrases = []
+            self.automaton = None
+            return
+
+        items = expected_answer if isinstance(expected_answer, list) else [expected_answer]
+        self.keywords = []
+        self.phrases = []
+        for item in items:
+            tokens = [token for token in tokenize(item) if token]
+            if isinstance(expected_answer, list) and len(tokens) > 1:
+                self.phrases.append(tuple(tokens))
+            else:
+                self.keywords.extend(tokens)
+        self.automaton = PhraseAutomaton(self.phrases) if self.phrases else None
+
+    @property
+    def total(self):
+        return len(self.keywords) + len(self.phrases)
+
+    def match_count(self, student_answer):
+        if self.mode == "substring":
+            student_text = str(student_answer).strip().lower()
+            return sum(1 for kw in self.keywords if kw in student_text)
+
+        tokens = tokenize(student_answer)
+        token_set = set(tokens)
+        count = sum(1 for kw in self.keywords if kw in token_set)
+        if self.automaton is not None:
+            count += len(self.automaton.find(tokens))
+        return count
+
+    def matches(self, student_answer):
+        # If 60% or more keywords match, count as correct
+        total = self.total
+        return total == 0 or self.match_count(student_answer) / total >= KEYWORD_THRESHOLD
@@ -0,0 +1,215 @@
+import functools
+import glob
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+# request latency histogram bucket bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricsRegistry:
+    """
+    In-process counters for requests, SQL and grading.
+
+    With METRICS_DIR set, every process also writes its totals to its own
+    file there (at most once per METRICS_FLUSH_INTERVAL), and the /metrics
+    view sums all files, so counts add up across worker processes.
+    Counters of processes that exited stay in their files and keep counting
+    toward the totals, like Prometheus client multiprocess mode.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time_ns()
+        self.last_flush = 0.0
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            # (view, method, status) -> count
+            self.requests = {}
+            # (view, method) -> [bucket counts..., +Inf count, sum of seconds]
+            self.latency = {}
+            # (view, method) -> [statements, seconds]
+            self.sql = {}
+            # [calls, seconds]
+            self.grading = [0, 0.0]
+            # (scope, outcome) -> count, see admission.py
+            self.admission = {}
+
+    def observe_request(self, view, method, status, seconds, queries, sql_seconds):
+        key = (view, method)
+        with self.lock:
+            status_key = (view, method, str(status))
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    histogram[index] += 1
+                    break
+            else:
+                histogram[len(LATENCY_BUCKETS)] += 1
+            histogram[-1] += seconds
+
+            totals = self.sql.get(key)
+            if totals is None:
+                totals = self.sql[key] = [0, 0.0]
+            totals[0] += queries
+            totals[1] += sql_seconds
+        self.maybe_flush()
+
+    def observe_grading(self, seconds):
+        with self.lock:
+            self.grading[0] += 1
+            self.grading[1] += seconds
+
+    def observe_admission(self, scope, outcome):
+        with self.lock:
+            self.admission[(scope, outcome)] = self.admission.get((scope, outcome), 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "requests": [[list(key), value] for key, value in self.requests.items()],
+                "latency": [[list(key), list(value)] for key, value in self.latency.items()],
+                "sql": [[list(key), list(value)] for key, value in self.sql.items()],
+                "grading": list(self.grading),
+                "admission": [[list(key), value] for key, value in self.admission.items()],
+            }
+
+    def _path(self, directory):
+        return os.path.join(directory, f"metrics-{os.getpid()}-{self.started}.json")
+
+    def maybe_flush(self, force=False):
+        directory = getattr(settings, "METRICS_DIR", None)
+        if not directory:
+            return
+        now = time.monotonic()
+        if not force and now - self.last_flush < getattr(settings, "METRICS_FLUSH_INTERVAL", 1.0):
+            return
+        self.last_flush = now
+        path = self._path(directory)
+        # write then rename, so a reader never sees half a file
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as handle:
+            json.dump(self.snapshot(), handle)
+        os.replace(temporary, path)
+
+    def collect(self):
+        """
+        Totals across processes: this process's live counters plus every
+        other process's last flushed file.
+        """
+        snapshots = [self.snapshot()]
+        directory = getattr(settings, "METRICS_DIR", None)
+        if directory:
+            own = self._path(directory)
+            for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+                if path == own:
+                    continue
+                try:
+                    with open(path) as handle:
+                        snapshots.append(json.load(handle))
+                except (OSError, ValueError):
+                    continue
+        return merge_snapshots(snapshots)
+
+
+def merge_snapshots(snapshots):
+    merged = {"requests": {}, "latency": {}, "sql": {}, "grading": [0, 0.0], "admission": {}}
+    for snapshot in snapshots:
+        for section in ("requests", "admission"):
+            for key, value in snapshot.get(section, []):
+                key = tuple(key)
+                merged[section][key] = merged[section].get(key, 0) + value
+        for section in ("latency", "sql"):
+            for key, values in snapshot[section]:
+                key = tuple(key)
+                total = merged[section].get(key)
+                merged[section][key] = values if total is None else [a + b for a, b in zip(total, values)]
+        merged["grading"] = [a + b for a, b in zip(merged["grading"], snapshot["grading"])]
+    return merged
+
+
+registry = MetricsRegistry()
+
+
+def timed_grading(func):
+    """
+    Counts calls to a grading function and the time spent in it.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            registry.observe_grading(time.perf_counter() - started)
+    return wrapper
+
+
+def _labels(**labels):
+    return ",".join('%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"')) for name, value in labels.items())
+
+
+def render_prometheus(metrics):
+    """
+    Prometheus text exposition format (0.0.4) of merged metrics.
+    """
+    lines = [
+        "# HELP exams_http_requests_total Requests handled, by view, method and status.",
+        "# TYPE exams_http_requests_total counter",
+    ]
+    for (view, method, status), value in sorted(metrics["requests"].items()):
+        lines.append(f"exams_http_requests_total{{{_labels(view=view, method=method, status=status)}}} {value}")
+
+    lines += [
+        "# HELP exams_http_request_duration_seconds Request latency, by view and method.",
+        "# TYPE exams_http_request_duration_seconds histogram",
+    ]
+    for (view, method), values in sorted(metrics["latency"].items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, values):
+            cumulative += count
+            lines.append(
+                f"exams_http_request_duration_seconds_bucket{{{_labels(view=view, method=method, le=bound)}}} {cumulative}"
+            )
+        cumulative += values[len(LATENCY_BUCKETS)]
+        lines.append(f"exams_http_request_duration_seconds_bucket{{{_labels(view=view, method=method, le='+Inf')}}} {cumulative}")
+        lines.append(f"exams_http_request_duration_seconds_sum{{{_labels(view=view, method=method)}}} {values[-1]}")
+        lines.append(f"exams_http_request_duration_seconds_count{{{_labels(view=view, method=method)}}} {cumulative}")
+
+    lines += [
+        "# HELP exams_db_queries_total SQL statements run while handling requests, by view and method.",
+        "# TYPE exams_db_queries_total counter",
+    ]
+    for (view, method), (queries, _) in sorted(metrics["sql"].items()):
+        lines.append(f"exams_db_queries_total{{{_labels(view=view, method=method)}}} {queries}")
+    lines += [
+        "# HELP exams_db_query_duration_seconds_total Time spent in SQL while handling requests, by view and method.",
+        "# TYPE exams_db_query_duration_seconds_total counter",
+    ]
+    for (view, method), (_, seconds) in sorted(metrics["sql"].items()):
+        lines.append(f"exams_db_query_duration_seconds_total{{{_labels(view=view, method=method)}}} {seconds}")
+
+    calls, seconds = metrics["grading"]
+    lines += [
+        "# HELP exams_grading_calls_total Calls to grade_submission.",
+        "# TYPE exams_grading_calls_total counter",
+        f"exams_grading_calls_total {calls}",
+        "# HELP exams_grading_duration_seconds_total Time spent in grade_submission.",
+        "# TYPE exams_grading_duration_seconds_total counter",
+        f"exams_grading_duration_seconds_total {seconds}",
+        "# HELP exams_admission_total Admission decisions on submit and exam-start, by scope and outcome.",
+        "# TYPE exams_admission_total counter",
+    ]
+    for (scope, outcome), value in sorted(metrics["admission"].items()):
+        lines.append(f"exams_admission_total{{{_labels(scope=scope, outcome=outcome)}}} {value}")
+    return "\n".join(lines) + "\n"
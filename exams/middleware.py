@@ -0,0 +1,240 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.exceptions import AuthenticationFailed
+
+from .authentication import CachedTokenAuthentication
+from .compression import acompress_stream, choose_encoding, compress, compress_stream
+from .metrics import registry
+from .profiling import RequestProfile, requested_mode, sample_due, save_profile
+from .routers import pin_to_primary
+
+# The middleware below hook into process_request/process_response, which
+# MiddlewareMixin runs in the request's sync thread under ASGI: the thread the
+# async ORM runs its queries in, so query counting works for async views too.
+
+
+class QueryCounter:
+    """
+    connection.execute_wrapper hook that counts statements and their time.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+def count_queries(counter):
+    """
+    Installs the counter on every database connection of this thread until
+    the returned ExitStack is closed.
+    """
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(counter))
+    return stack
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """
+    Records latency, SQL statement count and SQL time per resolved route into
+    exams.metrics.registry. With METRICS_SERVER_TIMING, the same numbers go
+    out in a Server-Timing header.
+
+    A streamed response (exports) runs most of its queries while the body is
+    iterated, after process_response: its numbers are recorded once the last
+    chunk is sent (or the stream is closed), and it gets no Server-Timing
+    header, since the headers leave before the totals are known.
+    """
+
+    def process_request(self, request):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            return
+        counter = QueryCounter()
+        request._metrics = (counter, count_queries(counter), time.perf_counter())
+
+    def process_response(self, request, response):
+        state = getattr(request, "_metrics", None)
+        if state is None:
+            return response
+        if response.streaming:
+            content = response.streaming_content
+            if response.is_async:
+                response.streaming_content = self._arecord_after(content, request, response, state)
+            else:
+                response.streaming_content = self._record_after(content, request, response, state)
+            return response
+
+        counter, seconds = self._record(request, response, state)
+        if getattr(settings, "METRICS_SERVER_TIMING", False):
+            response["Server-Timing"] = (
+                f'db;dur={counter.seconds * 1000:.2f};desc="{counter.count} queries", '
+                f"total;dur={seconds * 1000:.2f}"
+            )
+        return response
+
+    def _record(self, request, response, state):
+        counter, queries, started = state
+        queries.close()
+        seconds = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        # the route pattern, not the path, keeps label cardinality bounded
+        view = f"/{match.route}" if match is not None else "unmatched"
+        registry.observe_request(view, request.method, response.status_code, seconds, counter.count, counter.seconds)
+        return counter, seconds
+
+    def _record_after(self, content, request, response, state):
+        # the query counter stays installed while the body is produced, in this thread
+        try:
+            yield from content
+        finally:
+            self._record(request, response, state)
+
+    async def _arecord_after(self, content, request, response, state):
+        try:
+            async for chunk in content:
+                yield chunk
+        finally:
+            self._record(request, response, state)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    GZipMiddleware with content negotiation: responses of at least
+    COMPRESSION_MIN_BYTES, and every streamed one, are sent with the coding
+    the client prefers in Accept-Encoding, brotli or gzip (see
+    exams.compression). As with GZipMiddleware, ETags are weakened, Vary:
+    Accept-Encoding is added and a body is only replaced when it shrank.
+    """
+
+    def process_response(self, request, response):
+        if not getattr(settings, "COMPRESSION_ENABLED", True):
+            return response
+        if not response.streaming and len(response.content) < getattr(settings, "COMPRESSION_MIN_BYTES", 1024):
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    view_class = getattr(match.func, "view_class", None)
+    return view_class.__name__ if view_class is not None else match.url_name or match.route
+
+
+def _is_admin(request):
+    """
+    Staff session or staff API token. DRF authenticates in the view, after
+    middleware, so the token is checked here as well.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_staff:
+        return True
+    try:
+        result = CachedTokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return result is not None and result[0].is_staff
+
+
+class ProfilingMiddleware(MiddlewareMixin):
+    """
+    Runs single requests under cProfile and stores the result with
+    exams.profiling.save_profile:
+
+    - on demand, for admins sending `X-Profile: 1` (or `memory`, adding
+      tracemalloc) or `?profile=1`; the response names the file in `X-Profile-Id`;
+    - sampled, for 1 in PROFILE_SAMPLE_EVERY requests, kept only when they
+      took longer than PROFILE_SLOW_MS.
+
+    The profiler has to be running before the request starts, so sampling
+    can't pick slow requests upfront; it profiles a sample and keeps the slow
+    ones. Only one request is profiled at a time. cProfile follows one
+    thread, so for async views the profile covers the sync (ORM) side.
+    """
+
+    def process_request(self, request):
+        mode = requested_mode(request)
+        if mode is not None and not _is_admin(request):
+            mode = None
+        sampled = mode is None and sample_due()
+        if mode is None and not sampled:
+            return
+
+        counter = QueryCounter()
+        profile = RequestProfile(mode or "cpu").__enter__()
+        request._profile = (profile, sampled, counter, count_queries(counter), time.perf_counter())
+
+    def process_response(self, request, response):
+        state = getattr(request, "_profile", None)
+        if state is None:
+            return response
+        profile, sampled, counter, queries, started = state
+        queries.close()
+        profile.__exit__(None, None, None)
+        seconds = time.perf_counter() - started
+
+        if not profile.started:
+            if not sampled:
+                response["X-Profile-Id"] = "busy"
+            return response
+        if sampled and seconds * 1000 < getattr(settings, "PROFILE_SLOW_MS", 500):
+            return response
+        name = save_profile(profile, _view_name(request), request.method, counter.count, seconds)
+        if not sampled:
+            response["X-Profile-Id"] = name
+        return response
+
+
+class PrimaryPinMiddleware(MiddlewareMixin):
+    """
+    After a write request (POST/PUT/PATCH/DELETE) by an authenticated user,
+    pins that user's reads to the primary for a moment (see exams.routers).
+    DRF sets request.user on the underlying request once it authenticates.
+    """
+
+    def process_response(self, request, response):
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user)
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 06:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0006_alter_question_expected_answer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='content_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-17 06:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0007_exam_content_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('claimed_by', models.CharField(blank=True, max_length=64)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('submission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='grading_job', to='exams.submission')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='exams_gradi_status_465cc8_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-17 06:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0008_gradingjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='grader_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='outcomes',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
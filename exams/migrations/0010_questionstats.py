@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-17 06:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0009_submission_outcomes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionStats',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='exams.question')),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('score_sq_sum', models.FloatField(default=0)),
+                ('correct_score_sum', models.FloatField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-17 06:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0010_questionstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamStats',
+            fields=[
+                ('exam', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='exams.exam')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('score_sq_sum', models.FloatField(default=0)),
+                ('min_score', models.FloatField(blank=True, null=True)),
+                ('max_score', models.FloatField(blank=True, null=True)),
+                ('bucket_0', models.PositiveIntegerField(default=0)),
+                ('bucket_1', models.PositiveIntegerField(default=0)),
+                ('bucket_2', models.PositiveIntegerField(default=0)),
+                ('bucket_3', models.PositiveIntegerField(default=0)),
+                ('bucket_4', models.PositiveIntegerField(default=0)),
+                ('bucket_5', models.PositiveIntegerField(default=0)),
+                ('bucket_6', models.PositiveIntegerField(default=0)),
+                ('bucket_7', models.PositiveIntegerField(default=0)),
+                ('bucket_8', models.PositiveIntegerField(default=0)),
+                ('bucket_9', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
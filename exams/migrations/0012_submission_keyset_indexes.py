@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-17 06:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0011_examstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['created_at', 'id'], name='exams_submi_created_b9a1f1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['exam', 'created_at', 'id'], name='exams_submi_exam_id_b3687c_idx'),
+        ),
+    ]
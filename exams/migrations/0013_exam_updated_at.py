@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 06:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0012_submission_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-17 07:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0013_exam_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='submission',
+            constraint=models.UniqueConstraint(fields=('student', 'exam'), name='unique_submission_per_student'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-17 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0015_draft'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Answer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.JSONField(blank=True, null=True)),
+                ('is_correct', models.BooleanField(default=False)),
+                ('question', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='exams.question')),
+                ('submission', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='answer_rows', to='exams.submission')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['question', 'is_correct'], name='exams_answe_questio_ec9310_idx')],
+                'constraints': [models.UniqueConstraint(fields=('submission', 'question'), name='unique_answer_per_question')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0016_answer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='outcomes_layout',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+    ]
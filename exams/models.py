@@ -9,6 +9,20 @@ class Exam(models.Model):
     duration = models.IntegerField()  # minutes
     course = models.CharField(max_length=100)
     metadata = models.JSONField(null=True, blank=True)
+    # bumped whenever the exam or its questions change, see grading.py
+    content_version = models.PositiveIntegerField(default=0, editable=False)
+    # last change to the exam or its questions, for conditional GETs of the exam list
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        # content_version only moves through grading.invalidate_grading_plan (an F() update):
+        # an instance loaded before a bump must not write its old number back
+        if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "content_version"
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
@@ -35,13 +49,127 @@ class Submission(models.Model):
     exam = models.ForeignKey(Exam, on_delete=models.CASCADE)
     answers = models.JSONField(default=dict)  
     score = models.FloatField(default=0)
+    # per-question correctness bitmap in question id order, see grading.pack_outcomes
+    outcomes = models.BinaryField(null=True, blank=True, editable=False)
+    grader_version = models.PositiveSmallIntegerField(default=0, editable=False)
+    # GradingPlan.layout (question ids, in bit order) the outcomes were packed under
+    outcomes_layout = models.CharField(max_length=16, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         indexes = [
             models.Index(fields=["student"]),
             models.Index(fields=["exam"]),
+            # keyset pagination of the admin listing, see pagination.KeysetPagination
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["exam", "created_at", "id"]),
+        ]
+        constraints = [
+            # one submission per student and exam, the submit path relies on it
+            models.UniqueConstraint(fields=["student", "exam"], name="unique_submission_per_student"),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.exam}"
+
+# Answer - one row per graded submission and question, for per-question queries in SQL
+class Answer(models.Model):
+    # the composite index and constraint below cover lookups by either key
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name="answer_rows", db_index=False)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="answers", db_index=False)
+    # the student's answer, NULL when the question was left blank
+    value = models.JSONField(null=True, blank=True)
+    is_correct = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["question", "is_correct"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["submission", "question"], name="unique_answer_per_question"),
+        ]
+
+    def __str__(self):
+        return f"{self.submission} - Q{self.question_id}"
+
+# Draft - answers autosaved during the exam, graded as they arrive, promoted on submit
+class Draft(models.Model):
+    student = models.ForeignKey(User, on_delete=models.CASCADE)
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE)
+    answers = models.JSONField(default=dict)
+    # {question id: correct} for the answers so far, see grading.grade_changes
+    outcomes = models.JSONField(default=dict)
+    # grading.grading_key() the outcomes were graded under
+    graded_under = models.CharField(max_length=64, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["student", "exam"], name="unique_draft_per_student"),
         ]
 
     def __str__(self):
-        return f"{self.student} - {self.exam}"
\ No newline at end of file
+        return f"Draft: {self.student} - {self.exam}"
+
+# Grading queue - one job per submission when GRADING_ASYNC is on
+class GradingJob(models.Model):
+    STATUSES = (
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    )
+
+    submission = models.OneToOneField(Submission, on_delete=models.CASCADE, related_name="grading_job")
+    status = models.CharField(max_length=10, choices=STATUSES, default="pending")
+    claimed_by = models.CharField(max_length=64, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.submission} ({self.status})"
+
+
+# Running item-analysis sums per question, kept up to date on submit and regrade
+class QuestionStats(models.Model):
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    responses = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    # sums of the submission scores (percentages), for the discrimination index
+    score_sum = models.FloatField(default=0)
+    score_sq_sum = models.FloatField(default=0)
+    correct_score_sum = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"{self.question} ({self.correct}/{self.responses})"
+
+
+# Score distribution per exam, updated in the same transaction as each grade
+class ExamStats(models.Model):
+    exam = models.OneToOneField(Exam, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    count = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    score_sq_sum = models.FloatField(default=0)
+    min_score = models.FloatField(null=True, blank=True)
+    max_score = models.FloatField(null=True, blank=True)
+    # histogram of scores in 10-point buckets, the last one includes 100
+    bucket_0 = models.PositiveIntegerField(default=0)
+    bucket_1 = models.PositiveIntegerField(default=0)
+    bucket_2 = models.PositiveIntegerField(default=0)
+    bucket_3 = models.PositiveIntegerField(default=0)
+    bucket_4 = models.PositiveIntegerField(default=0)
+    bucket_5 = models.PositiveIntegerField(default=0)
+    bucket_6 = models.PositiveIntegerField(default=0)
+    bucket_7 = models.PositiveIntegerField(default=0)
+    bucket_8 = models.PositiveIntegerField(default=0)
+    bucket_9 = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.exam} ({self.count} submissions)"
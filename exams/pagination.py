@@ -0,0 +1,104 @@
+import base64
+import binascii
+import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def parse_moment(value):
+    """
+    Parses an ISO datetime or date (midnight) query parameter, or returns None.
+    Naive values are taken in the current time zone.
+    """
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            moment = datetime.datetime.combine(day, datetime.time()) if day else None
+    except ValueError:
+        return None
+    if moment is not None and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination on (created_at, id), oldest first.
+
+    The cursor is the position of the last row of the previous page, so each
+    page is one indexed range query: page 1000 costs the same as page 1,
+    unlike OFFSET, and rows inserted meanwhile don't shift the pages.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 100
+    max_page_size = 500
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def encode_cursor(self, row):
+        # model instances or values() rows
+        created_at, pk = (row["created_at"], row["id"]) if isinstance(row, dict) else (row.created_at, row.id)
+        raw = f"{created_at.isoformat()}|{pk}".encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+            position = parse_datetime(created_at), int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound("Invalid cursor")
+        if position[0] is None:
+            raise NotFound("Invalid cursor")
+        return position
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            created_at, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+
+        # one extra row tells whether there is a next page
+        rows = list(queryset.order_by("created_at", "id")[:page_size + 1])
+        self.next_cursor = self.encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+        return rows[:page_size]
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class ExamPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
@@ -0,0 +1,24 @@
+try:
+    import orjson
+except ImportError:  # orjson is optional, FastJSONParser falls back to the stdlib decoder
+    orjson = None
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser that decodes with orjson when it is installed. Like DRF's
+    strict parser it rejects NaN and Infinity; bodies in another charset
+    than UTF-8 are left to JSONParser.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
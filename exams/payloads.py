@@ -0,0 +1,124 @@
+import hashlib
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
+
+from .models import Exam
+from .renderers import FastJSONRenderer
+from .serializers import StudentExamSerializer
+
+# how long a process waits for another process building the same payload
+BUILD_WAIT_SECONDS = 2.0
+BUILD_POLL_SECONDS = 0.05
+
+# one lock per stripe of exam ids rather than per exam, so the set stays fixed
+# however many exams are served; exams sharing a stripe just build in turn
+BUILD_LOCK_STRIPES = 64
+_build_locks = [threading.Lock() for _ in range(BUILD_LOCK_STRIPES)]
+
+
+class ExamPayload:
+    """
+    The rendered student-facing JSON of an exam and its strong ETag.
+    `version` is the Exam.content_version the bytes were rendered from.
+    """
+
+    def __init__(self, content, version=None):
+        self.content = content
+        self.etag = '"%s"' % hashlib.blake2b(content, digest_size=16).hexdigest()
+        self.version = version
+
+    def matches(self, if_none_match):
+        """
+        If-None-Match check by weak comparison: compressed responses carry
+        the ETag weakened (W/"..."), and clients send that back.
+        """
+        etags = parse_etags(if_none_match)
+        return etags == ["*"] or any(etag.removeprefix("W/") == self.etag for etag in etags)
+
+
+def _payload_key(exam_id, version):
+    # every exam or question change bumps content_version (grading.invalidate_grading_plan),
+    # so a payload of older data is never looked up again, in any process, whatever the cache
+    return f"exams:student-payload:{exam_id}:{version}"
+
+
+def _build_lock(exam_id):
+    return _build_locks[exam_id % BUILD_LOCK_STRIPES]
+
+
+def _content_version(exam_id):
+    version = Exam.objects.filter(id=exam_id).values_list("content_version", flat=True).first()
+    if version is None:
+        raise Http404("No Exam matches the given query.")
+    return version
+
+
+def render_exam_payload(exam_id):
+    exam = get_object_or_404(Exam.objects.prefetch_related("questions"), id=exam_id)
+    return ExamPayload(FastJSONRenderer().render(StudentExamSerializer(exam).data), exam.content_version)
+
+
+def _store(exam_id, payload):
+    # stored under the version it was rendered from: questions are read after the exam
+    # row, so they are never older than that version
+    cache.set(
+        _payload_key(exam_id, payload.version), payload, getattr(settings, "EXAM_PAYLOAD_CACHE_TIMEOUT", 3600)
+    )
+
+
+def get_exam_payload(exam_id):
+    """
+    Returns the exam's cached student payload for its current content
+    version (one primary-key lookup), rendering it on a miss.
+
+    Only one request per process renders a missing payload while the others
+    wait for it, and a short cache lock does the same across processes, so an
+    exam-start burst costs one set of queries. Raises Http404 for unknown exams.
+    """
+    key = _payload_key(exam_id, _content_version(exam_id))
+    payload = cache.get(key)
+    if payload is not None:
+        return payload
+
+    with _build_lock(exam_id):
+        payload = cache.get(key)
+        if payload is not None:
+            return payload
+
+        lock_key = f"{key}:lock"
+        if not cache.add(lock_key, 1, timeout=BUILD_WAIT_SECONDS * 2):
+            # another process is rendering it, give it a moment
+            deadline = time.monotonic() + BUILD_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(BUILD_POLL_SECONDS)
+                payload = cache.get(key)
+                if payload is not None:
+                    return payload
+
+        try:
+            payload = render_exam_payload(exam_id)
+            _store(exam_id, payload)
+        finally:
+            cache.delete(lock_key)
+    return payload
+
+
+async def aget_exam_payload(exam_id):
+    """
+    get_exam_payload() for async views: the version lookup and a cache hit
+    stay on the event loop, a miss renders in a thread as usual.
+    """
+    version = await Exam.objects.filter(id=exam_id).values_list("content_version", flat=True).afirst()
+    if version is None:
+        raise Http404("No Exam matches the given query.")
+    payload = await cache.aget(_payload_key(exam_id, version))
+    if payload is not None:
+        return payload
+    return await sync_to_async(get_exam_payload)(exam_id)
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+
+from .grading import grade_outcomes
+from .metrics import registry
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def grading_executor():
+    """
+    The process-wide pool async views grade in, built on first use:
+    GRADING_POOL = "thread" (default) or "process", GRADING_POOL_WORKERS wide.
+
+    Grading is pure Python, so threads still take the GIL; they keep the
+    event loop free, and a process pool also spreads grading over cores at
+    the cost of pickling the plan and answers for every submission.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = getattr(settings, "GRADING_POOL_WORKERS", None)
+            if getattr(settings, "GRADING_POOL", "thread") == "process":
+                _executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="grading")
+        return _executor
+
+
+def shutdown_grading_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+
+async def agrade_outcomes(plan, answers):
+    """
+    grade_outcomes(plan, answers) off the event loop. The plan is compiled
+    already, so the pool never touches the database.
+    """
+    started = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(grading_executor(), grade_outcomes, plan, answers)
+    finally:
+        registry.observe_grading(time.perf_counter() - started)
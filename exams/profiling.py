@@ -0,0 +1,153 @@
+import cProfile
+import itertools
+import os
+import re
+import threading
+import time
+import tracemalloc
+
+from django.conf import settings
+
+# <time_ns>_<view>_<method>_<queries>q_<ms>ms[_<peak kb>kb].prof
+PROFILE_NAME = re.compile(
+    r"^(?P<created>\d+)_(?P<view>[A-Za-z0-9-]+)_(?P<method>[A-Z]+)_(?P<queries>\d+)q_(?P<ms>\d+)ms"
+    r"(?:_(?P<kb>\d+)kb)?\.(?:prof|txt)$"
+)
+
+# cProfile (from 3.12) and tracemalloc are process-wide, so one request at a time
+_active = threading.Lock()
+_sample_counter = itertools.count(1)
+
+
+def profile_dir():
+    return str(settings.PROFILE_DIR)
+
+
+def requested_mode(request):
+    """
+    "cpu", "memory" or None from the `X-Profile` header or `profile` query parameter.
+    """
+    value = request.headers.get("X-Profile") or request.GET.get("profile")
+    if not value or value.lower() in ("0", "false", "no"):
+        return None
+    return "memory" if value.lower() in ("memory", "mem", "tracemalloc") else "cpu"
+
+
+def sample_due():
+    """
+    True for 1 in PROFILE_SAMPLE_EVERY requests (never when it is 0).
+    """
+    every = getattr(settings, "PROFILE_SAMPLE_EVERY", 0)
+    return every > 0 and next(_sample_counter) % every == 0
+
+
+class RequestProfile:
+    """
+    Runs a block under cProfile, and tracemalloc in "memory" mode.
+
+    Use as a context manager; `started` is False when another request is
+    already being profiled, in which case nothing is recorded.
+    """
+
+    def __init__(self, mode="cpu"):
+        self.mode = mode
+        self.profiler = cProfile.Profile()
+        self.started = False
+        self.peak = None
+        self.allocations = None
+
+    def __enter__(self):
+        self.started = _active.acquire(blocking=False)
+        if not self.started:
+            return self
+        try:
+            if self.mode == "memory":
+                tracemalloc.start()
+            self.profiler.enable()
+        except Exception:
+            _active.release()
+            self.started = False
+        return self
+
+    def __exit__(self, *exc_info):
+        if not self.started:
+            return
+        try:
+            self.profiler.disable()
+            if self.mode == "memory":
+                self.peak = tracemalloc.get_traced_memory()[1]
+                self.allocations = tracemalloc.take_snapshot().statistics("lineno")[:25]
+                tracemalloc.stop()
+        finally:
+            _active.release()
+
+
+def save_profile(profile, view, method, queries, seconds):
+    """
+    Writes the profile to PROFILE_DIR and drops the oldest ones beyond
+    PROFILE_MAX_FILES. Returns the file name.
+    """
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    view = re.sub(r"[^A-Za-z0-9]+", "-", view).strip("-") or "unmatched"
+    name = f"{time.time_ns()}_{view}_{method}_{queries}q_{round(seconds * 1000)}ms"
+    if profile.peak is not None:
+        name += f"_{profile.peak // 1024}kb"
+    profile.profiler.dump_stats(os.path.join(directory, f"{name}.prof"))
+    if profile.allocations is not None:
+        with open(os.path.join(directory, f"{name}.txt"), "w") as handle:
+            handle.write(f"peak {profile.peak} bytes\n")
+            handle.writelines(f"{statistic}\n" for statistic in profile.allocations)
+    prune_profiles()
+    return f"{name}.prof"
+
+
+def prune_profiles():
+    keep = getattr(settings, "PROFILE_MAX_FILES", 50)
+    stems = sorted({name.rsplit(".", 1)[0] for name in os.listdir(profile_dir()) if PROFILE_NAME.match(name)})
+    for stem in stems[:-keep] if keep else stems:
+        for extension in ("prof", "txt"):
+            try:
+                os.remove(os.path.join(profile_dir(), f"{stem}.{extension}"))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles():
+    """
+    The stored profiles, newest first.
+    """
+    try:
+        names = os.listdir(profile_dir())
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in names:
+        match = PROFILE_NAME.match(name)
+        if match is None:
+            continue
+        path = os.path.join(profile_dir(), name)
+        profiles.append({
+            "name": name,
+            "kind": "cpu" if name.endswith(".prof") else "memory",
+            "view": match["view"],
+            "method": match["method"],
+            "queries": int(match["queries"]),
+            "duration_ms": int(match["ms"]),
+            "peak_memory_kb": int(match["kb"]) if match["kb"] else None,
+            "size": os.path.getsize(path),
+            "created_at": int(match["created"]) // 1_000_000_000,
+        })
+    profiles.sort(key=lambda profile: profile["name"], reverse=True)
+    return profiles
+
+
+def profile_path(name):
+    """
+    Path of a stored profile, or None for names that aren't one (including
+    anything trying to leave PROFILE_DIR).
+    """
+    if not PROFILE_NAME.match(name):
+        return None
+    path = os.path.join(profile_dir(), name)
+    return path if os.path.isfile(path) else None
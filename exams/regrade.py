@@ -0,0 +1,217 @@
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db import transaction
+from django.db.models import Q
+
+from .analytics import (
+    counted_submissions,
+    current_outcomes,
+    rebuild_exam_stats,
+    rebuild_item_stats,
+    record_exam_stats,
+    record_item_stats,
+    refresh_exam_bounds,
+)
+from .answers import replace_answers
+from .cohort import grade_cohort
+from .grading import (
+    GRADER_VERSION,
+    count_correct,
+    get_grading_plan,
+    grade_answer,
+    grade_outcomes,
+    outcome_at,
+    pack_outcomes,
+    percentage,
+)
+from .models import Submission
+
+
+def _grade_chunk(plan, rows):
+    """
+    Full regrade of one chunk of (id, answers, score, outcomes, grader_version,
+    outcomes_layout) rows. Returns (id, score, outcomes) for rows whose stored
+    grade changed.
+    """
+    scores, outcomes = grade_cohort(plan, [row[1] for row in rows], with_outcomes=True)
+    return [
+        (pk, new_score, new_outcomes)
+        for (pk, _, score, stored, version, layout), new_score, new_outcomes in zip(rows, scores, outcomes)
+        if new_score != score
+        or version != GRADER_VERSION
+        or layout != plan.layout
+        or bytes(stored or b"") != new_outcomes
+    ]
+
+
+def _regrade_question_chunk(plan, question_key, rows):
+    """
+    Re-evaluates only one question's contribution: its bit in the stored
+    outcomes is flipped if the answer's correctness changed, and the score is
+    recounted from the bitmap. Rows without a current bitmap (older grader, or
+    packed before a question was added or deleted) are graded in full.
+    """
+    position = plan.position(question_key)
+    _, question_type, expected = plan.entries[position]
+
+    changed = []
+    for pk, answers, score, stored, version, layout in rows:
+        answers = answers or {}
+        stored = current_outcomes(stored, version, layout, plan)
+        if stored is None:
+            outcomes = grade_outcomes(plan, answers)
+            changed.append((pk, percentage(sum(outcomes), plan.total), pack_outcomes(outcomes)))
+            continue
+
+        new = grade_answer(question_type, expected, answers.get(question_key))
+        if new != outcome_at(stored, position):
+            data = bytearray(stored)
+            data[position >> 3] ^= 1 << (position & 7)
+            outcomes = bytes(data)
+            changed.append((pk, percentage(count_correct(outcomes), plan.total), outcomes))
+    return changed
+
+
+def stale_submissions(submissions, plan=None):
+    """
+    Submissions whose outcomes are missing or came from an older grader, or,
+    given the exam's current `plan`, were packed for a different set of questions.
+    """
+    stale = Q(outcomes__isnull=True) | ~Q(grader_version=GRADER_VERSION)
+    if plan is not None:
+        stale |= ~Q(outcomes_layout=plan.layout)
+    return submissions.filter(stale)
+
+
+def _chunks(queryset, chunk_size):
+    chunk = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _write_scores(plan, rows, changed):
+    """
+    Stores a chunk's changed grades, with their Answer rows, and moves the
+    item and exam statistics along with them. Returns (rows written, whether
+    the exam's min/max need a refresh, whether the item statistics need a
+    rebuild).
+    """
+    if changed:
+        previous = {
+            pk: (score, current_outcomes(outcomes, version, layout, plan))
+            for pk, _, score, outcomes, version, layout in rows
+        }
+        # outcomes stored under another grader or question layout were counted in the
+        # item statistics, but can't be subtracted bit by bit: rebuild them instead
+        changed_ids = {pk for pk, _, _ in changed}
+        stale_items = any(
+            outcomes is not None and previous[pk][1] is None
+            for pk, _, _, outcomes, _, _ in rows
+            if pk in changed_ids
+        )
+        with transaction.atomic():
+            Submission.objects.bulk_update(
+                [
+                    Submission(
+                        id=pk, score=score, outcomes=outcomes,
+                        grader_version=GRADER_VERSION, outcomes_layout=plan.layout,
+                    )
+                    for pk, score, outcomes in changed
+                ],
+                ["score", "outcomes", "grader_version", "outcomes_layout"],
+            )
+            answers = {pk: answers for pk, answers, *_ in rows}
+            replace_answers(plan, [(pk, answers[pk], outcomes) for pk, _, outcomes in changed])
+            if not stale_items:
+                record_item_stats(plan, [(*previous[pk], score, outcomes) for pk, score, outcomes in changed])
+            stale_bounds = record_exam_stats(
+                plan.exam_id, [(previous[pk][0], score) for pk, score, _ in changed], refresh_bounds=False
+            )
+        return len(changed), stale_bounds, stale_items
+    return 0, False, False
+
+
+def regrade_exam(exam, question=None, chunk_size=1000, workers=0, stale_only=False):
+    """
+    Recomputes stored scores and outcomes for every submission of an exam.
+
+    Submissions are streamed as (id, answers, score, outcomes, grader_version,
+    outcomes_layout) tuples, graded in chunks and written back with bulk_update. When `question`
+    is given, only that question's contribution is re-evaluated; with
+    `stale_only`, only rows without outcomes from the current grader and
+    question layout are.
+    With `workers` > 0 the chunks are graded in a process pool.
+    Returns a summary dict including rows/sec.
+    """
+    started = time.perf_counter()
+    plan = get_grading_plan(exam)
+
+    if question is not None and plan.position(question.id) is not None:
+        grade_chunk = _regrade_question_chunk
+        extra_args = (str(question.id),)
+        mode = "question"
+    else:
+        grade_chunk = _grade_chunk
+        extra_args = ()
+        mode = "full"
+
+    # submissions still queued for grading are left to the grading worker
+    submissions = counted_submissions(exam.id)
+    if stale_only:
+        submissions = stale_submissions(submissions, plan)
+    rows = submissions.order_by("id").values_list(
+        "id", "answers", "score", "outcomes", "grader_version", "outcomes_layout"
+    )
+
+    processed = 0
+    written = []
+    if plan.total and workers > 0:
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+            pending = deque()
+            for chunk in _chunks(rows, chunk_size):
+                processed += len(chunk)
+                pending.append((chunk, executor.submit(grade_chunk, plan, *extra_args, chunk)))
+                # keep a bounded number of chunks in flight
+                if len(pending) >= workers * 2:
+                    done, future = pending.popleft()
+                    written.append(_write_scores(plan, done, future.result()))
+            while pending:
+                done, future = pending.popleft()
+                written.append(_write_scores(plan, done, future.result()))
+    elif plan.total:
+        for chunk in _chunks(rows, chunk_size):
+            processed += len(chunk)
+            written.append(_write_scores(plan, chunk, grade_chunk(plan, *extra_args, chunk)))
+    else:
+        # an exam without questions scores 0 for everyone
+        processed = rows.count()
+        with transaction.atomic():
+            updated = submissions.update(
+                score=0, outcomes=b"", grader_version=GRADER_VERSION, outcomes_layout=plan.layout
+            )
+            written.append((updated, False, False))
+            rebuild_exam_stats(exam.id)
+
+    updated = sum(count for count, _, _ in written)
+    if any(stale_bounds for _, stale_bounds, _ in written):
+        refresh_exam_bounds(exam.id)
+    if any(stale_items for _, _, stale_items in written):
+        rebuild_item_stats(exam)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "exam_id": exam.id,
+        "mode": mode,
+        "rows": processed,
+        "updated": updated,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(processed / elapsed, 1) if elapsed else float(processed),
+    }
@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, FastJSONRenderer falls back to the stdlib encoder
+    orjson = None
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+# raw U+2028 / U+2029, which DRF escapes for embedding in <script>
+LINE_SEPARATORS = (b"\xe2\x80\xa8", b"\xe2\x80\xa9")
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed: the same
+    compact UTF-8 output, several times faster on large lists. Datetimes and
+    other types orjson doesn't handle the way DRF does go through DRF's
+    encoder; indented output (browsable API, `; indent=` in Accept), an
+    ASCII-only or non-compact setting, or anything orjson rejects is
+    rendered by JSONRenderer itself.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if LINE_SEPARATORS[0] in content or LINE_SEPARATORS[1] in content:
+            content = content.replace(LINE_SEPARATORS[0], b"\\u2028").replace(LINE_SEPARATORS[1], b"\\u2029")
+        return content
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Lets `?format=csv` through content negotiation. Exports stream their own
+    body; this only renders the small dicts of error responses, as a header
+    row and a value row.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        row = data if isinstance(data, dict) else {"detail": data}
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(row.keys())
+        writer.writerow(row.values())
+        return buffer.getvalue().encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Lets `?format=ndjson` through content negotiation; renders error
+    responses as a single JSON line.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return (json.dumps(data, default=str) + "\n").encode(self.charset)
+
+
+class PrometheusTextRenderer(BaseRenderer):
+    """
+    Lets Prometheus scrapers (Accept: text/plain; version=0.0.4) through
+    content negotiation. The metrics view builds its own body; this renders
+    error responses as `key: value` lines.
+    """
+
+    media_type = "text/plain"
+    format = "txt"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        row = data if isinstance(data, dict) else {"detail": data}
+        return "".join(f"{key}: {value}\n" for key, value in row.items()).encode(self.charset)
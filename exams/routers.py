@@ -0,0 +1,104 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+# set while a request may read from a replica
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+
+def replica_aliases():
+    """
+    Replica aliases, leaving out any that is the primary's own database (as
+    a test mirror is): reading there gains nothing over the primary.
+    """
+    primary = connections["default"].settings_dict["NAME"]
+    return [alias for alias in settings.DATABASES if alias != "default" and connections[alias].settings_dict["NAME"] != primary]
+
+
+def _pin_key(user_id):
+    return f"exams:db-primary-pin:{user_id}"
+
+
+def pin_to_primary(user):
+    """
+    Sends the user's reads to the primary for DATABASE_PIN_SECONDS, so they
+    see their own writes before the replicas catch up. The pin lives in the
+    cache, which settings require to be shared once replicas are configured
+    (databases.require_shared_cache).
+    Without replicas there is nothing to pin.
+    """
+    if replica_aliases():
+        cache.set(_pin_key(user.pk), 1, getattr(settings, "DATABASE_PIN_SECONDS", 5))
+
+
+def is_pinned(user):
+    return user is not None and user.is_authenticated and cache.get(_pin_key(user.pk)) is not None
+
+
+async def ais_pinned(user):
+    return user is not None and user.is_authenticated and await cache.aget(_pin_key(user.pk)) is not None
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """
+    Reads inside the block go to a replica (when there are any).
+    """
+    token = _read_from_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes, and reads by default, go to the primary ("default"). Reads go to
+    a random replica only inside replica_reads(), which ReplicaReadMixin
+    opens for safe requests of the views that tolerate replication lag.
+    Replicas are copies of the primary, so nothing is migrated on them.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get():
+            replicas = replica_aliases()
+            if replicas:
+                return random.choice(replicas)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
+
+
+class ReplicaReadMixin:
+    """
+    APIView mixin: GET/HEAD requests read from a replica once the user is
+    authenticated, unless the user wrote recently (see pin_to_primary).
+    Authentication and permission checks still read from the primary, so a
+    token created a moment ago works.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and replica_aliases() and not is_pinned(request.user):
+            self._replica_token = _read_from_replica.set(True)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            token = self.__dict__.pop("_replica_token", None)
+            if token is not None:
+                _read_from_replica.reset(token)
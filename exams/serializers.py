@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import Exam, Question, Submission
 
@@ -6,6 +7,15 @@ class RegisterSerializer(serializers.Serializer):
     username = serializers.CharField(max_length=150)
     password = serializers.CharField(write_only=True)
 
+# Sparse fieldsets: AdminExamSerializer(exams, many=True, fields=["id", "title"])
+class DynamicFieldsMixin:
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
 #Admin access
 class AdminQuestionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -15,7 +25,7 @@ class AdminQuestionSerializer(serializers.ModelSerializer):
         #     "expected_answer": {"required": False},
         #     }
 
-class AdminExamSerializer(serializers.ModelSerializer):
+class AdminExamSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
      class Meta:
         model = Exam
         fields = ["id", "title", "duration", "course", "metadata", "questions"]
@@ -24,10 +34,10 @@ class AdminExamSerializer(serializers.ModelSerializer):
    
      def create(self, validated_data):
         questions_data = validated_data.pop("questions", [])
-        exam = Exam.objects.create(**validated_data)
-
-        for question_data in questions_data:
-            Question.objects.create(exam=exam, **question_data)
+        # all or nothing, and one INSERT for the questions
+        with transaction.atomic():
+            exam = Exam.objects.create(**validated_data)
+            Question.objects.bulk_create([Question(exam=exam, **question_data) for question_data in questions_data])
         return exam
 
 # 
@@ -101,3 +111,78 @@ class StudentSubmissionSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["score"]
 
+
+
+# Read-only fast path for the list endpoints: rows are fetched with .values() (joins
+# included) and turned into dicts directly, without model instances or per-row field
+# machinery. Each one produces the same output as the ModelSerializer it stands in for.
+class ValuesSerializer:
+    fields = []
+    # output field -> values() lookup, where they differ
+    sources = {}
+    datetime_fields = ()
+
+    # DRF's own formatting (ISO 8601, "Z" for UTC), done by one shared field
+    datetime_field = serializers.DateTimeField()
+
+    def __init__(self, fields=None):
+        self.names = [name for name in self.fields if fields is None or name in fields]
+
+    def values(self, queryset):
+        return queryset.values(*[self.sources.get(name, name) for name in self.names])
+
+    def to_representation(self, rows):
+        columns = [(name, self.sources.get(name, name), name in self.datetime_fields) for name in self.names]
+        datetime = self.datetime_field.to_representation
+        return [
+            {name: datetime(row[source]) if is_datetime else row[source] for name, source, is_datetime in columns}
+            for row in rows
+        ]
+
+
+class AdminSubmissionValuesSerializer(ValuesSerializer):
+    fields = AdminSubmissionSerializer.Meta.fields
+    sources = {
+        "student": "student_id",
+        "student_name": "student__username",
+        "exam": "exam_id",
+        "exam_title": "exam__title",
+        "exam_course": "exam__course",
+    }
+    datetime_fields = ("created_at",)
+
+
+class StudentSubmissionValuesSerializer(AdminSubmissionValuesSerializer):
+    fields = StudentSubmissionSerializer.Meta.fields
+
+
+class AdminExamValuesSerializer(ValuesSerializer):
+    """
+    Exams with their nested questions: the questions of a whole page come
+    from one more values() query, grouped by exam.
+    """
+
+    fields = AdminExamSerializer.Meta.fields
+    question_fields = AdminQuestionSerializer.Meta.fields
+
+    def values(self, queryset):
+        # the id joins the questions, even when it isn't asked for
+        columns = [name for name in self.names if name != "questions"]
+        if "questions" in self.names and "id" not in columns:
+            columns.append("id")
+        return queryset.values(*columns)
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        if "questions" in self.names:
+            questions = {}
+            for question in (
+                Question.objects.filter(exam_id__in=[row["id"] for row in rows])
+                .order_by("id")
+                .values("exam_id", *self.question_fields)
+            ):
+                exam_id = question.pop("exam_id")
+                questions.setdefault(exam_id, []).append(question)
+            for row in rows:
+                row["questions"] = questions.get(row["id"], [])
+        return [{name: row[name] for name in self.names} for row in rows]
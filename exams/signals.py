@@ -1,10 +1,80 @@
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 
+from .analytics import UNCOUNTED_JOB_STATUSES, current_outcomes, record_exam_stats, record_item_stats
+from .authentication import token_cache
+from .grading import get_grading_plan, invalidate_grading_plan
+from .models import Exam, GradingJob, Question, Submission
+
 @receiver(post_save, sender=User)
 def create_auth_token(sender, instance=None, created=False, **kwargs):
     if created:
         Token.objects.create(user=instance)
+
+# Cached token lookups must not outlive a token or a change to its user (deactivation, staff flag).
+# They are dropped again after commit, in case a request cached the old row in between.
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def forget_cached_token(sender, instance, **kwargs):
+    def forget():
+        token_cache.invalidate_key(instance.key)
+        token_cache.invalidate_user(instance.user_id)
+    forget()
+    transaction.on_commit(forget)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    token_cache.invalidate_user(instance.pk)
+    transaction.on_commit(lambda: token_cache.invalidate_user(instance.pk))
+
+# Any question change (API views or the admin inline) makes compiled grading plans and the
+# cached student payload stale. Both are keyed on the exam's content version, which this bumps.
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_plan_on_question_change(sender, instance, **kwargs):
+    invalidate_grading_plan(instance.exam_id)
+
+@receiver(post_save, sender=Exam)
+def invalidate_plan_on_exam_update(sender, instance, created=False, **kwargs):
+    if not created:
+        invalidate_grading_plan(instance.id)
+
+def _uncounted_submission_ids(origin, exam_id):
+    # queued submissions of the exam, looked up once per delete operation (the deleted
+    # instance or queryset) and kept on it, rather than once per deleted row
+    uncounted = getattr(origin, "_uncounted_submission_ids", None)
+    if uncounted is None:
+        uncounted = {}
+        if origin is not None:
+            origin._uncounted_submission_ids = uncounted
+    if exam_id not in uncounted:
+        uncounted[exam_id] = set(
+            GradingJob.objects.filter(submission__exam_id=exam_id, status__in=UNCOUNTED_JOB_STATUSES)
+            .values_list("submission_id", flat=True)
+        )
+    return uncounted[exam_id]
+
+# Take a deleted submission's grade out of the running statistics once it's gone.
+# Deleting the whole exam drops its statistics rows anyway.
+@receiver(pre_delete, sender=Submission)
+def check_submission_counted(sender, instance, origin=None, **kwargs):
+    exam_deleted = isinstance(origin, Exam) or getattr(origin, "model", None) is Exam
+    instance._counted_in_stats = not exam_deleted and (
+        instance.id not in _uncounted_submission_ids(origin, instance.exam_id)
+    )
+
+
+@receiver(post_delete, sender=Submission)
+def remove_submission_from_stats(sender, instance, **kwargs):
+    if not getattr(instance, "_counted_in_stats", False):
+        return
+    record_exam_stats(instance.exam_id, [(instance.score, None)])
+    plan = get_grading_plan(instance.exam)
+    outcomes = current_outcomes(instance.outcomes, instance.grader_version, instance.outcomes_layout, plan)
+    if outcomes is not None:
+        record_item_stats(plan, [(instance.score, outcomes, None, None)])
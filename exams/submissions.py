@@ -0,0 +1,110 @@
+from django.db import IntegrityError, transaction
+
+from .analytics import record_exam_stats, record_item_stats
+from .answers import write_answers
+from .grading import apply_outcomes, get_grading_plan, grade_changes, grade_submission, grading_key, ordered_outcomes
+from .models import Draft, GradingJob, Submission
+
+
+class DuplicateSubmission(Exception):
+    def __init__(self, existing):
+        super().__init__("You have already submitted this exam.")
+        self.existing = existing
+
+
+# how the one-submission-per-student constraint shows up in an IntegrityError: by name on
+# PostgreSQL and MySQL, by its columns on SQLite
+DUPLICATE_SUBMISSION_MARKERS = (
+    "unique_submission_per_student",
+    "exams_submission.student_id, exams_submission.exam_id",
+)
+
+
+def _is_duplicate_submission(error):
+    message = str(error)
+    return any(marker in message for marker in DUPLICATE_SUBMISSION_MARKERS)
+
+
+def _refresh_draft(draft, plan, exam):
+    """
+    Regrades every answer of a draft graded under older rules (the exam
+    changed since), so its outcomes match the current plan.
+    """
+    key = grading_key(exam)
+    if draft.graded_under != key:
+        draft.outcomes = {}
+        grade_changes(plan, {}, draft.outcomes, draft.answers)
+        draft.graded_under = key
+
+
+def save_draft(student, exam, changes):
+    """
+    Merges a delta of answers into the student's draft for the exam, grading
+    only the changed answers. Raises DuplicateSubmission once the exam is
+    submitted.
+    """
+    existing = Submission.objects.filter(student=student, exam=exam).first()
+    if existing is not None:
+        raise DuplicateSubmission(existing)
+
+    plan = get_grading_plan(exam)
+    with transaction.atomic():
+        draft, _ = Draft.objects.select_for_update().get_or_create(student=student, exam=exam)
+        _refresh_draft(draft, plan, exam)
+        grade_changes(plan, draft.answers, draft.outcomes, changes)
+        draft.save()
+    return draft
+
+
+def submit_exam(student, exam, answers, queue=False, graded=None):
+    """
+    Stores a student's submission for an exam.
+
+    The answers are graded before the row exists, so the submission is written
+    with a single INSERT, in the same transaction as the statistics updates.
+    The (student, exam) unique constraint is the duplicate check: a second
+    submission, even a concurrent one, fails the INSERT and raises
+    DuplicateSubmission. With `queue`, the row is stored ungraded with a
+    pending GradingJob for grading_worker instead. `graded` is a
+    (plan, outcomes) pair when the answers were graded already, outside the
+    transaction (the async view grades in a pool).
+
+    A saved draft is promoted instead, graded or queued alike: `answers`, if
+    any, are its last changes and only those are graded, the rest was graded
+    as it arrived.
+    """
+    submission = Submission(student=student, exam=exam, answers=answers)
+    try:
+        with transaction.atomic():
+            draft = Draft.objects.select_for_update().filter(student=student, exam=exam).first()
+            if draft is None and queue:
+                submission.save()
+                GradingJob.objects.create(submission=submission)
+                return submission
+
+            if draft is not None:
+                plan = get_grading_plan(exam)
+                _refresh_draft(draft, plan, exam)
+                grade_changes(plan, draft.answers, draft.outcomes, answers or {})
+                submission.answers = draft.answers
+                submission.score = apply_outcomes(plan, submission, ordered_outcomes(plan, draft.outcomes))
+                draft.delete()
+            elif graded is None:
+                submission.score = grade_submission(exam, submission)
+                plan = get_grading_plan(exam)
+            else:
+                plan, outcomes = graded
+                submission.score = apply_outcomes(plan, submission, outcomes)
+            submission.save()
+            write_answers(plan, [(submission.id, submission.answers, submission.outcomes)])
+            record_item_stats(plan, [(None, None, submission.score, submission.outcomes)])
+            record_exam_stats(exam.id, [(None, submission.score)])
+    except IntegrityError as error:
+        # any other constraint (a stats CHECK, a missing row) is a real error
+        if not _is_duplicate_submission(error):
+            raise
+        existing = Submission.objects.filter(student=student, exam=exam).first()
+        if existing is None:
+            raise
+        raise DuplicateSubmission(existing)
+    return submission
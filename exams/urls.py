@@ -1,16 +1,28 @@
 from django.urls import path
-from .auth_views import RegisterView, LoginView
+from .async_views import AsyncExamDetailView, AsyncStudentSubmissionsView, AsyncSubmitExamView
+from .auth_views import RegisterView, LoginView, TokenCacheStatsView
 from .views import (
     ExamListView,
     SubmitExamView,
     AdminSubmissionView,
     ExamDetailView, 
+    ExamDraftView,
     StudentSubmissionsView,
     CreateExamView,
+    ImportExamsView,
     UpdateExamView,
     DeleteExamView,
     UpdateQuestionView,
     DeleteQuestionView,
+    RegradeExamView,
+    SubmissionStatusView,
+    ItemAnalysisView,
+    QuestionAnswersView,
+    ExamStatsView,
+    ExportSubmissionsView,
+    ExportCourseSubmissionsView,
+    ProfileListView,
+    ProfileDownloadView,
 )
 
 
@@ -18,20 +30,37 @@ from .views import (
 urlpatterns = [
      path("auth/register/", RegisterView.as_view()), #post and token generation for each student.
     path("auth/login/", LoginView.as_view()), #post
+    path("auth/token-cache/", TokenCacheStatsView.as_view()), #get, admin only
+    path("profiles/", ProfileListView.as_view()), #get, admin only
+    path("profiles/<str:name>/", ProfileDownloadView.as_view()), #get, download one .prof/.txt
 
         #Admin access, token generated from admin panel
     path("exams/create/", CreateExamView.as_view()), #post
+    path("exams/import/", ImportExamsView.as_view()), #post, many exams from a json/ndjson/csv file
     path("exams/<int:exam_id>/update/", UpdateExamView.as_view()),
     path("exams/<int:exam_id>/delete/", DeleteExamView.as_view()),
     path("questions/<int:question_id>/update/", UpdateQuestionView.as_view()),
     path("questions/<int:question_id>/delete/", DeleteQuestionView.as_view()),
+    path("exams/<int:exam_id>/regrade/", RegradeExamView.as_view()), #post, rescore stored submissions
+    path("exams/<int:exam_id>/item-analysis/", ItemAnalysisView.as_view()), #get, difficulty & discrimination per question
+    path("questions/<int:question_id>/answers/", QuestionAnswersView.as_view()), #get, answer review & distractor counts
+    path("exams/<int:exam_id>/stats/", ExamStatsView.as_view()), #get, score distribution
+    path("exams/<int:exam_id>/submissions/export/", ExportSubmissionsView.as_view()), #get, streamed csv or ndjson
+    path("courses/<str:course>/submissions/export/", ExportCourseSubmissionsView.as_view()), #get, every exam of a course
     path("exams/", ExamListView.as_view()), #getAllExams & questions with expected answers by admin
     path("submissions/grade/Admin/", AdminSubmissionView.as_view()), #get
 
         #student access
     path("exams/<int:exam_id>/", ExamDetailView.as_view()), #get one exam and questions by students without answers
+    path("exams/<int:exam_id>/draft/", ExamDraftView.as_view()), #get/patch, autosaved answers graded as they arrive
     path("exams/<int:exam_id>/submit/", SubmitExamView.as_view()), #post/submit answers
     path("submissions/grade/student", StudentSubmissionsView.as_view()), #get
+    path("submissions/<int:submission_id>/status/", SubmissionStatusView.as_view()), #get, poll async grading
+
+        #student access, async views for ASGI servers (same responses as above)
+    path("async/exams/<int:exam_id>/", AsyncExamDetailView.as_view()), #get
+    path("async/exams/<int:exam_id>/submit/", AsyncSubmitExamView.as_view()), #post
+    path("async/submissions/grade/student", AsyncStudentSubmissionsView.as_view()), #get
 
 
 ]
@@ -1,20 +1,43 @@
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.text import slugify
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from rest_framework.authentication import TokenAuthentication
-from rest_framework import status
-from .grading import grade_submission
+from rest_framework.parsers import MultiPartParser
+from rest_framework import serializers, status
+from .admission import ExamAdmissionMixin
+from .analytics import compute_exam_stats, exam_summary, item_analysis
+from .answers import answer_frequencies, answer_summary, option_frequencies
+from .export import stream_csv, stream_ndjson
+from .filters import metadata_filter
+from .metrics import registry, render_prometheus
+from .importer import IMPORT_FORMATS, exam_records, import_exams, import_format, text_stream
+from .pagination import ExamPagination, KeysetPagination, parse_moment
+from .profiling import list_profiles, profile_path
+from .payloads import get_exam_payload
+from .regrade import regrade_exam
+from .routers import ReplicaReadMixin
+from .renderers import CSVRenderer, NDJSONRenderer, PrometheusTextRenderer
+from .submissions import DuplicateSubmission, save_draft, submit_exam
 
-from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExample, OpenApiResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, extend_schema_view, inline_serializer, OpenApiExample, OpenApiParameter, OpenApiResponse
 
-from .models import Exam, Submission, Question
+from .models import Draft, Exam, Submission, Question, ExamStats
 from .serializers import (
     AdminExamSerializer,
+    AdminExamValuesSerializer,
     AdminUpdateExamSerializer,
     AdminSubmissionSerializer,
-    StudentExamSerializer,
-    StudentSubmissionSerializer,
+    AdminSubmissionValuesSerializer,
+    StudentSubmissionValuesSerializer,
     AdminQuestionSerializer
 )
 
@@ -79,7 +102,6 @@ from .serializers import (
 
 class CreateExamView(APIView):
     permission_classes = [IsAdminUser]
-    authentication_classes = [TokenAuthentication]
 
     def post(self, request):
         serializer = AdminExamSerializer(data=request.data)
@@ -89,6 +111,104 @@ class CreateExamView(APIView):
         return Response(serializer.errors, status=400)
 
 
+# Bulk import of exams and their question banks
+@extend_schema_view(
+    post=extend_schema(
+        description=(
+            "Admin-only: Import many exams at once from an uploaded JSON (list of exams), NDJSON "
+            "(one exam per line) or CSV (one question per row) file. The file is parsed as a stream; "
+            "each exam is validated and written in its own transaction with bulk inserts, and the "
+            "result of every exam is reported. The format comes from the file extension or `file_format`."
+        ),
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {
+                    "file": {"type": "string", "format": "binary"},
+                    "file_format": {"type": "string", "enum": ["json", "ndjson", "csv"]},
+                },
+                "required": ["file"],
+            }
+        },
+        responses={
+            201: OpenApiResponse(
+                description="Every exam imported",
+                examples=[
+                    OpenApiExample(
+                        name="Imported",
+                        value={
+                            "exams": 2,
+                            "invalid": 0,
+                            "questions": 120,
+                            "seconds": 0.084,
+                            "questions_per_sec": 1428.6,
+                            "error": None,
+                            "results": [
+                                {"index": 0, "title": "Math Test", "status": "created", "exam_id": 7, "questions": 60},
+                                {"index": 1, "title": "Physics Test", "status": "created", "exam_id": 8, "questions": 60}
+                            ]
+                        },
+                        response_only=True
+                    )
+                ]
+            ),
+            400: OpenApiResponse(
+                description="Missing file, unknown format, or some exams were not imported",
+                examples=[
+                    OpenApiExample(
+                        name="InvalidExam",
+                        value={
+                            "exams": 1,
+                            "invalid": 1,
+                            "questions": 60,
+                            "seconds": 0.051,
+                            "questions_per_sec": 1176.5,
+                            "error": None,
+                            "results": [
+                                {"index": 0, "title": "Math Test", "status": "created", "exam_id": 7, "questions": 60},
+                                {"index": 1, "title": "Physics Test", "status": "invalid", "errors": {"duration": ["A valid integer is required."]}}
+                            ]
+                        },
+                        response_only=True
+                    ),
+                    OpenApiExample(
+                        name="MissingFile",
+                        value={"error": "Upload a file in the 'file' field"},
+                        response_only=True
+                    )
+                ]
+            ),
+            403: OpenApiResponse(
+                description="Forbidden",
+                examples=[
+                    OpenApiExample(
+                        name="Forbidden",
+                        value={"detail": "You do not have permission to perform this action."},
+                        response_only=True
+                    )
+                ]
+            ),
+        }
+    )
+)
+class ImportExamsView(APIView):
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if not upload:
+            return Response({"error": "Upload a file in the 'file' field"}, status=400)
+
+        input_format = request.data.get("file_format") or import_format(upload.name)
+        if input_format not in IMPORT_FORMATS:
+            return Response({"error": f"file_format must be one of: {', '.join(IMPORT_FORMATS)}"}, status=400)
+
+        report = import_exams(exam_records(text_stream(upload), input_format))
+        ok = report["error"] is None and not report["invalid"]
+        return Response(report, status=201 if ok else 400)
+
+
 # Update Exam with id
 @extend_schema_view(
     put=extend_schema(
@@ -172,7 +292,6 @@ class CreateExamView(APIView):
 )
 class UpdateExamView(APIView):
     permission_classes = [IsAdminUser]
-    authentication_classes = [TokenAuthentication]
 
     def put(self, request, exam_id):
         exam = Exam.objects.filter(id=exam_id).first()
@@ -224,7 +343,6 @@ class UpdateExamView(APIView):
 )
 class DeleteExamView(APIView):
     permission_classes = [IsAdminUser]
-    authentication_classes = [TokenAuthentication]
 
     def delete(self, request, exam_id):
         exam = Exam.objects.filter(id=exam_id).first()
@@ -316,7 +434,6 @@ class DeleteExamView(APIView):
 )
 class UpdateQuestionView(APIView):
     permission_classes = [IsAdminUser]
-    authentication_classes = [TokenAuthentication]
 
     def put(self, request, question_id):
         question = Question.objects.filter(id=question_id).first()
@@ -368,7 +485,6 @@ class UpdateQuestionView(APIView):
 )
 class DeleteQuestionView(APIView):
     permission_classes = [IsAdminUser]
-    authentication_classes = [TokenAuthentication]
 
     def delete(self, request, question_id):
         question = Question.objects.filter(id=question_id).first()
@@ -378,108 +494,115 @@ class DeleteQuestionView(APIView):
         return Response({"message": "Question deleted successfully"}, status=200)
 
 
-# ADMIN GET ALL EXAMS
+# Regrade Exam
 @extend_schema_view(
-    get=extend_schema(
-        description="Admin-only: Retrieve a list of all exams, each including its nested questions.",
+    post=extend_schema(
+        description=(
+            "Admin-only: Recompute stored scores for every submission of an exam. "
+            "Pass question_id to re-evaluate only that question."
+        ),
+        request={
+            "application/json": {
+                "type": "object",
+                "properties": {
+                    "question_id": {"type": "integer"},
+                    "chunk_size": {"type": "integer"}
+                }
+            }
+        },
         responses={
             200: OpenApiResponse(
-                description="List of exams with nested questions",
+                description="Regrade finished",
                 examples=[
                     OpenApiExample(
-                        name="Exams List Example",
-                        summary="An example response showing exams with questions",
-                        value=[
-                            {
-                                "id": 3,
-                                "title": "Introduction to Python",
-                                "duration": 60,
-                                "course": "CSC101",
-                                "metadata": None,
-                                "questions": [
-                                    {
-                                        "id": 5,
-                                        "question_text": "What is the correct file extension for Python files?",
-                                        "question_type": "mcq",
-                                        "expected_answer": ".py"
-                                    },
-                                    {
-                                        "id": 6,
-                                        "question_text": "Which keyword is used to define a function in Python?",
-                                        "question_type": "mcq",
-                                        "expected_answer": "def"
-                                    }
-                                ]
-                            }
-                        ],
+                        name="Success",
+                        value={
+                            "message": "Exam regraded",
+                            "exam_id": 3,
+                            "mode": "question",
+                            "rows": 2000,
+                            "updated": 312,
+                            "seconds": 0.41,
+                            "rows_per_sec": 4878.0
+                        },
                         response_only=True
                     )
                 ]
             ),
-            401: OpenApiResponse(
-                description="Unauthorized",
+            403: OpenApiResponse(
+                description="Forbidden",
                 examples=[
                     OpenApiExample(
-                        name="Unauthorized",
-                        value={"detail": "Authentication credentials were not provided."},
+                        name="Forbidden",
+                        value={"detail": "You do not have permission to perform this action."},
                         response_only=True
                     )
                 ]
             ),
-            403: OpenApiResponse(
-                description="Forbidden",
+            404: OpenApiResponse(
+                description="Exam or question not found",
                 examples=[
                     OpenApiExample(
-                        name="Forbidden",
-                        value={"detail": "You do not have permission to perform this action."},
+                        name="NotFound",
+                        value={"error": "Exam not found"},
                         response_only=True
                     )
                 ]
-            )
+            ),
         }
     )
 )
-
-class ExamListView(APIView):
+class RegradeExamView(APIView):
     permission_classes = [IsAdminUser]
-    authentication_classes = [TokenAuthentication]
 
-    def get(self, request):
-        exams = Exam.objects.all().prefetch_related("questions")
-        serializer = AdminExamSerializer(exams, many=True)
-        return Response(serializer.data)
+    def post(self, request, exam_id):
+        exam = Exam.objects.filter(id=exam_id).first()
+        if not exam:
+            return Response({"error": "Exam not found"}, status=404)
 
+        question = None
+        question_id = request.data.get("question_id")
+        if question_id is not None:
+            try:
+                question_id = int(question_id)
+            except (TypeError, ValueError):
+                return Response({"question_id": ["A valid integer is required."]}, status=400)
+            question = Question.objects.filter(id=question_id, exam=exam).first()
+            if not question:
+                return Response({"error": "Question not found"}, status=404)
 
-# STUDENT GET A SINGLE EXAM
+        try:
+            chunk_size = int(request.data.get("chunk_size", 1000))
+        except (TypeError, ValueError):
+            return Response({"chunk_size": ["A valid integer is required."]}, status=400)
+
+        result = regrade_exam(exam, question=question, chunk_size=max(chunk_size, 1))
+        return Response({"message": "Exam regraded", **result})
+
+
+# Item analysis
 @extend_schema_view(
     get=extend_schema(
-        description="Retrieve exam details for students. Includes all questions but excludes correct answers if configured.",
+        description=(
+            "Admin-only: Difficulty (percent correct) and discrimination index (point-biserial) "
+            "of each question, read from running statistics."
+        ),
         responses={
             200: OpenApiResponse(
-                description="Exam details for a student",
+                description="Item analysis per question",
                 examples=[
                     OpenApiExample(
-                        name="Student Exam Example",
-                        summary="Example of a student fetching exam details with questions",
+                        name="ItemAnalysis",
                         value={
-                            "id": 2,
-                            "title": "Introduction to Python",
-                            "duration": 60,
-                            "course": "CSC101",
-                            "metadata": None,
+                            "exam_id": 3,
                             "questions": [
                                 {
-                                    "id": 5,
+                                    "question_id": 5,
                                     "question_text": "What is the correct file extension for Python files?",
-                                    "question_type": "mcq",
-                                    # Optional: hide expected_answer for students
-                                    "expected_answer": None
-                                },
-                                {
-                                    "id": 6,
-                                    "question_text": "Which keyword is used to define a function in Python?",
-                                    "question_type": "mcq",
-                                    "expected_answer": None
+                                    "responses": 120,
+                                    "correct": 96,
+                                    "difficulty": 80.0,
+                                    "discrimination": 0.4123
                                 }
                             ]
                         },
@@ -487,12 +610,12 @@ class ExamListView(APIView):
                     )
                 ]
             ),
-            401: OpenApiResponse(
-                description="Unauthorized",
+            403: OpenApiResponse(
+                description="Forbidden",
                 examples=[
                     OpenApiExample(
-                        name="Unauthorized",
-                        value={"detail": "Authentication credentials were not provided."},
+                        name="Forbidden",
+                        value={"detail": "You do not have permission to perform this action."},
                         response_only=True
                     )
                 ]
@@ -506,63 +629,151 @@ class ExamListView(APIView):
                         response_only=True
                     )
                 ]
-            )
+            ),
         }
     )
 )
-
-class ExamDetailView(APIView):
-    permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+class ItemAnalysisView(APIView):
+    permission_classes = [IsAdminUser]
 
     def get(self, request, exam_id):
-        exam = get_object_or_404(Exam, id=exam_id)
-        serializer = StudentExamSerializer(exam)
-        return Response(serializer.data)
+        if not Exam.objects.filter(id=exam_id).exists():
+            return Response({"error": "Exam not found"}, status=404)
+
+        # cost depends on the number of questions only, never on the number of submissions
+        questions = Question.objects.filter(exam_id=exam_id).select_related("stats").order_by("id")
+        return Response({
+            "exam_id": exam_id,
+            "questions": [
+                {
+                    "question_id": question.id,
+                    "question_text": question.question_text,
+                    **item_analysis(getattr(question, "stats", None)),
+                }
+                for question in questions
+            ],
+        })
 
 
-# STUDENT SUBMIT EXAM
+# Answers to one question
 @extend_schema_view(
-    post=extend_schema(
-        description="Submit answers for an exam. Key is question ID, value is answer.",
-        request={
-            "application/json": {
-                "type": "object",
-                "properties": {
-                    "answers": {"type": "object"}
-                }
-            }
-        },
+    get=extend_schema(
+        description=(
+            "Admin-only: Answer review for one question: responses, correct and blank counts, the most "
+            "frequent answers, and for multiple choice how often each option was picked (distractor "
+            "analysis). Grouped in SQL over the indexed Answer table."
+        ),
+        parameters=[
+            OpenApiParameter("limit", int, description="Most frequent answers to list (default 20, max 200)"),
+        ],
         responses={
             200: OpenApiResponse(
-                description="Submission successful",
+                description="Answer review",
                 examples=[
                     OpenApiExample(
-                        name="SubmissionSuccess",
+                        name="QuestionAnswers",
                         value={
-                            "message": "Submission successful",
-                            "score": 33.33
+                            "question_id": 5,
+                            "question_type": "mcq",
+                            "responses": 120,
+                            "correct": 96,
+                            "blank": 4,
+                            "answers": [
+                                {"value": ["2", "3", "5"], "is_correct": True, "count": 96},
+                                {"value": ["2", "3", "9"], "is_correct": False, "count": 15}
+                            ],
+                            "options": [
+                                {"option": "2", "count": 116},
+                                {"option": "9", "count": 20}
+                            ]
                         },
                         response_only=True
                     )
                 ]
             ),
-            400: OpenApiResponse(
-                description="Validation error",
+            403: OpenApiResponse(
+                description="Forbidden",
                 examples=[
                     OpenApiExample(
-                        name="ValidationError",
-                        value={"answers": ["This field is required."]},
+                        name="Forbidden",
+                        value={"detail": "You do not have permission to perform this action."},
                         response_only=True
                     )
                 ]
             ),
-            401: OpenApiResponse(
-                description="Unauthorized",
+            404: OpenApiResponse(
+                description="Question not found",
                 examples=[
                     OpenApiExample(
-                        name="Unauthorized",
-                        value={"detail": "Authentication credentials were not provided."},
+                        name="questionNotFound",
+                        value={"error": "Question not found"},
+                        response_only=True
+                    )
+                ]
+            ),
+        }
+    )
+)
+class QuestionAnswersView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, question_id):
+        question = Question.objects.filter(id=question_id).only("id", "question_type").first()
+        if not question:
+            return Response({"error": "Question not found"}, status=404)
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 200)
+        except ValueError:
+            limit = 20
+
+        data = {
+            "question_id": question_id,
+            "question_type": question.question_type,
+            **answer_summary(question_id),
+            "answers": answer_frequencies(question_id, limit),
+        }
+        if question.question_type == "mcq":
+            data["options"] = option_frequencies(question_id)
+        return Response(data)
+
+
+# Exam score distribution
+@extend_schema_view(
+    get=extend_schema(
+        description=(
+            "Admin-only: Score summary of an exam (count, mean, min, max, standard deviation "
+            "and a 10-point histogram), read from an aggregate kept up to date on every grade."
+        ),
+        responses={
+            200: OpenApiResponse(
+                description="Exam score summary",
+                examples=[
+                    OpenApiExample(
+                        name="ExamStats",
+                        value={
+                            "exam_id": 3,
+                            "count": 120,
+                            "mean": 71.5,
+                            "min": 20.0,
+                            "max": 100.0,
+                            "std_dev": 14.87,
+                            "histogram": [
+                                {"range": "0-10", "count": 0},
+                                {"range": "10-20", "count": 0},
+                                {"range": "20-30", "count": 3},
+                                {"range": "90-100", "count": 18}
+                            ]
+                        },
+                        response_only=True
+                    )
+                ]
+            ),
+            403: OpenApiResponse(
+                description="Forbidden",
+                examples=[
+                    OpenApiExample(
+                        name="Forbidden",
+                        value={"detail": "You do not have permission to perform this action."},
                         response_only=True
                     )
                 ]
@@ -571,70 +782,763 @@ class ExamDetailView(APIView):
                 description="Exam not found",
                 examples=[
                     OpenApiExample(
-                        name="ExamNotFound",
+                        name="NotFound",
                         value={"error": "Exam not found"},
                         response_only=True
                     )
                 ]
-            )
-        },
-        examples=[
-            OpenApiExample(
-                name="Submit Exam Example",
-                summary="Example of submitting answers",
-                value={
-                    "answers": {
-                        "5": "Python",
-                        "6": "def",
-                        "7": "A variable stores data."
-                    }
-                },
-                request_only=True
-            )
-        ]
+            ),
+        }
     )
 )
+class ExamStatsView(APIView):
+    permission_classes = [IsAdminUser]
 
-class SubmitExamView(APIView):
-    permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
-
-    def post(self, request, exam_id):
-        exam = get_object_or_404(Exam, id=exam_id)
-
-        # Prevent duplicate submissions
-        existing = Submission.objects.filter(student=request.user, exam=exam).first()
-        if existing:
-            return Response(
-                {"message": "You have already submitted this exam.", "score": existing.score},
-                status=400
-            )
-
-        submission = Submission.objects.create(
-            student=request.user,
-            exam=exam,
-            answers=request.data.get("answers")
-        )
+    def get(self, request, exam_id):
+        stats = ExamStats.objects.filter(exam_id=exam_id).first()
+        if stats is None:
+            if not Exam.objects.filter(id=exam_id).exists():
+                return Response({"error": "Exam not found"}, status=404)
+            # an exam graded before stats were kept: computed for this response only, the
+            # row itself is seeded by the next grade or reconcile_exam_stats (no writes on GET)
+            stats = ExamStats(exam_id=exam_id, **compute_exam_stats(exam_id))
+        return Response({"exam_id": exam_id, **exam_summary(stats)})
 
-        score = grade_submission(exam, submission)
-        submission.score = score
-        submission.save()
 
-        return Response({"message": "Submitted successfully", "score": score})
-        
+# Registrar export of an exam's submissions
+@extend_schema_view(
+    get=extend_schema(
+        description=(
+            "Admin-only: Stream every submission of an exam as CSV or NDJSON (`format=csv|ndjson`). "
+            "Rows are read in chunks and written as they are produced, so memory use doesn't grow "
+            "with the number of submissions. With `flatten=true`, answers become one `q_<question id>` "
+            "column per question instead of a single JSON column."
+        ),
+        parameters=[
+            OpenApiParameter("format", str, enum=["csv", "ndjson"], description="Export format (default csv)"),
+            OpenApiParameter("flatten", bool, description="One column per question instead of an answers column"),
+        ],
+        responses={
+            (200, "text/csv"): OpenApiResponse(
+                response=OpenApiTypes.STR,
+                description="CSV export",
+                examples=[
+                    OpenApiExample(
+                        name="CSVExport",
+                        value=(
+                            "id,student_id,student_name,exam_id,score,created_at,q_5,q_6\r\n"
+                            "8,5,Arinola,3,50.0,2026-01-05T10:50:03.127844+00:00,\"[\"\"2\"\", \"\"3\"\"]\",named storage\r\n"
+                        ),
+                        response_only=True
+                    )
+                ]
+            ),
+            (200, "application/x-ndjson"): OpenApiResponse(
+                response=OpenApiTypes.STR,
+                description="NDJSON export, one submission per line",
+                examples=[
+                    OpenApiExample(
+                        name="NDJSONExport",
+                        value=(
+                            '{"id": 8, "student_id": 5, "student_name": "Arinola", "exam_id": 3, "score": 50.0, '
+                            '"created_at": "2026-01-05T10:50:03.127Z", "answers": {"5": ["2", "3"], "6": "named storage"}}\n'
+                        ),
+                        response_only=True
+                    )
+                ]
+            ),
+            403: OpenApiResponse(
+                description="Forbidden",
+                examples=[
+                    OpenApiExample(
+                        name="Forbidden",
+                        value={"detail": "You do not have permission to perform this action."},
+                        response_only=True
+                    )
+                ]
+            ),
+            404: OpenApiResponse(
+                description="Exam not found",
+                examples=[
+                    OpenApiExample(
+                        name="NotFound",
+                        value={"error": "Exam not found"},
+                        response_only=True
+                    )
+                ]
+            ),
+        }
+    )
+)
+class ExportSubmissionsView(APIView):
+    permission_classes = [IsAdminUser]
+    # `format` is DRF's format override, so both export formats must be known renderers
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+
+    def get(self, request, exam_id):
+        exam = Exam.objects.filter(id=exam_id).first()
+        if not exam:
+            return Response({"error": "Exam not found"}, status=404)
+        return self.export(request, Submission.objects.filter(exam=exam), exam.questions.all(), f"exam-{exam.id}")
+
+    def export(self, request, submissions, questions, name):
+        question_ids = None
+        if request.query_params.get("flatten", "").lower() in ("1", "true", "yes"):
+            question_ids = list(questions.order_by("id").values_list("id", flat=True))
+
+        if request.accepted_renderer.format == "ndjson":
+            response = StreamingHttpResponse(stream_ndjson(submissions, question_ids), content_type="application/x-ndjson")
+            extension = "ndjson"
+        else:
+            response = StreamingHttpResponse(stream_csv(submissions, question_ids), content_type="text/csv; charset=utf-8")
+            extension = "csv"
+        response["Content-Disposition"] = f'attachment; filename="{name}-submissions.{extension}"'
+        return response
+
+
+# Registrar export of every submission to the exams of a course
+@extend_schema_view(
+    get=extend_schema(
+        description=(
+            "Admin-only: Stream every submission to the exams of a course as CSV or NDJSON "
+            "(`format=csv|ndjson`), in the same layout as the per-exam export. With `flatten=true` "
+            "there is one `q_<question id>` column per question of the course's exams; a submission "
+            "leaves the columns of the other exams empty."
+        ),
+        parameters=[
+            OpenApiParameter("format", str, enum=["csv", "ndjson"], description="Export format (default csv)"),
+            OpenApiParameter("flatten", bool, description="One column per question instead of an answers column"),
+        ],
+        responses={
+            (200, "text/csv"): OpenApiResponse(response=OpenApiTypes.STR, description="CSV export"),
+            (200, "application/x-ndjson"): OpenApiResponse(
+                response=OpenApiTypes.STR, description="NDJSON export, one submission per line"
+            ),
+            403: OpenApiResponse(
+                description="Forbidden",
+                examples=[
+                    OpenApiExample(
+                        name="Forbidden",
+                        value={"detail": "You do not have permission to perform this action."},
+                        response_only=True
+                    )
+                ]
+            ),
+            404: OpenApiResponse(
+                description="No exam in this course",
+                examples=[
+                    OpenApiExample(
+                        name="NotFound",
+                        value={"error": "Course not found"},
+                        response_only=True
+                    )
+                ]
+            ),
+        }
+    )
+)
+class ExportCourseSubmissionsView(ExportSubmissionsView):
+    def get(self, request, course):
+        exams = Exam.objects.filter(course=course)
+        if not exams.exists():
+            return Response({"error": "Course not found"}, status=404)
+        return self.export(
+            request,
+            Submission.objects.filter(exam__course=course),
+            Question.objects.filter(exam__course=course),
+            f"course-{slugify(course) or 'export'}",
+        )
+
+
+# ADMIN GET ALL EXAMS
+@extend_schema_view(
+    get=extend_schema(
+        description=(
+            "Admin-only: Retrieve a page of exams, each including its nested questions. "
+            "`fields` limits the fields returned (leave out `questions` to skip loading them), "
+            "`course` and `metadata.<key>` filter the list. Responses carry ETag and Last-Modified "
+            "headers; send them back in If-None-Match / If-Modified-Since to get 304 Not Modified."
+        ),
+        parameters=[
+            OpenApiParameter("fields", str, description="Comma-separated fields, e.g. id,title,course"),
+            OpenApiParameter("course", str, description="Only exams of this course"),
+            OpenApiParameter("metadata.<key>", str, description="Only exams whose metadata has this value at key"),
+            OpenApiParameter("page", int, description="Page number"),
+            OpenApiParameter("page_size", int, description="Exams per page (default 50, max 500)"),
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=inline_serializer("PaginatedAdminExamList", fields={
+                    "count": serializers.IntegerField(),
+                    "next": serializers.URLField(allow_null=True),
+                    "previous": serializers.URLField(allow_null=True),
+                    "results": AdminExamSerializer(many=True),
+                }),
+                description="Page of exams with nested questions",
+                examples=[
+                    OpenApiExample(
+                        name="Exams List Example",
+                        summary="An example response showing exams with questions",
+                        value={
+                            "count": 1,
+                            "next": None,
+                            "previous": None,
+                            "results": [
+                            {
+                                "id": 3,
+                                "title": "Introduction to Python",
+                                "duration": 60,
+                                "course": "CSC101",
+                                "metadata": None,
+                                "questions": [
+                                    {
+                                        "id": 5,
+                                        "question_text": "What is the correct file extension for Python files?",
+                                        "question_type": "mcq",
+                                        "expected_answer": ".py"
+                                    },
+                                    {
+                                        "id": 6,
+                                        "question_text": "Which keyword is used to define a function in Python?",
+                                        "question_type": "mcq",
+                                        "expected_answer": "def"
+                                    }
+                                ]
+                            }
+                            ]
+                        },
+                        response_only=True
+                    ),
+                    OpenApiExample(
+                        name="Sparse Exams List Example",
+                        summary="?fields=id,title,course",
+                        value={
+                            "count": 1,
+                            "next": None,
+                            "previous": None,
+                            "results": [{"id": 3, "title": "Introduction to Python", "course": "CSC101"}]
+                        },
+                        response_only=True
+                    )
+                ]
+            ),
+            304: OpenApiResponse(description="Not modified since the given ETag / date"),
+            400: OpenApiResponse(
+                description="Invalid field or filter",
+                examples=[
+                    OpenApiExample(
+                        name="UnknownField",
+                        value={"error": "Unknown fields: answers"},
+                        response_only=True
+                    )
+                ]
+            ),
+            401: OpenApiResponse(
+                description="Unauthorized",
+                examples=[
+                    OpenApiExample(
+                        name="Unauthorized",
+                        value={"detail": "Authentication credentials were not provided."},
+                        response_only=True
+                    )
+                ]
+            ),
+            403: OpenApiResponse(
+                description="Forbidden",
+                examples=[
+                    OpenApiExample(
+                        name="Forbidden",
+                        value={"detail": "You do not have permission to perform this action."},
+                        response_only=True
+                    )
+                ]
+            )
+        }
+    )
+)
+
+class ExamListView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAdminUser]
+
+    pagination_class = ExamPagination
+
+    def get(self, request):
+        params = request.query_params
+        exams = Exam.objects.order_by("id")
+
+        fields = None
+        if params.get("fields"):
+            fields = [name.strip() for name in params["fields"].split(",") if name.strip()]
+            unknown = sorted(set(fields) - set(AdminExamSerializer.Meta.fields))
+            if not fields:
+                return Response({"error": "fields must name at least one field"}, status=400)
+            if unknown:
+                return Response({"error": f"Unknown fields: {', '.join(unknown)}"}, status=400)
+
+        if params.get("course"):
+            exams = exams.filter(course=params["course"])
+        # metadata.<key>=value filters on a key of the metadata JSON
+        for param, value in params.items():
+            if not param.startswith("metadata."):
+                continue
+            key = param[len("metadata."):]
+            if not key.isidentifier() or "__" in key:
+                return Response({"error": f"Invalid metadata key: {key}"}, status=400)
+            exams = exams.filter(metadata_filter(key, value))
+
+        # cheap validators for conditional GET: any create, delete or change moves one of them
+        version = exams.aggregate(count=Count("id"), id_sum=Sum("id"), last_modified=Max("updated_at"))
+        etag = '"%s"' % hashlib.blake2b(
+            f"{request.get_full_path()}|{version['count']}|{version['id_sum']}|{version['last_modified']}".encode(),
+            digest_size=16,
+        ).hexdigest()
+        last_modified = int(version["last_modified"].timestamp()) if version["last_modified"] else None
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+        if response is None:
+            # only the requested columns, and the questions query only when they are asked for
+            serializer = AdminExamValuesSerializer(fields=fields)
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(serializer.values(exams), request, view=self)
+            response = paginator.get_paginated_response(serializer.to_representation(page))
+
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+# STUDENT GET A SINGLE EXAM
+@extend_schema_view(
+    get=extend_schema(
+        description=(
+            "Retrieve exam details for students. Includes all questions but excludes correct answers if configured. "
+            "The response carries a strong ETag; send it back in If-None-Match to get 304 Not Modified while the exam is unchanged."
+        ),
+        parameters=[
+            OpenApiParameter("If-None-Match", str, OpenApiParameter.HEADER, description="ETag of a previous response"),
+        ],
+        responses={
+            200: OpenApiResponse(
+                description="Exam details for a student",
+                examples=[
+                    OpenApiExample(
+                        name="Student Exam Example",
+                        summary="Example of a student fetching exam details with questions",
+                        value={
+                            "id": 2,
+                            "title": "Introduction to Python",
+                            "duration": 60,
+                            "course": "CSC101",
+                            "metadata": None,
+                            "questions": [
+                                {
+                                    "id": 5,
+                                    "question_text": "What is the correct file extension for Python files?",
+                                    "question_type": "mcq",
+                                    # Optional: hide expected_answer for students
+                                    "expected_answer": None
+                                },
+                                {
+                                    "id": 6,
+                                    "question_text": "Which keyword is used to define a function in Python?",
+                                    "question_type": "mcq",
+                                    "expected_answer": None
+                                }
+                            ]
+                        },
+                        response_only=True
+                    )
+                ]
+            ),
+            304: OpenApiResponse(description="Not modified, the ETag still matches"),
+            401: OpenApiResponse(
+                description="Unauthorized",
+                examples=[
+                    OpenApiExample(
+                        name="Unauthorized",
+                        value={"detail": "Authentication credentials were not provided."},
+                        response_only=True
+                    )
+                ]
+            ),
+            404: OpenApiResponse(
+                description="Exam not found",
+                examples=[
+                    OpenApiExample(
+                        name="NotFound",
+                        value={"error": "Exam not found"},
+                        response_only=True
+                    )
+                ]
+            ),
+            429: OpenApiResponse(
+                description="Too many requests from this user, or the exam is at capacity; retry after the Retry-After header's seconds",
+                examples=[
+                    OpenApiExample(
+                        name="Throttled",
+                        value={"detail": "Request was throttled. Expected available in 2 seconds."},
+                        response_only=True
+                    )
+                ]
+            )
+        }
+    )
+)
+
+class ExamDetailView(ExamAdmissionMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    admission_scope = "exam-start"
+
+    def get(self, request, exam_id):
+        # same bytes for every student, rendered once per exam change (see payloads.py)
+        payload = get_exam_payload(exam_id)
+        if payload.matches(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(payload.content, content_type="application/json")
+        response["ETag"] = payload.etag
+        # clients may keep it but must revalidate, questions can change
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
+# STUDENT SUBMIT EXAM
+@extend_schema_view(
+    post=extend_schema(
+        description="Submit answers for an exam. Key is question ID, value is answer.",
+        request={
+            "application/json": {
+                "type": "object",
+                "properties": {
+                    "answers": {"type": "object"}
+                }
+            }
+        },
+        responses={
+            200: OpenApiResponse(
+                description="Submission successful",
+                examples=[
+                    OpenApiExample(
+                        name="SubmissionSuccess",
+                        value={
+                            "message": "Submission successful",
+                            "score": 33.33
+                        },
+                        response_only=True
+                    )
+                ]
+            ),
+            202: OpenApiResponse(
+                description="Submission queued for grading (GRADING_ASYNC mode)",
+                examples=[
+                    OpenApiExample(
+                        name="SubmissionAccepted",
+                        value={
+                            "message": "Submission accepted",
+                            "submission_id": 12,
+                            "status": "pending"
+                        },
+                        response_only=True
+                    )
+                ]
+            ),
+            400: OpenApiResponse(
+                description="Validation error",
+                examples=[
+                    OpenApiExample(
+                        name="ValidationError",
+                        value={"answers": ["This field is required."]},
+                        response_only=True
+                    )
+                ]
+            ),
+            401: OpenApiResponse(
+                description="Unauthorized",
+                examples=[
+                    OpenApiExample(
+                        name="Unauthorized",
+                        value={"detail": "Authentication credentials were not provided."},
+                        response_only=True
+                    )
+                ]
+            ),
+            404: OpenApiResponse(
+                description="Exam not found",
+                examples=[
+                    OpenApiExample(
+                        name="ExamNotFound",
+                        value={"error": "Exam not found"},
+                        response_only=True
+                    )
+                ]
+            ),
+            429: OpenApiResponse(
+                description="Too many requests from this user, or the exam is at capacity; retry after the Retry-After header's seconds",
+                examples=[
+                    OpenApiExample(
+                        name="Throttled",
+                        value={"detail": "Request was throttled. Expected available in 2 seconds."},
+                        response_only=True
+                    )
+                ]
+            )
+        },
+        examples=[
+            OpenApiExample(
+                name="Submit Exam Example",
+                summary="Example of submitting answers",
+                value={
+                    "answers": {
+                        "5": "Python",
+                        "6": "def",
+                        "7": "A variable stores data."
+                    }
+                },
+                request_only=True
+            )
+        ]
+    )
+)
+
+class SubmitExamView(ExamAdmissionMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    # at most a few submits per exam reach the database at once, see admission.py
+    admission_scope = "submit"
+
+    def post(self, request, exam_id):
+        exam = get_object_or_404(Exam, id=exam_id)
+
+        # duplicates are caught by the (student, exam) unique constraint, see submissions.py
+        try:
+            submission = submit_exam(
+                request.user, exam, request.data.get("answers"), queue=settings.GRADING_ASYNC
+            )
+        except DuplicateSubmission as duplicate:
+            return Response(
+                {"message": "You have already submitted this exam.", "score": duplicate.existing.score},
+                status=400
+            )
+
+        if settings.GRADING_ASYNC:
+            # queued for grading_worker, answer straight away
+            return Response(
+                {"message": "Submission accepted", "submission_id": submission.id, "status": "pending"},
+                status=202
+            )
+        return Response({"message": "Submitted successfully", "score": submission.score})
+        
+
+# STUDENT DRAFT (autosave)
+@extend_schema_view(
+    get=extend_schema(
+        description="Student: The saved draft answers for an exam, to resume after a reload.",
+        responses={
+            200: OpenApiResponse(
+                description="Draft answers",
+                examples=[
+                    OpenApiExample(
+                        name="Draft",
+                        value={"answers": {"5": ["2", "3"], "6": "named storage"}, "updated_at": "2026-01-05T10:42:13.512Z"},
+                        response_only=True
+                    )
+                ]
+            ),
+            404: OpenApiResponse(
+                description="No draft saved for this exam",
+                examples=[
+                    OpenApiExample(
+                        name="NoDraft",
+                        value={"error": "No draft for this exam"},
+                        response_only=True
+                    )
+                ]
+            ),
+        }
+    ),
+    patch=extend_schema(
+        description=(
+            "Student: Autosave changed answers only (`{question id: answer}`, `null` clears one). "
+            "Each changed answer is graded as it arrives, so the final submit just promotes the draft "
+            "(any answers sent with the submit are its last changes). Correctness is not returned."
+        ),
+        request={
+            "application/json": {
+                "type": "object",
+                "properties": {"answers": {"type": "object"}},
+                "required": ["answers"]
+            }
+        },
+        responses={
+            200: OpenApiResponse(
+                description="Draft saved",
+                examples=[
+                    OpenApiExample(
+                        name="DraftSaved",
+                        value={"message": "Draft saved", "answered": 2, "updated_at": "2026-01-05T10:42:13.512Z"},
+                        response_only=True
+                    )
+                ]
+            ),
+            400: OpenApiResponse(
+                description="Invalid delta, or the exam was submitted already",
+                examples=[
+                    OpenApiExample(
+                        name="InvalidDelta",
+                        value={"error": "answers must be an object of question id to answer"},
+                        response_only=True
+                    ),
+                    OpenApiExample(
+                        name="AlreadySubmitted",
+                        value={"message": "You have already submitted this exam.", "score": 50.0},
+                        response_only=True
+                    )
+                ]
+            ),
+            404: OpenApiResponse(
+                description="Exam not found",
+                examples=[
+                    OpenApiExample(
+                        name="ExamNotFound",
+                        value={"error": "Exam not found"},
+                        response_only=True
+                    )
+                ]
+            ),
+        },
+        examples=[
+            OpenApiExample(
+                name="Draft Delta Example",
+                value={"answers": {"6": "named storage", "7": None}},
+                request_only=True
+            )
+        ]
+    )
+)
+class ExamDraftView(ExamAdmissionMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    admission_scope = "draft"
+
+    def get(self, request, exam_id):
+        draft = Draft.objects.filter(student=request.user, exam_id=exam_id).first()
+        if draft is None:
+            return Response({"error": "No draft for this exam"}, status=404)
+        return Response({"answers": draft.answers, "updated_at": draft.updated_at})
+
+    def patch(self, request, exam_id):
+        exam = Exam.objects.filter(id=exam_id).first()
+        if not exam:
+            return Response({"error": "Exam not found"}, status=404)
+        changes = request.data.get("answers")
+        if not isinstance(changes, dict):
+            return Response({"error": "answers must be an object of question id to answer"}, status=400)
+
+        try:
+            draft = save_draft(request.user, exam, changes)
+        except DuplicateSubmission as duplicate:
+            return Response(
+                {"message": "You have already submitted this exam.", "score": duplicate.existing.score},
+                status=400
+            )
+        # no score or outcomes here, students could probe answers with them
+        return Response({"message": "Draft saved", "answered": len(draft.answers), "updated_at": draft.updated_at})
+
+
+# SUBMISSION GRADING STATUS
+@extend_schema_view(
+    get=extend_schema(
+        description="Grading status of a submission. The score is included once grading is done.",
+        responses={
+            200: OpenApiResponse(
+                description="Submission status",
+                examples=[
+                    OpenApiExample(
+                        name="Pending",
+                        value={"submission_id": 12, "status": "pending", "score": None},
+                        response_only=True
+                    ),
+                    OpenApiExample(
+                        name="Graded",
+                        value={"submission_id": 12, "status": "done", "score": 66.67},
+                        response_only=True
+                    )
+                ]
+            ),
+            401: OpenApiResponse(
+                description="Unauthorized",
+                examples=[
+                    OpenApiExample(
+                        name="Unauthorized",
+                        value={"detail": "Authentication credentials were not provided."},
+                        response_only=True
+                    )
+                ]
+            ),
+            404: OpenApiResponse(
+                description="Submission not found",
+                examples=[
+                    OpenApiExample(
+                        name="NotFound",
+                        value={"error": "Submission not found"},
+                        response_only=True
+                    )
+                ]
+            )
+        }
+    )
+)
+
+class SubmissionStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, submission_id):
+        submissions = Submission.objects.select_related("grading_job")
+        if not request.user.is_staff:
+            submissions = submissions.filter(student=request.user)
+        submission = submissions.filter(id=submission_id).first()
+        if not submission:
+            return Response({"error": "Submission not found"}, status=404)
+
+        # submissions graded inline have no job
+        job = getattr(submission, "grading_job", None)
+        job_status = job.status if job else "done"
+        return Response({
+            "submission_id": submission.id,
+            "status": job_status,
+            "score": submission.score if job_status == "done" else None,
+        })
+
 
 # ADMIN GET ALL SUBMISSIONS
 @extend_schema_view(
     get=extend_schema(
-        description="Admin-only: Retrieve all students' exam submissions.",
+        description=(
+            "Admin-only: Retrieve students' exam submissions, oldest first, one page at a time. "
+            "Follow `next` to get the following page; it is null on the last page."
+        ),
+        parameters=[
+            OpenApiParameter("exam", int, description="Only submissions for this exam id"),
+            OpenApiParameter("student", int, description="Only submissions by this student id"),
+            OpenApiParameter("course", str, description="Only submissions for exams of this course"),
+            OpenApiParameter("created_after", str, description="ISO date or datetime, inclusive"),
+            OpenApiParameter("created_before", str, description="ISO date or datetime, exclusive"),
+            OpenApiParameter("page_size", int, description="Rows per page (default 100, max 500)"),
+            OpenApiParameter("cursor", str, description="Opaque position taken from `next`"),
+        ],
         responses={
             200: OpenApiResponse(
-                description="List of submissions",
+                response=inline_serializer("AdminSubmissionPage", fields={
+                    "next": serializers.URLField(allow_null=True),
+                    "results": AdminSubmissionSerializer(many=True),
+                }),
+                description="Page of submissions",
                 examples=[
                     OpenApiExample(
                         name="SubmissionsExample",
                         summary="Example response showing all student submissions",
-                        value=[
+                        value={
+                            "next": "http://localhost:8000/api/submissions/grade/Admin/?cursor=MjAyNi0wMS0wNVQxMDo1MDowMy4xMjc4NDQrMDA6MDB8OA%3D%3D",
+                            "results": [
                             {
                                 "id": 5,
                                 "student": 2,
@@ -665,7 +1569,18 @@ class SubmitExamView(APIView):
                                 "score": 33.33,
                                 "created_at": "2026-01-05T10:50:03.127844Z"
                             }
-                        ],
+                            ]
+                        },
+                        response_only=True
+                    )
+                ]
+            ),
+            400: OpenApiResponse(
+                description="Invalid filter",
+                examples=[
+                    OpenApiExample(
+                        name="InvalidFilter",
+                        value={"error": "created_after must be an ISO date or datetime"},
                         response_only=True
                     )
                 ]
@@ -694,14 +1609,36 @@ class SubmitExamView(APIView):
     )
 )
 
-class AdminSubmissionView(APIView):
+class AdminSubmissionView(ReplicaReadMixin, APIView):
     permission_classes = [IsAdminUser]
-    authentication_classes = [TokenAuthentication]
+
+    pagination_class = KeysetPagination
 
     def get(self, request):
         submissions = Submission.objects.all()
-        serializer = AdminSubmissionSerializer(submissions, many=True)
-        return Response(serializer.data)
+        params = request.query_params
+
+        for field in ("exam", "student"):
+            if params.get(field):
+                # int() rather than isdigit(): "²" is a digit but not a number
+                try:
+                    value = int(params[field])
+                except ValueError:
+                    return Response({"error": f"{field} must be an id"}, status=400)
+                submissions = submissions.filter(**{f"{field}_id": value})
+        if params.get("course"):
+            submissions = submissions.filter(exam__course=params["course"])
+        for param, lookup in (("created_after", "created_at__gte"), ("created_before", "created_at__lt")):
+            if params.get(param):
+                moment = parse_moment(params[param])
+                if moment is None:
+                    return Response({"error": f"{param} must be an ISO date or datetime"}, status=400)
+                submissions = submissions.filter(**{lookup: moment})
+
+        serializer = AdminSubmissionValuesSerializer()
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(serializer.values(submissions), request, view=self)
+        return paginator.get_paginated_response(serializer.to_representation(page))
 
 
 # STUDENT VIEW OWN SUBMISSIONS
@@ -765,14 +1702,153 @@ class AdminSubmissionView(APIView):
     )
 )
 
-class StudentSubmissionsView(APIView):
+class StudentSubmissionsView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
 
     def get(self, request):
-        submissions = Submission.objects.filter(student=request.user)
-        serializer = StudentSubmissionSerializer(submissions, many=True)
-        return Response(serializer.data)
+        serializer = StudentSubmissionValuesSerializer()
+        submissions = serializer.values(Submission.objects.filter(student=request.user))
+        return Response(serializer.to_representation(submissions))
+
+
+
+
+
+# Prometheus scrape endpoint
+@extend_schema_view(
+    get=extend_schema(
+        description=(
+            "Admin-only: Request, SQL and grading counters in the Prometheus text format. "
+            "Requests are labelled by URL route (not path), method and status; latency is a histogram. "
+            "With METRICS_MULTIPROC_DIR set, the counters of all worker processes are summed."
+        ),
+        responses={
+            (200, "text/plain"): OpenApiResponse(
+                response=OpenApiTypes.STR,
+                description="Prometheus text exposition format 0.0.4",
+                examples=[
+                    OpenApiExample(
+                        name="Metrics",
+                        value=(
+                            "# TYPE exams_http_requests_total counter\n"
+                            'exams_http_requests_total{view="/api/exams/<int:exam_id>/submit/",method="POST",status="200"} 412\n'
+                            "# TYPE exams_db_queries_total counter\n"
+                            'exams_db_queries_total{view="/api/exams/<int:exam_id>/submit/",method="POST"} 3296\n'
+                            "# TYPE exams_grading_calls_total counter\n"
+                            "exams_grading_calls_total 412\n"
+                        ),
+                        response_only=True
+                    )
+                ]
+            ),
+            403: OpenApiResponse(
+                description="Forbidden",
+                examples=[
+                    OpenApiExample(
+                        name="Forbidden",
+                        value={"detail": "You do not have permission to perform this action."},
+                        response_only=True
+                    )
+                ]
+            ),
+        }
+    )
+)
+class MetricsView(APIView):
+    permission_classes = [IsAdminUser]
+    renderer_classes = [PrometheusTextRenderer]
+
+    def get(self, request):
+        return HttpResponse(render_prometheus(registry.collect()), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# Stored request profiles
+@extend_schema_view(
+    get=extend_schema(
+        operation_id="api_profiles_list",
+        description=(
+            "Admin-only: List the stored request profiles, newest first. "
+            "An admin request sent with `X-Profile: 1` (or `?profile=1`) runs under cProfile and is stored here; "
+            "`X-Profile: memory` also traces allocations with tracemalloc (a `.txt` of the top allocation sites). "
+            "With PROFILE_SAMPLE_EVERY set, 1 in N requests is profiled and kept when slower than PROFILE_SLOW_MS. "
+            "Only the newest PROFILE_MAX_FILES profiles are kept."
+        ),
+        responses={
+            200: OpenApiResponse(
+                description="Stored profiles",
+                examples=[
+                    OpenApiExample(
+                        name="Profiles",
+                        value=[
+                            {
+                                "name": "1791277310512000000_SubmitExamView_POST_9q_184ms.prof",
+                                "kind": "cpu",
+                                "view": "SubmitExamView",
+                                "method": "POST",
+                                "queries": 9,
+                                "duration_ms": 184,
+                                "peak_memory_kb": None,
+                                "size": 48211,
+                                "created_at": 1791277310
+                            }
+                        ],
+                        response_only=True
+                    )
+                ]
+            ),
+            403: OpenApiResponse(
+                description="Forbidden",
+                examples=[
+                    OpenApiExample(
+                        name="Forbidden",
+                        value={"detail": "You do not have permission to perform this action."},
+                        response_only=True
+                    )
+                ]
+            ),
+        }
+    )
+)
+class ProfileListView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(list_profiles())
 
 
+@extend_schema_view(
+    get=extend_schema(
+        description="Admin-only: Download a stored profile (`.prof` for pstats/snakeviz, `.txt` for allocations).",
+        responses={
+            (200, "application/octet-stream"): OpenApiResponse(response=OpenApiTypes.BINARY, description="Profile file"),
+            403: OpenApiResponse(
+                description="Forbidden",
+                examples=[
+                    OpenApiExample(
+                        name="Forbidden",
+                        value={"detail": "You do not have permission to perform this action."},
+                        response_only=True
+                    )
+                ]
+            ),
+            404: OpenApiResponse(
+                description="Profile not found",
+                examples=[
+                    OpenApiExample(
+                        name="NotFound",
+                        value={"error": "Profile not found"},
+                        response_only=True
+                    )
+                ]
+            ),
+        }
+    )
+)
+class ProfileDownloadView(APIView):
+    permission_classes = [IsAdminUser]
 
+    def get(self, request, name):
+        path = profile_path(name)
+        if path is None:
+            return Response({"error": "Profile not found"}, status=404)
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=name, content_type="application/octet-stream")
@@ -0,0 +1,101 @@
+import logging
+import os
+import socket
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .analytics import record_exam_stats, record_item_stats
+from .answers import write_answers
+from .cohort import grade_cohort
+from .grading import GRADER_VERSION, get_grading_plan
+from .models import GradingJob, Submission
+
+logger = logging.getLogger(__name__)
+
+
+class LostClaim(Exception):
+    pass
+
+
+def worker_name():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def claim_jobs(worker, batch_size):
+    """
+    Atomically moves up to batch_size pending jobs to running for this worker.
+
+    The UPDATE only touches rows that are still pending, so when several
+    workers race for the same ids each job is claimed by exactly one of them.
+    """
+    ids = list(
+        GradingJob.objects.filter(status="pending").order_by("id").values_list("id", flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+
+    claim = f"{worker}:{uuid.uuid4().hex[:12]}"
+    GradingJob.objects.filter(id__in=ids, status="pending").update(
+        status="running", claimed_by=claim, claimed_at=timezone.now(), attempts=F("attempts") + 1
+    )
+    return list(
+        GradingJob.objects.filter(claimed_by=claim, status="running").select_related("submission__exam")
+    )
+
+
+def release_stale_jobs(stale_after):
+    """
+    Puts jobs back in the queue if their worker died while holding them.
+    """
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    return GradingJob.objects.filter(status="running", claimed_at__lt=cutoff).update(
+        status="pending", claimed_by=""
+    )
+
+
+def process_jobs(jobs):
+    """
+    Grades claimed jobs, one cohort per exam, and stores their scores.
+    Returns the number of jobs graded.
+    """
+    by_exam = {}
+    for job in jobs:
+        by_exam.setdefault(job.submission.exam_id, []).append(job)
+
+    graded = 0
+    for exam_jobs in by_exam.values():
+        exam = exam_jobs[0].submission.exam
+        job_ids = [job.id for job in exam_jobs]
+        try:
+            plan = get_grading_plan(exam)
+            scores, outcomes = grade_cohort(plan, [job.submission.answers for job in exam_jobs], with_outcomes=True)
+            submissions = []
+            for job, score, packed in zip(exam_jobs, scores, outcomes):
+                job.submission.score = score
+                job.submission.outcomes = packed
+                job.submission.grader_version = GRADER_VERSION
+                job.submission.outcomes_layout = plan.layout
+                submissions.append(job.submission)
+
+            with transaction.atomic():
+                # a job requeued as stale and taken by another worker must not be counted twice
+                done = GradingJob.objects.filter(
+                    id__in=job_ids, status="running", claimed_by=exam_jobs[0].claimed_by
+                ).update(status="done", error="")
+                if done != len(job_ids):
+                    raise LostClaim
+                Submission.objects.bulk_update(submissions, ["score", "outcomes", "grader_version", "outcomes_layout"])
+                write_answers(plan, [(s.id, s.answers, s.outcomes) for s in submissions])
+                record_item_stats(plan, [(None, None, s.score, s.outcomes) for s in submissions])
+                record_exam_stats(exam.id, [(None, s.score) for s in submissions])
+            graded += len(exam_jobs)
+        except LostClaim:
+            logger.warning("Jobs %s were reclaimed by another worker", job_ids)
+        except Exception as exc:
+            logger.exception("Grading failed for exam %s", exam.id)
+            GradingJob.objects.filter(id__in=job_ids).update(status="failed", error=str(exc))
+    return graded